@@ -13,6 +13,10 @@ import time
 from app.services.llm_service import LLMService
 from app.schema.llm.message import Message
 from app.core.tools.search_weeks_tool import SearchWeeksTool
+from app.core.tools.search_tasks_tool import SearchTasksTool
+from app.core.tools.similar_tasks_tool import SimilarTasksTool
+from app.core.tools.critical_path_tool import CriticalPathTool
+from app.core.tools.forecast_tool import ForecastTool
 from app.core.agentic.agent_prompts.system_prompts import SystemPrompts
 from app.core.repository.user_repository import UserRepository
 
@@ -61,9 +65,17 @@ async def chat(query: str, user_id: str, db: AsyncSession = Depends(get_db)):
     user_message = Message(
         role="user", content=json.dumps({"query": query, "user_id": user_id})
     )
-    # Call the LLM with the SearchWeeksTool available and system prompt injected
+    # Call the LLM with the tools available and system prompt injected
     response = await llm.query_llm(
-        messages=[user_message], tools=["SearchWeeksTool"], system_prompt=system_prompt
+        messages=[user_message],
+        tools=[
+            "SearchWeeksTool",
+            "SearchTasksTool",
+            "SimilarTasksTool",
+            "CriticalPathTool",
+            "ForecastTool",
+        ],
+        system_prompt=system_prompt,
     )
     # If the response is a Message object, return its content; if dict, return as string
     if hasattr(response, "content"):
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.database_service import get_db
-from app.core.repository.dag_repository import DagRepository
+from app.core.repository.dag_repository import DagRepository, EdgeOperation
 from app.core.repository.task_repository import TasksRepository
 from app.schema.repository.tasks import task
-from app.schema.repository.dag import dag as DagModel
+from app.schema.repository.dag import dag as DagModel, DagAdjacencyList, dag_task
+from app.schema.repository.dag_changes import dag_change, dag_snapshot
 from pydantic import BaseModel
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Dict
+from app.services.critical_path_service import critical_path_service, CriticalPath
+from app.services.forecast_service import forecast_service, DagForecast
+from app.services.layout_service import layout_service, DagLayout
+from app.config.config import app_settings
 from app.core.logger import logger
 import uuid
 
@@ -28,6 +33,47 @@ class DagRequest(BaseModel):
 class DagResponse(BaseModel):
     success: bool
     message: str
+    dag_id: Optional[uuid.UUID] = None
+    new_dag_ids: Optional[List[uuid.UUID]] = None
+
+
+class DagEdgeOperation(BaseModel):
+    action: DagAction
+    first_task_id: uuid.UUID
+    dependencies: List[uuid.UUID]
+
+
+class DagBatchRequest(BaseModel):
+    team_id: uuid.UUID
+    operations: List[DagEdgeOperation]
+
+
+class DagBatchResponse(BaseModel):
+    success: bool
+    message: str
+    dag_id_map: Dict[uuid.UUID, List[uuid.UUID]] = {}
+    new_dag_ids: List[uuid.UUID] = []
+
+
+class DagBundle(BaseModel):
+    dag: DagAdjacencyList
+    tasks: List[dag_task]
+
+
+class TeamDagBundle(BaseModel):
+    team_id: uuid.UUID
+    dags: List[DagBundle]
+    # Team tasks without any dependency edges
+    unattached_tasks: List[dag_task]
+
+
+class DagChangesResponse(BaseModel):
+    # Present when the client must (re)start from a full state
+    snapshot: Optional[dag_snapshot] = None
+    changes: List[dag_change]
+    # Pass back as since on the next poll
+    latest_seq: int
+    has_more: bool
 
 
 router = APIRouter(prefix="/dag", tags=["dag"])
@@ -70,6 +116,35 @@ async def dag_action(request: DagRequest, db: AsyncSession = Depends(get_db)):
         return DagResponse(success=False, message=str(e))
 
 
+@router.post("/batch", response_model=DagBatchResponse, status_code=200)
+async def dag_batch(request: DagBatchRequest, db: AsyncSession = Depends(get_db)):
+    """Apply many add/delete edge operations to a team's DAGs in one transaction."""
+    try:
+        logger.info(
+            f"Received DAG batch for team {request.team_id} with {len(request.operations)} operations"
+        )
+        operations = [
+            EdgeOperation(
+                action=op.action.value,
+                first_task_id=op.first_task_id,
+                dependencies=op.dependencies,
+            )
+            for op in request.operations
+        ]
+        result = await dag_repository.apply_edge_operations(
+            db, request.team_id, operations
+        )
+        return DagBatchResponse(
+            success=True, message="Edge operations applied successfully", **result
+        )
+    except HTTPException as e:
+        logger.error(f"HTTPException in dag_batch: {e.detail}")
+        raise e
+    except Exception as e:
+        logger.error(f"Exception in dag_batch: {e}", exc_info=True)
+        return DagBatchResponse(success=False, message=str(e))
+
+
 @router.get("/", response_model=List[DagModel])
 async def get_all_dags(db: AsyncSession = Depends(get_db)):
     try:
@@ -78,3 +153,143 @@ async def get_all_dags(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         logger.error(f"Error in get_all_dags: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/changes", response_model=DagChangesResponse)
+async def get_dag_changes(
+    team_id: uuid.UUID,
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db),
+):
+    """Edge and membership changes of a team's DAGs after seq since."""
+    try:
+        logger.info(f"Received request for DAG changes of team {team_id} since {since}")
+        return await dag_repository.changes.get_changes(db, team_id, since, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_dag_changes: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/team/{team_id}/bundle", response_model=TeamDagBundle)
+async def get_team_bundle(team_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """A team's DAGs with their tasks and assignees, in one round trip."""
+    try:
+        logger.info(f"Received request for DAG bundle of team {team_id}")
+        bundles, unattached = await dag_repository.get_team_bundle(db, team_id)
+        return TeamDagBundle(
+            team_id=team_id,
+            dags=[DagBundle(dag=graph, tasks=tasks) for graph, tasks in bundles],
+            unattached_tasks=unattached,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_team_bundle: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ready", response_model=List[task])
+async def get_ready_tasks(
+    team_id: uuid.UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """Tasks whose dependencies are all complete, in priority order."""
+    try:
+        logger.info(f"Received request for ready tasks of team {team_id}")
+        return await tasks_repository.get_ready_tasks(db, team_id, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_ready_tasks: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{dag_id}/critical_path", response_model=CriticalPath)
+async def get_critical_path(dag_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """Earliest/latest start, slack and the critical path of a DAG, in hours."""
+    try:
+        logger.info(f"Received request for critical path of DAG {dag_id}")
+        return await critical_path_service.get_critical_path(db, dag_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_critical_path: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{dag_id}/forecast", response_model=DagForecast)
+async def get_forecast(
+    dag_id: uuid.UUID,
+    samples: int = Query(app_settings.FORECAST_SAMPLES, ge=100, le=20000),
+    uncertainty: float = Query(app_settings.FORECAST_UNCERTAINTY, gt=0, le=2),
+    hours_per_day: float = Query(app_settings.FORECAST_HOURS_PER_DAY, gt=0, le=24),
+    seed: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Monte Carlo P50/P90 finish and deadline-miss probability per task."""
+    try:
+        logger.info(f"Received request for forecast of DAG {dag_id}")
+        return await forecast_service.get_forecast(
+            db,
+            dag_id,
+            samples=samples,
+            uncertainty=uncertainty,
+            hours_per_day=hours_per_day,
+            seed=seed,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_forecast: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{dag_id}/layout", response_model=DagLayout)
+async def get_layout(dag_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """Layered node positions and edge bend points for rendering a DAG."""
+    try:
+        logger.info(f"Received request for layout of DAG {dag_id}")
+        return await layout_service.get_layout(db, dag_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_layout: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{task_id}/ancestors", response_model=List[uuid.UUID])
+async def get_ancestors(
+    task_id: uuid.UUID,
+    max_depth: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """Tasks that depend on task_id, directly or transitively."""
+    try:
+        logger.info(f"Received request for ancestors of {task_id}")
+        return await dag_repository.get_ancestors(db, task_id, max_depth)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error in get_ancestors: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{task_id}/descendants", response_model=List[uuid.UUID])
+async def get_descendants(
+    task_id: uuid.UUID,
+    max_depth: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """Tasks that task_id depends on, directly or transitively (what blocks it)."""
+    try:
+        logger.info(f"Received request for descendants of {task_id}")
+        return await dag_repository.get_descendants(db, task_id, max_depth)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error in get_descendants: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import json
+import uuid
+from app.services.database_service import DatabaseService
+from app.services.notification_service import notification_service, RESYNC
+from app.core.repository.dag_changes_repository import DagChangesRepository
+from app.config.config import app_settings
+from app.core.logger import logger
+
+router = APIRouter(prefix="/events", tags=["events"])
+dag_changes_repository = DagChangesRepository()
+
+
+def format_event(kind: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {kind}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    team_id: uuid.UUID,
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events for a team. "dag" events carry the newest change log seq
+    as their id (fetch the entries from GET /dag/changes), "task" events list
+    changed task ids, and "resync" means events were dropped and the client
+    should catch up from the change log and refetch tasks. Browsers reconnect
+    with Last-Event-ID, and anything committed since that seq is announced first.
+    """
+
+    async def event_stream():
+        # Subscribe before reading the log so nothing falls between the two
+        subscription = notification_service.subscribe(team_id)
+        logger.info(f"Event stream opened for team {team_id} from {last_event_id}")
+        try:
+            last_seq = (
+                int(last_event_id)
+                if last_event_id and last_event_id.isdigit()
+                else None
+            )
+            if last_seq is not None:
+                # A short-lived session, so the stream holds no pooled connection
+                async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+                    latest = await dag_changes_repository.get_latest_seq(db, team_id)
+                if latest > last_seq:
+                    last_seq = latest
+                    yield format_event(
+                        "dag", {"team_id": str(team_id), "seq": latest}, latest
+                    )
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=app_settings.EVENTS_HEARTBEAT_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is RESYNC:
+                    yield format_event("resync", {"team_id": str(team_id)})
+                    continue
+                seq = event.get("seq")
+                if seq is not None:
+                    # Already announced by the replay or an earlier event
+                    if last_seq is not None and seq <= last_seq:
+                        continue
+                    last_seq = seq
+                yield format_event(event.get("kind", "message"), event, seq)
+        finally:
+            notification_service.unsubscribe(subscription)
+            logger.info(f"Event stream closed for team {team_id}")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 from app.services.database_service import get_db
 from app.core.repository.task_repository import TasksRepository
-from app.schema.repository.tasks import task, TaskPriority, TaskFocus
+from app.schema.repository.tasks import (
+    task,
+    task_search_hit,
+    task_similarity_hit,
+    TaskPriority,
+    TaskFocus,
+)
 from pydantic import BaseModel
-from typing import Optional, Any
+from typing import Optional, Any, List
 from uuid import UUID
 from enum import Enum
 from datetime import datetime
@@ -69,10 +75,10 @@ async def task_post(request: TaskRequest, db: AsyncSession = Depends(get_db)):
                     status_code=400, detail="task_id is required for edit"
                 )
 
-            # Create updates dict with non-None fields
+            # Only fields the client sent; unset priority/focus keep their value
             updates = {
                 k: v
-                for k, v in request.model_dump().items()
+                for k, v in request.model_dump(exclude_unset=True).items()
                 if v is not None and k not in ["action", "task_id"]
             }
             return await tasks_repository.edit_task(db, request.task_id, updates)
@@ -92,15 +98,15 @@ async def task_post(request: TaskRequest, db: AsyncSession = Depends(get_db)):
                     status_code=400, detail="task_id is required for complete"
                 )
 
-            # Create updates dict with non-None fields and add current timestamp
+            # Fields the client sent, plus the current timestamp
             updates = {
                 k: v
-                for k, v in request.model_dump().items()
+                for k, v in request.model_dump(exclude_unset=True).items()
                 if v is not None and k not in ["action", "task_id"]
             }
             updates["date_of_completion"] = datetime.now()
 
-            return await tasks_repository.edit_task(db, request.task_id, updates)
+            return await tasks_repository.complete_task(db, request.task_id, updates)
 
     except HTTPException as e:
         logger.error(f"HTTPException: {e.detail}")
@@ -110,6 +116,48 @@ async def task_post(request: TaskRequest, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class TaskBulkRequest(BaseModel):
+    operations: List[TaskRequest]
+
+
+class TaskBulkResult(BaseModel):
+    index: int
+    action: task_action
+    success: bool
+    result: Optional[task] = None
+    error: Optional[str] = None
+
+
+class TaskBulkResponse(BaseModel):
+    results: List[TaskBulkResult]
+
+
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def task_bulk_post(request: TaskBulkRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Apply many create/edit/complete/delete operations in one transaction.
+    Results come back per operation, in request order; an operation that
+    fails validation or names a missing task does not stop the others.
+    """
+    try:
+        tasks_repository = TasksRepository()
+        logger.info(f"Received bulk request with {len(request.operations)} operations")
+        # Only fields the client actually sent, so edits don't reset
+        # priority and focus to their defaults
+        operations = [
+            {**op.model_dump(exclude_unset=True), "action": op.action.value}
+            for op in request.operations
+        ]
+        results = await tasks_repository.bulk_apply(db, operations)
+        return TaskBulkResponse(results=results)
+    except HTTPException as e:
+        logger.error(f"HTTPException: {e.detail}")
+        raise e
+    except Exception as e:
+        logger.error(f"Exception in task_bulk_post: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/", response_model=list[task])
 async def get_all_tasks(db: AsyncSession = Depends(get_db)):
     try:
@@ -118,3 +166,102 @@ async def get_all_tasks(db: AsyncSession = Depends(get_db)):
         return tasks
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+class TaskPage(BaseModel):
+    tasks: List[task]
+    next_cursor: Optional[str] = None
+    """Pass back as cursor to get the next page; None on the last page."""
+
+
+@router.get("/page", response_model=TaskPage)
+async def get_tasks_page(
+    team_id: Optional[UUID] = None,
+    priority: Optional[List[TaskPriority]] = Query(None),
+    focus: Optional[List[TaskFocus]] = Query(None),
+    completed: Optional[bool] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Tasks oldest first, filtered server-side and paged by an opaque cursor.
+    priority and focus may be repeated to match any of several values.
+    """
+    try:
+        tasks_repository = TasksRepository()
+        tasks, next_cursor = await tasks_repository.get_tasks_page(
+            db,
+            team_id=team_id,
+            priority=priority,
+            focus=focus,
+            completed=completed,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            cursor=cursor,
+            limit=limit,
+        )
+        return TaskPage(tasks=tasks, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search", response_model=List[task_search_hit])
+async def search_tasks(
+    q: str = Query(..., min_length=1),
+    team_id: Optional[UUID] = None,
+    completed: Optional[bool] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Full-text search over task names, descriptions and notes, best match
+    first. q accepts web search syntax: "quoted phrases", or, -excluded.
+    """
+    try:
+        tasks_repository = TasksRepository()
+        return await tasks_repository.search_tasks(
+            db, q, team_id=team_id, completed=completed, limit=limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/similar", response_model=List[task_similarity_hit])
+async def search_similar_tasks(
+    q: Optional[str] = None,
+    task_id: Optional[UUID] = None,
+    team_id: Optional[UUID] = None,
+    completed: Optional[bool] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Semantic nearest-neighbour search: tasks most similar in meaning to the
+    text q, or to the task task_id. Filters narrow the candidates before
+    ranking.
+    """
+    try:
+        tasks_repository = TasksRepository()
+        return await tasks_repository.search_similar_tasks(
+            db,
+            query=q,
+            task_id=task_id,
+            team_id=team_id,
+            completed=completed,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            limit=limit,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -3,7 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.services.database_service import get_db
 from app.core.repository.week_repository import WeekRepository
+from app.core.repository.week_jobs_repository import WeekJobsRepository
 from app.schema.repository.week import week
+from app.schema.repository.week_jobs import week_job, WeekJobStatus
 from pydantic import BaseModel
 from enum import Enum
 import uuid
@@ -11,11 +13,12 @@ from datetime import datetime
 from typing import Tuple
 import json
 from pathlib import Path
-from app.services.week_service import encode_and_store
-from app.services.scheduler_service import scheduler_service
+from app.services.week_service import encode_and_store, weekly_window
+from app.services.week_queue_service import week_queue_worker
 
 router = APIRouter(prefix="/week", tags=["week"])
 week_repository = WeekRepository()
+week_jobs_repository = WeekJobsRepository()
 
 
 class WeekRequestType(str, Enum):
@@ -29,6 +32,11 @@ class WeekResponse(BaseModel):
     total_count: int
 
 
+class WeekJobStatusResponse(BaseModel):
+    job: week_job
+    result: Optional[week] = None
+
+
 @router.get("/", response_model=WeekResponse)
 async def get_weeks(
     request_type: WeekRequestType = Query(...),
@@ -145,10 +153,38 @@ async def get_weeks(
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
-# @router.post("/test_user_week_create")
-# async def test_user_week_create(user_id: uuid.UUID = Body(..., embed=True)):
-#     try:
-#         await scheduler_service.process_user_week(user_id)
-#         return {"status": "success", "message": f"Processed week for user {user_id}"}
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=str(e))
+@router.post("/jobs", response_model=week_job, status_code=202)
+async def create_week_job(
+    user_id: uuid.UUID = Body(..., embed=True), db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue analysis of the user's latest scheduled week ahead of the rest of its
+    run and return the job right away; poll GET /week/jobs/{job_id} for the
+    result. Requests for the same week share one job: one still in progress is
+    returned as is, and a finished or failed one is run again.
+    """
+    try:
+        job = await week_jobs_repository.enqueue_user_week(
+            db, user_id, *weekly_window()
+        )
+        week_queue_worker.wake(on_demand=True)
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=WeekJobStatusResponse)
+async def get_week_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """The job's status, with the stored week once it is done."""
+    try:
+        job = await week_jobs_repository.get_job(db, job_id)
+        result = None
+        if job.status == WeekJobStatus.done and job.week_id is not None:
+            result = await week_repository.get_by_id(db, job.week_id)
+        return WeekJobStatusResponse(job=job, result=result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -19,6 +19,35 @@ class AppSettings(BaseSettings):
     POSTGRES_DB_PORT: int | None = None
     GEMINI_MODEL_NAME: str | None = None
     GEMINI_API_KEY: str | None = None
+    DAG_CACHE_MAX_NODES: int = 200_000
+    SCHEDULE_CACHE_MAX_DAGS: int = 512
+    DAG_CHANGES_RETENTION_HOURS: int = 168
+    EVENTS_QUEUE_SIZE: int = 256
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    FORECAST_SAMPLES: int = 2000
+    FORECAST_UNCERTAINTY: float = 0.35
+    FORECAST_HOURS_PER_DAY: float = 6.0
+    TASK_EMBEDDING_DEBOUNCE_SECONDS: float = 10.0
+    TASK_EMBEDDING_BATCH_SIZE: int = 32
+    TASK_EMBEDDING_RETRY_SECONDS: float = 60.0
+    TASK_KNN_EF_SEARCH: int = 100
+    WEEK_METRICS_BATCH_SIZE: int = 500
+    WEEK_METRICS_CONCURRENCY: int = 2
+    WEEK_LLM_CONCURRENCY: int = 8
+    WEEK_EMBED_CONCURRENCY: int = 1
+    WEEK_STORE_CONCURRENCY: int = 4
+    WEEK_QUEUE_SIZE: int = 64
+    WEEK_LLM_TIMEOUT_SECONDS: float = 180.0
+    WEEK_STAGE_TIMEOUT_SECONDS: float = 60.0
+    WEEK_RETRIES: int = 3
+    WEEK_RETRY_BACKOFF_SECONDS: float = 2.0
+    WEEK_PROGRESS_SECONDS: float = 30.0
+    WEEK_JOB_CLAIM_SIZE: int = 64
+    WEEK_JOB_ON_DEMAND_CLAIM_SIZE: int = 8
+    WEEK_JOB_LEASE_SECONDS: float = 300.0
+    WEEK_JOB_POLL_SECONDS: float = 5.0
+    WEEK_JOB_MAX_ATTEMPTS: int = 3
+    SCHEDULER_LEADER_POLL_SECONDS: float = 30.0
 
     class ConfigDict:
         env_prefix = ""
@@ -1,6 +1,5 @@
 from app.core.repository.user_repository import UserRepository
 from app.core.repository.team_repository import TeamRepository
-from app.core.repository.user_tasks_repository import UserTasksRepository
 from app.core.repository.task_repository import TasksRepository
 from app.schema.repository.user import user as UserModel
 from app.schema.repository.team import team as TeamModel
@@ -60,15 +59,11 @@ class SystemPrompts:
                     f"Team attributes:\n{get_class_attributes_docstrings(TeamModel)}"
                 )
 
-            # User's current tasks
-            user_tasks_repo = UserTasksRepository()
+            # User's current tasks (no completion date)
             task_repo = TasksRepository()
-            task_ids = await user_tasks_repo.get_task_ids_for_user(db, str(user_obj.id))
-            tasks = await task_repo.get_tasks_by_ids(db, task_ids)
-            # Filter for tasks with no completion date
-            incomplete_tasks = [
-                t for t in tasks if getattr(t, "date_of_completion", None) is None
-            ]
+            incomplete_tasks = await task_repo.get_tasks_by_user(
+                db, user_obj.id, unfinished_only=True
+            )
             if incomplete_tasks:
                 tasks_context = f"{TaskModel.__doc__.strip()}\n" + "\n".join(
                     [f"- {t.task_name}: {t.description}" for t in incomplete_tasks]
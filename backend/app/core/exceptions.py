@@ -37,3 +37,9 @@ class LangGraphNodeError(Exception):
     """Raised when a LangGraph node fails."""
 
     pass
+
+
+class DagCycleError(Exception):
+    """Raised when an edge would introduce a cycle into a DAG."""
+
+    pass
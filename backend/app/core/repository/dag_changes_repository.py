@@ -0,0 +1,213 @@
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.schema.repository.dag import DagNodeSchema, DagEdgeSchema
+from app.schema.repository.dag_changes import (
+    DagChangeSchema,
+    DagSnapshotSchema,
+    DagChangeAction,
+    dag_change,
+    dag_snapshot,
+)
+from app.services.notification_service import notify
+from app.core.logger import logger
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+import uuid
+
+# asyncpg caps a statement at 32767 bind parameters
+_CHANGE_BATCH_SIZE = 5000
+
+# Writers of a team's DAGs take the lock exclusively until commit, so change seqs
+# of a team are committed in order and a reader never sees seq n + 1 before n
+_TEAM_LOCK_SQL = text(
+    "SELECT pg_advisory_xact_lock(hashtextextended(CAST(:team_id AS text), 0))"
+)
+_TEAM_LOCK_SHARED_SQL = text(
+    "SELECT pg_advisory_xact_lock_shared(hashtextextended(CAST(:team_id AS text), 0))"
+)
+
+
+class DagChangesRepository:
+    """Append-only log of DAG edits per team, with snapshot compaction."""
+
+    async def lock_team(self, db: AsyncSession, team_id: uuid.UUID, shared=False):
+        await db.execute(
+            _TEAM_LOCK_SHARED_SQL if shared else _TEAM_LOCK_SQL,
+            {"team_id": str(team_id)},
+        )
+
+    async def record(
+        self,
+        db: AsyncSession,
+        team_id: uuid.UUID,
+        action: DagChangeAction,
+        entries: Iterable[Tuple[uuid.UUID, Optional[uuid.UUID], Optional[uuid.UUID]]],
+    ):
+        """
+        Append (from_task, to_task, dag_id) entries in the caller's transaction.
+        The caller takes the team lock (lock_team) before reading the DAGs it
+        changes, and holds it until commit.
+        """
+        rows = [
+            {
+                "team_id": team_id,
+                "action": action.value,
+                "from_task": from_task,
+                "to_task": to_task,
+                "dag_id": dag_id,
+            }
+            for from_task, to_task, dag_id in entries
+        ]
+        if not rows:
+            return
+        seq = 0
+        for start in range(0, len(rows), _CHANGE_BATCH_SIZE):
+            result = await db.execute(
+                pg_insert(DagChangeSchema)
+                .values(rows[start : start + _CHANGE_BATCH_SIZE])
+                .returning(DagChangeSchema.seq)
+            )
+            seq = max(seq, max(result.scalars().all()))
+        # Subscribers pull the entries themselves from get_changes
+        await notify(db, {"kind": "dag", "team_id": team_id, "seq": seq})
+
+    async def get_latest_seq(self, db: AsyncSession, team_id: uuid.UUID) -> int:
+        """Highest committed seq of a team, 0 if it has no changes."""
+        return await self._latest_seq(db, team_id)
+
+    async def _latest_seq(self, db: AsyncSession, team_id: uuid.UUID) -> int:
+        result = await db.execute(
+            select(func.max(DagChangeSchema.seq)).where(
+                DagChangeSchema.team_id == team_id
+            )
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def _live_snapshot(
+        self, db: AsyncSession, team_id: uuid.UUID
+    ) -> dag_snapshot:
+        """Current edges and memberships; the caller holds the team lock."""
+        edges = await db.execute(
+            select(DagEdgeSchema.from_task, DagEdgeSchema.to_task).where(
+                DagEdgeSchema.team_id == team_id
+            )
+        )
+        nodes = await db.execute(
+            select(DagNodeSchema.task_id, DagNodeSchema.dag_id).where(
+                DagNodeSchema.team_id == team_id
+            )
+        )
+        return dag_snapshot(
+            seq=await self._latest_seq(db, team_id),
+            edges=[list(edge) for edge in edges.all()],
+            nodes=dict(nodes.all()),
+        )
+
+    async def get_changes(
+        self,
+        db: AsyncSession,
+        team_id: uuid.UUID,
+        since: Optional[int] = None,
+        limit: int = 1000,
+    ) -> dict:
+        """
+        Changes of a team after seq since, oldest first. Clients without a seq, or
+        with one older than what compaction kept, get a snapshot to start from and
+        the changes after it.
+        """
+        try:
+            logger.info(f"Fetching DAG changes for team {team_id} since {since}")
+            await self.lock_team(db, team_id, shared=True)
+            result = await db.execute(
+                select(DagSnapshotSchema).where(DagSnapshotSchema.team_id == team_id)
+            )
+            stored = result.scalar_one_or_none()
+            snapshot = None
+            if since is None or (stored and since < stored.compacted_through):
+                if stored is not None:
+                    snapshot = dag_snapshot(
+                        seq=stored.seq, edges=stored.edges, nodes=stored.nodes
+                    )
+                else:
+                    snapshot = await self._live_snapshot(db, team_id)
+                since = snapshot.seq
+            result = await db.execute(
+                select(DagChangeSchema)
+                .where(DagChangeSchema.team_id == team_id, DagChangeSchema.seq > since)
+                .order_by(DagChangeSchema.seq)
+                .limit(limit + 1)
+            )
+            rows = result.scalars().all()
+            changes = [dag_change.from_orm(row) for row in rows[:limit]]
+            latest_seq = changes[-1].seq if changes else since
+            # Ends the read transaction, releasing the shared lock
+            await db.commit()
+            return {
+                "snapshot": snapshot,
+                "changes": changes,
+                "latest_seq": latest_seq,
+                "has_more": len(rows) > limit,
+            }
+        except Exception as e:
+            logger.error(
+                f"Error fetching DAG changes for team {team_id}: {e}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching DAG changes: {e}"
+            )
+
+    async def compact(self, db: AsyncSession, retention: timedelta) -> int:
+        """
+        For every team with changes older than retention, store a snapshot of its
+        current state and delete those old changes. Returns the number of teams
+        compacted.
+        """
+        cutoff = datetime.now(timezone.utc) - retention
+        result = await db.execute(
+            select(DagChangeSchema.team_id)
+            .where(DagChangeSchema.created_at < cutoff)
+            .distinct()
+        )
+        team_ids: List[uuid.UUID] = list(result.scalars().all())
+        for team_id in team_ids:
+            await self.lock_team(db, team_id)
+            result = await db.execute(
+                select(func.max(DagChangeSchema.seq)).where(
+                    DagChangeSchema.team_id == team_id,
+                    DagChangeSchema.created_at < cutoff,
+                )
+            )
+            compacted_through = result.scalar_one()
+            snapshot = await self._live_snapshot(db, team_id)
+            stmt = pg_insert(DagSnapshotSchema).values(
+                team_id=team_id,
+                seq=snapshot.seq,
+                compacted_through=compacted_through,
+                edges=[[str(a), str(b)] for a, b in snapshot.edges],
+                nodes={str(k): str(v) for k, v in snapshot.nodes.items()},
+            )
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[DagSnapshotSchema.team_id],
+                    set_={
+                        "seq": stmt.excluded.seq,
+                        "compacted_through": stmt.excluded.compacted_through,
+                        "edges": stmt.excluded.edges,
+                        "nodes": stmt.excluded.nodes,
+                        "created_at": func.now(),
+                    },
+                )
+            )
+            await db.execute(
+                delete(DagChangeSchema).where(
+                    DagChangeSchema.team_id == team_id,
+                    DagChangeSchema.seq <= compacted_through,
+                )
+            )
+            await db.commit()
+            logger.info(
+                f"Compacted DAG changes of team {team_id} through seq {compacted_through}"
+            )
+        return len(team_ids)
@@ -1,18 +1,140 @@
-from sqlalchemy import select, update
+from sqlalchemy import select, update, delete, text, tuple_, func, literal, Text
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB, ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import flag_modified
 from fastapi import HTTPException
-from app.schema.repository.dag import DagSchema, dag
+from app.schema.repository.dag import (
+    DagSchema,
+    DagNodeSchema,
+    DagEdgeSchema,
+    DagAdjacencyList,
+    dag,
+    dag_task,
+)
+from app.schema.repository.tasks import TaskSchema
+from app.schema.repository.user_tasks import UserTasksSchema
+from app.schema.repository.dag_changes import DagChangeAction
+from app.core.repository.dag_changes_repository import DagChangesRepository
 from app.core.logger import logger
 import uuid
 from typing import List, Tuple, Dict, Set, Optional
 from dataclasses import dataclass
+from datetime import datetime
 from app.services.graph_service import (
     find_connected_nodes,
     split_graph,
     merge_graphs,
     connected_components,
+    reverse_graph,
+    find_split_components,
+    topological_order,
+    insert_edge_ordered,
 )
-from app.core.logger import logger
+from app.core.exceptions import DagCycleError
+from app.config.config import app_settings
+from collections import OrderedDict, Counter, defaultdict
+
+# asyncpg caps a statement at 32767 bind parameters
+_NODE_INDEX_BATCH_SIZE = 5000
+
+# Walks over dag_edges. Rows are deduplicated on (task_id, depth) when a depth
+# limit is given and on task_id alone otherwise, so neither form enumerates paths.
+_WALK_SQL = """
+WITH RECURSIVE walk(task_id) AS (
+    SELECT {next_col} FROM dag_edges WHERE {start_col} = :task_id
+    UNION
+    SELECT e.{next_col} FROM dag_edges e JOIN walk w ON e.{start_col} = w.task_id
+)
+SELECT task_id FROM walk
+"""
+
+_WALK_WITH_DEPTH_SQL = """
+WITH RECURSIVE walk(task_id, depth) AS (
+    SELECT {next_col}, 1 FROM dag_edges WHERE {start_col} = :task_id
+    UNION
+    SELECT e.{next_col}, w.depth + 1
+    FROM dag_edges e JOIN walk w ON e.{start_col} = w.task_id
+    WHERE w.depth < :max_depth
+)
+SELECT task_id FROM walk GROUP BY task_id ORDER BY MIN(depth)
+"""
+
+
+def _jsonb(value):
+    return literal(value, type_=JSONB)
+
+
+def _text_array(values):
+    return literal(list(values), type_=ARRAY(Text))
+
+
+def _jsonb_concat(left, right):
+    return left.op("||", return_type=JSONB)(right)
+
+
+def _jsonb_remove(value, keys):
+    """jsonb - text[]: drop object keys or string array elements."""
+    return value.op("-", return_type=JSONB)(_text_array(keys))
+
+
+class DagCache:
+    """
+    Process-wide LRU cache of parsed DAG models per team.
+
+    Entries are keyed by team_id and stamped with the set of (dag_id, version)
+    pairs they were built from, so a reader only has to fetch that small
+    signature to know whether the cached copy is current. The cache is bounded
+    by the total number of nodes held, not by the number of teams.
+
+    Models go in and come out as copies, so callers are free to mutate what
+    they are given without corrupting the cached entry.
+    """
+
+    def __init__(self, max_nodes: int):
+        self.max_nodes = max_nodes
+        self._entries: "OrderedDict[uuid.UUID, Tuple[frozenset, List[dag], int]]" = (
+            OrderedDict()
+        )
+        self._nodes = 0
+
+    @staticmethod
+    def _copy(dags: List[dag]) -> List[dag]:
+        # The graph is the only mutable part; ids are immutable
+        return [
+            d.model_copy(
+                update={"dag_graph": {k: list(v) for k, v in d.dag_graph.items()}}
+            )
+            for d in dags
+        ]
+
+    def get(self, team_id: uuid.UUID, signature: frozenset) -> Optional[List[dag]]:
+        entry = self._entries.get(team_id)
+        if entry is None:
+            return None
+        if entry[0] != signature:
+            self.invalidate(team_id)
+            return None
+        self._entries.move_to_end(team_id)
+        return self._copy(entry[1])
+
+    def put(self, team_id: uuid.UUID, signature: frozenset, dags: List[dag]):
+        self.invalidate(team_id)
+        size = sum(len(d.dag_graph) for d in dags)
+        if size > self.max_nodes:
+            return
+        self._entries[team_id] = (signature, self._copy(dags), size)
+        self._nodes += size
+        while self._nodes > self.max_nodes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._nodes -= evicted
+
+    def invalidate(self, team_id: uuid.UUID):
+        entry = self._entries.pop(team_id, None)
+        if entry is not None:
+            self._nodes -= entry[2]
+
+
+dag_cache = DagCache(app_settings.DAG_CACHE_MAX_NODES)
 
 
 @dataclass
@@ -21,9 +143,258 @@ class EdgeOperationResult:
     new_dag_id: Optional[uuid.UUID] = None
 
 
+@dataclass
+class EdgeOperation:
+    action: str  # "add_edges" or "delete_edges"
+    first_task_id: uuid.UUID
+    dependencies: List[uuid.UUID]
+
+
+@dataclass
+class DagScheduleInput:
+    """A DAG with what schedulers need per task: remaining hours and deadline."""
+
+    dag_id: uuid.UUID
+    team_id: uuid.UUID
+    version: int
+    graph: Dict[str, List[str]]
+    order: List[str]
+    # Estimated hours left per task; completed or unestimated tasks count as 0
+    durations: Dict[str, float]
+    deadlines: Dict[str, Optional[datetime]]
+    names: Dict[str, str]
+
+
 class DagRepository:
     def __init__(self):
         self.model = DagSchema
+        self.changes = DagChangesRepository()
+
+    def _topo_order_of(self, dag_obj: DagSchema) -> List[str]:
+        """The persisted topological order, computed once for rows that predate it."""
+        if dag_obj.topo_order is not None:
+            return list(dag_obj.topo_order)
+        return topological_order(dag_obj.dag_graph)
+
+    async def _get_dags_containing(
+        self, db: AsyncSession, team_id: uuid.UUID, task_ids: Set[str]
+    ) -> List[DagSchema]:
+        """Load only the team's DAGs that hold any of task_ids, using dag_nodes."""
+        dag_ids = select(DagNodeSchema.dag_id).where(
+            DagNodeSchema.team_id == team_id,
+            DagNodeSchema.task_id.in_([uuid.UUID(tid) for tid in task_ids]),
+        )
+        result = await db.execute(
+            select(DagSchema).where(DagSchema.dag_id.in_(dag_ids))
+        )
+        return list(result.scalars().all())
+
+    async def _index_nodes(
+        self,
+        db: AsyncSession,
+        dag_id: uuid.UUID,
+        team_id: uuid.UUID,
+        task_ids,
+    ):
+        """Point the dag_nodes entries of task_ids at dag_id."""
+        rows = [
+            {"task_id": uuid.UUID(str(tid)), "dag_id": dag_id, "team_id": team_id}
+            for tid in task_ids
+        ]
+        for start in range(0, len(rows), _NODE_INDEX_BATCH_SIZE):
+            stmt = pg_insert(DagNodeSchema).values(
+                rows[start : start + _NODE_INDEX_BATCH_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DagNodeSchema.task_id],
+                set_={
+                    "dag_id": stmt.excluded.dag_id,
+                    "team_id": stmt.excluded.team_id,
+                },
+            )
+            await db.execute(stmt)
+        await self.changes.record(
+            db,
+            team_id,
+            DagChangeAction.set_node,
+            [(row["task_id"], None, dag_id) for row in rows],
+        )
+
+    async def _unindex_nodes(self, db: AsyncSession, team_id: uuid.UUID, task_ids):
+        """Drop tasks that no longer belong to any DAG from dag_nodes."""
+        keys = [uuid.UUID(str(tid)) for tid in task_ids]
+        removed = []
+        for start in range(0, len(keys), _NODE_INDEX_BATCH_SIZE):
+            result = await db.execute(
+                delete(DagNodeSchema)
+                .where(
+                    DagNodeSchema.task_id.in_(
+                        keys[start : start + _NODE_INDEX_BATCH_SIZE]
+                    )
+                )
+                .returning(DagNodeSchema.task_id)
+            )
+            removed.extend(result.scalars().all())
+        await self.changes.record(
+            db,
+            team_id,
+            DagChangeAction.remove_node,
+            [(task_id, None, None) for task_id in removed],
+        )
+
+    async def _add_edge_rows(
+        self, db: AsyncSession, team_id: uuid.UUID, edges: List[Tuple[str, str]]
+    ):
+        """Mirror new adjacency list edges into dag_edges."""
+        rows = [
+            {
+                "team_id": team_id,
+                "from_task": uuid.UUID(str(first)),
+                "to_task": uuid.UUID(str(second)),
+            }
+            for first, second in edges
+        ]
+        inserted = []
+        for start in range(0, len(rows), _NODE_INDEX_BATCH_SIZE):
+            result = await db.execute(
+                pg_insert(DagEdgeSchema)
+                .values(rows[start : start + _NODE_INDEX_BATCH_SIZE])
+                .on_conflict_do_nothing()
+                .returning(DagEdgeSchema.from_task, DagEdgeSchema.to_task)
+            )
+            inserted.extend(result.tuples().all())
+        await self._adjust_open_dependencies(db, inserted, 1)
+        await self.changes.record(
+            db,
+            team_id,
+            DagChangeAction.add_edge,
+            [(first, second, None) for first, second in inserted],
+        )
+
+    async def _delete_edge_rows(
+        self, db: AsyncSession, team_id: uuid.UUID, edges: List[Tuple[str, str]]
+    ):
+        """Remove deleted adjacency list edges from dag_edges."""
+        keys = [
+            (uuid.UUID(str(first)), uuid.UUID(str(second))) for first, second in edges
+        ]
+        deleted = []
+        for start in range(0, len(keys), _NODE_INDEX_BATCH_SIZE):
+            result = await db.execute(
+                delete(DagEdgeSchema)
+                .where(
+                    tuple_(DagEdgeSchema.from_task, DagEdgeSchema.to_task).in_(
+                        keys[start : start + _NODE_INDEX_BATCH_SIZE]
+                    )
+                )
+                .returning(DagEdgeSchema.from_task, DagEdgeSchema.to_task)
+            )
+            deleted.extend(result.tuples().all())
+        await self._adjust_open_dependencies(db, deleted, -1)
+        await self.changes.record(
+            db,
+            team_id,
+            DagChangeAction.delete_edge,
+            [(first, second, None) for first, second in deleted],
+        )
+
+    async def _adjust_open_dependencies(
+        self,
+        db: AsyncSession,
+        edges: List[Tuple[uuid.UUID, uuid.UUID]],
+        sign: int,
+    ):
+        """
+        Move tasks.open_dependencies by sign for every added or removed edge whose
+        dependency is unfinished. Dependents sharing a delta share one UPDATE.
+
+        The unfinished dependencies are share-locked until commit. A completion
+        in flight is waited for and its row rechecked, and a later one waits
+        for this transaction, so its release sees these edges.
+        """
+        if not edges:
+            return
+        dependencies = sorted({second for _, second in edges})
+        unfinished = set()
+        for start in range(0, len(dependencies), _NODE_INDEX_BATCH_SIZE):
+            result = await db.execute(
+                select(TaskSchema.id)
+                .where(
+                    TaskSchema.id.in_(
+                        dependencies[start : start + _NODE_INDEX_BATCH_SIZE]
+                    ),
+                    TaskSchema.date_of_completion.is_(None),
+                )
+                .order_by(TaskSchema.id)
+                .with_for_update(read=True)
+            )
+            unfinished.update(result.scalars().all())
+        by_delta = defaultdict(list)
+        for dependent, count in Counter(
+            first for first, second in edges if second in unfinished
+        ).items():
+            by_delta[sign * count].append(dependent)
+        for delta, dependents in by_delta.items():
+            for start in range(0, len(dependents), _NODE_INDEX_BATCH_SIZE):
+                await db.execute(
+                    update(TaskSchema)
+                    .where(
+                        TaskSchema.id.in_(
+                            dependents[start : start + _NODE_INDEX_BATCH_SIZE]
+                        )
+                    )
+                    .values(open_dependencies=TaskSchema.open_dependencies + delta)
+                    .execution_options(synchronize_session=False)
+                )
+
+    async def _walk_edges(
+        self,
+        db: AsyncSession,
+        task_id: uuid.UUID,
+        max_depth: Optional[int],
+        start_col: str,
+        next_col: str,
+    ) -> List[uuid.UUID]:
+        if max_depth is None:
+            query = text(_WALK_SQL.format(start_col=start_col, next_col=next_col))
+            params = {"task_id": task_id}
+        else:
+            query = text(
+                _WALK_WITH_DEPTH_SQL.format(start_col=start_col, next_col=next_col)
+            )
+            params = {"task_id": task_id, "max_depth": max_depth}
+        result = await db.execute(query, params)
+        return [row[0] for row in result.fetchall()]
+
+    async def get_descendants(
+        self, db: AsyncSession, task_id: uuid.UUID, max_depth: Optional[int] = None
+    ) -> List[uuid.UUID]:
+        """Tasks that task_id transitively depends on, i.e. what blocks it."""
+        try:
+            logger.info(f"Fetching descendants of {task_id} (max_depth={max_depth})")
+            return await self._walk_edges(
+                db, task_id, max_depth, start_col="from_task", next_col="to_task"
+            )
+        except Exception as e:
+            logger.error(f"Error fetching descendants of {task_id}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching descendants: {e}"
+            )
+
+    async def get_ancestors(
+        self, db: AsyncSession, task_id: uuid.UUID, max_depth: Optional[int] = None
+    ) -> List[uuid.UUID]:
+        """Tasks that transitively depend on task_id, i.e. what it blocks."""
+        try:
+            logger.info(f"Fetching ancestors of {task_id} (max_depth={max_depth})")
+            return await self._walk_edges(
+                db, task_id, max_depth, start_col="to_task", next_col="from_task"
+            )
+        except Exception as e:
+            logger.error(f"Error fetching ancestors of {task_id}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching ancestors: {e}"
+            )
 
     async def get_dag(self, db: AsyncSession, dag_id: uuid.UUID) -> dag:
         try:
@@ -43,9 +414,50 @@ class DagRepository:
                 status_code=500, detail=f"Error fetching DAG {dag_id}: {e}"
             )
 
+    async def get_dag_version(self, db: AsyncSession, dag_id: uuid.UUID) -> int:
+        """Current version of a DAG, without loading its graph."""
+        result = await db.execute(
+            select(DagSchema.version).where(DagSchema.dag_id == dag_id)
+        )
+        version = result.scalar_one_or_none()
+        if version is None:
+            raise HTTPException(status_code=404, detail="DAG not found")
+        return version
+
+    async def get_dag_graph(
+        self, db: AsyncSession, dag_id: uuid.UUID
+    ) -> Tuple[Dict[str, List[str]], int]:
+        """A DAG's raw adjacency list together with the version it belongs to."""
+        result = await db.execute(
+            select(DagSchema.dag_graph, DagSchema.version).where(
+                DagSchema.dag_id == dag_id
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="DAG not found")
+        return row.dag_graph, row.version
+
+    async def _dag_versions(self, db: AsyncSession, team_id=None):
+        """(team_id, dag_id, version) rows, which is all a cache check needs."""
+        query = select(DagSchema.team_id, DagSchema.dag_id, DagSchema.version)
+        if team_id is not None:
+            query = query.where(DagSchema.team_id == team_id)
+        result = await db.execute(query)
+        signatures: Dict[uuid.UUID, Set[Tuple[uuid.UUID, int]]] = {}
+        for row_team_id, dag_id, version in result.all():
+            signatures.setdefault(row_team_id, set()).add((dag_id, version))
+        return {t: frozenset(sig) for t, sig in signatures.items()}
+
     async def get_dags_by_team(self, db: AsyncSession, team_id: uuid.UUID):
         try:
             logger.info(f"Fetching DAGs for team {team_id}")
+            signature = (await self._dag_versions(db, team_id)).get(
+                team_id, frozenset()
+            )
+            cached = dag_cache.get(team_id, signature)
+            if cached is not None:
+                return cached
             result = await db.execute(
                 select(DagSchema).where(DagSchema.team_id == team_id)
             )
@@ -55,6 +467,7 @@ class DagRepository:
                 dags.append(
                     dag(dag_id=obj.dag_id, team_id=obj.team_id, dag_graph=obj.dag_graph)
                 )
+            dag_cache.put(team_id, frozenset((o.dag_id, o.version) for o in objs), dags)
             return dags
         except Exception as e:
             logger.error(f"Error fetching DAGs for team {team_id}: {e}", exc_info=True)
@@ -62,17 +475,178 @@ class DagRepository:
                 status_code=500, detail=f"Error fetching DAGs for team {team_id}: {e}"
             )
 
+    async def get_team_bundle(
+        self, db: AsyncSession, team_id: uuid.UUID
+    ) -> Tuple[List[Tuple[DagAdjacencyList, List[dag_task]]], List[dag_task]]:
+        """
+        The team's DAGs paired with their tasks, plus the team's tasks that are in
+        no DAG. Graphs come from the DAG cache; tasks and their assignees are
+        loaded in one projected query grouped by their dag_nodes entry.
+        """
+        try:
+            logger.info(f"Fetching DAG bundle for team {team_id}")
+            dags = await self.get_dags_by_team(db, team_id)
+            result = await db.execute(
+                select(
+                    TaskSchema.id,
+                    TaskSchema.task_name,
+                    TaskSchema.team_id,
+                    TaskSchema.priority,
+                    TaskSchema.focus,
+                    TaskSchema.deadline,
+                    TaskSchema.points,
+                    TaskSchema.date_of_completion,
+                    TaskSchema.date_of_creation,
+                    TaskSchema.description,
+                    TaskSchema.notes,
+                    DagNodeSchema.dag_id,
+                    func.array_agg(UserTasksSchema.user_id)
+                    .filter(UserTasksSchema.user_id.isnot(None))
+                    .label("assigned_users"),
+                )
+                .outerjoin(DagNodeSchema, DagNodeSchema.task_id == TaskSchema.id)
+                .outerjoin(UserTasksSchema, UserTasksSchema.task_id == TaskSchema.id)
+                .where(TaskSchema.team_id == team_id)
+                .group_by(TaskSchema.id, DagNodeSchema.dag_id)
+            )
+            tasks_by_dag: Dict[Optional[uuid.UUID], List[dag_task]] = defaultdict(list)
+            for row in result.mappings().all():
+                fields = dict(row)
+                dag_id = fields.pop("dag_id")
+                fields["assigned_users"] = fields["assigned_users"] or []
+                tasks_by_dag[dag_id].append(dag_task(**fields))
+            bundles = [
+                (
+                    DagAdjacencyList(dag_id=d.dag_id, adjacency_list=d.dag_graph),
+                    tasks_by_dag.get(d.dag_id, []),
+                )
+                for d in dags
+            ]
+            return bundles, tasks_by_dag.get(None, [])
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Error fetching DAG bundle for team {team_id}: {e}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching DAG bundle for team: {e}"
+            )
+
+    async def get_dags_for_team(
+        self, db: AsyncSession, team_id: uuid.UUID
+    ) -> List[Tuple[DagAdjacencyList, List[dag_task]]]:
+        """(adjacency list, tasks) for each of the team's DAGs."""
+        bundles, _ = await self.get_team_bundle(db, team_id)
+        return bundles
+
+    async def get_schedule_inputs(
+        self,
+        db: AsyncSession,
+        dag_id: Optional[uuid.UUID] = None,
+        team_id: Optional[uuid.UUID] = None,
+    ) -> List[DagScheduleInput]:
+        """
+        Load one DAG (by dag_id) or all of a team's DAGs together with the task
+        fields scheduling needs, fetched in one dag_nodes join.
+        """
+        try:
+            logger.info(f"Fetching schedule inputs for DAG {dag_id} / team {team_id}")
+            query = select(DagSchema)
+            if dag_id is not None:
+                query = query.where(DagSchema.dag_id == dag_id)
+            if team_id is not None:
+                query = query.where(DagSchema.team_id == team_id)
+            objs = (await db.execute(query)).scalars().all()
+            if dag_id is not None and not objs:
+                raise HTTPException(status_code=404, detail="DAG not found")
+            if not objs:
+                return []
+
+            result = await db.execute(
+                select(
+                    DagNodeSchema.dag_id,
+                    TaskSchema.id,
+                    TaskSchema.task_name,
+                    TaskSchema.points,
+                    TaskSchema.deadline,
+                    TaskSchema.date_of_completion,
+                )
+                .join(TaskSchema, TaskSchema.id == DagNodeSchema.task_id)
+                .where(DagNodeSchema.dag_id.in_([obj.dag_id for obj in objs]))
+            )
+            rows_by_dag = defaultdict(list)
+            for row in result.all():
+                rows_by_dag[row[0]].append(row[1:])
+
+            inputs = []
+            for obj in objs:
+                durations, deadlines, names = {}, {}, {}
+                for task_id, name, points, deadline, completed in rows_by_dag[
+                    obj.dag_id
+                ]:
+                    key = str(task_id)
+                    durations[key] = 0.0 if completed or not points else float(points)
+                    deadlines[key] = None if completed else deadline
+                    names[key] = name
+                inputs.append(
+                    DagScheduleInput(
+                        dag_id=obj.dag_id,
+                        team_id=obj.team_id,
+                        version=obj.version,
+                        graph=obj.dag_graph,
+                        order=self._topo_order_of(obj),
+                        durations=durations,
+                        deadlines=deadlines,
+                        names=names,
+                    )
+                )
+            return inputs
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Error fetching schedule inputs for DAG {dag_id} / team {team_id}: {e}",
+                exc_info=True,
+            )
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching schedule inputs: {e}"
+            )
+
     async def get_all_dags(self, db: AsyncSession) -> List[dag]:
         try:
             logger.info(f"Fetching all DAGs")
-            result = await db.execute(select(DagSchema))
-            objs = result.scalars().all()
-            dags = []
-            for obj in objs:
-                dags.append(
-                    dag(dag_id=obj.dag_id, team_id=obj.team_id, dag_graph=obj.dag_graph)
+            signatures = await self._dag_versions(db)
+            dags_by_team = {}
+            stale_teams = []
+            for team_id, signature in signatures.items():
+                cached = dag_cache.get(team_id, signature)
+                if cached is None:
+                    stale_teams.append(team_id)
+                else:
+                    dags_by_team[team_id] = cached
+            if stale_teams:
+                logger.info(f"Loading DAGs for {len(stale_teams)} uncached teams")
+                result = await db.execute(
+                    select(DagSchema).where(DagSchema.team_id.in_(stale_teams))
                 )
-            return dags
+                loaded = {team_id: [] for team_id in stale_teams}
+                loaded_versions = {team_id: set() for team_id in stale_teams}
+                for obj in result.scalars().all():
+                    loaded[obj.team_id].append(
+                        dag(
+                            dag_id=obj.dag_id,
+                            team_id=obj.team_id,
+                            dag_graph=obj.dag_graph,
+                        )
+                    )
+                    loaded_versions[obj.team_id].add((obj.dag_id, obj.version))
+                for team_id, team_dags in loaded.items():
+                    dag_cache.put(
+                        team_id, frozenset(loaded_versions[team_id]), team_dags
+                    )
+                    dags_by_team[team_id] = team_dags
+            return [d for team_dags in dags_by_team.values() for d in team_dags]
         except Exception as e:
             logger.error(f"Error fetching all DAGs: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error fetching all DAGs: {e}")
@@ -88,50 +662,104 @@ class DagRepository:
             logger.info(
                 f"Adding edges from {first_task_id} to {dependencies} for team {team_id}"
             )
-            involved_task_ids = set(
-                [str(first_task_id)] + [str(dep) for dep in dependencies]
-            )
-            result = await db.execute(select(DagSchema))
-            dags = result.scalars().all()
-            dag_map = {}
-            for dag_obj in dags:
-                dag_graph = dag_obj.dag_graph
-                for tid in involved_task_ids:
-                    if tid in dag_graph:
-                        dag_map[tid] = dag_obj
-            involved_dags = set(dag_map.values())
+            first = str(first_task_id)
+            deps = list(dict.fromkeys(str(dep) for dep in dependencies))
+            involved_task_ids = set([first] + deps)
+            # Held until commit, so no concurrent edit can change these DAGs
+            # between the cycle check below and our writes
+            await self.changes.lock_team(db, team_id)
+            involved_dags = await self._get_dags_containing(
+                db, team_id, involved_task_ids
+            )
+            # Merge all involved DAGs (if any) along with their topological orders
+            merged_graph = {}
+            order = []
+            for dag_obj in involved_dags:
+                merged_graph.update({k: list(v) for k, v in dag_obj.dag_graph.items()})
+                order.extend(self._topo_order_of(dag_obj))
+            # New dependencies have no edges yet so they can go first, and a new
+            # dependent task can go last
+            new_deps = [dep for dep in deps if dep not in merged_graph and dep != first]
+            order = new_deps + order
+            if first not in merged_graph:
+                order.append(first)
+            for node in new_deps + [first]:
+                merged_graph.setdefault(node, [])
+            position = {node: index for index, node in enumerate(order)}
+            # Add all edges, rejecting any that would close a cycle
+            added = []
+            reordered = False
+            for dep in deps:
+                if dep not in merged_graph[first]:
+                    reordered |= insert_edge_ordered(
+                        merged_graph, order, position, first, dep
+                    )
+                    added.append((first, dep))
+
             if not involved_dags:
                 # No existing DAG, create new
-                dag_graph = {str(first_task_id): [str(dep) for dep in dependencies]}
-                for dep in dependencies:
-                    dag_graph.setdefault(str(dep), [])
-                new_dag = DagSchema(team_id=team_id, dag_graph=dag_graph)
+                new_dag = DagSchema(
+                    team_id=team_id, dag_graph=merged_graph, topo_order=order
+                )
                 db.add(new_dag)
-                await db.commit()
-                await db.refresh(new_dag)
-                logger.info(f"Created new DAG {new_dag.dag_id}")
-                return {"dag_id": new_dag.dag_id}
+                await db.flush()
+                dag_id = new_dag.dag_id
+                await self._index_nodes(db, dag_id, team_id, merged_graph)
+                logger.info(f"Created new DAG {dag_id}")
+            elif len(involved_dags) == 1:
+                # No components merge, so patch the existing row in place
+                dag_obj = involved_dags[0]
+                dag_id = dag_obj.dag_id
+                if added:
+                    new_nodes = {node: [] for node in new_deps}
+                    if dag_obj.topo_order is None or reordered:
+                        topo_order = _jsonb(order)
+                    else:
+                        appended = [] if first in dag_obj.dag_graph else [first]
+                        topo_order = _jsonb_concat(
+                            _jsonb_concat(_jsonb(new_deps), DagSchema.topo_order),
+                            _jsonb(appended),
+                        )
+                    await db.execute(
+                        update(DagSchema)
+                        .where(DagSchema.dag_id == dag_id)
+                        .values(
+                            dag_graph=func.jsonb_set(
+                                _jsonb_concat(DagSchema.dag_graph, _jsonb(new_nodes)),
+                                _text_array([first]),
+                                _jsonb_concat(
+                                    func.coalesce(
+                                        DagSchema.dag_graph[first], _jsonb([])
+                                    ),
+                                    _jsonb([dep for _, dep in added]),
+                                ),
+                                type_=JSONB,
+                            ),
+                            topo_order=topo_order,
+                            version=DagSchema.version + 1,
+                        )
+                    )
+                    await self._index_nodes(
+                        db,
+                        dag_id,
+                        team_id,
+                        [n for n in merged_graph if n not in dag_obj.dag_graph],
+                    )
+                logger.info(f"Updated DAG {dag_id} in place")
             else:
-                # Merge all involved DAGs into one
-                merged_graph = {}
-                for dag_obj in involved_dags:
-                    merged_graph.update(dag_obj.dag_graph)
-                # Add all edges
-                merged_graph.setdefault(str(first_task_id), [])
-                for dep in dependencies:
-                    merged_graph.setdefault(str(dep), [])
-                    if str(dep) not in merged_graph[str(first_task_id)]:
-                        merged_graph[str(first_task_id)].append(str(dep))
-                # Remove old DAGs
-                for dag_obj in involved_dags:
-                    await db.delete(dag_obj)
-                # Create new merged DAG
-                new_dag = DagSchema(team_id=team_id, dag_graph=merged_graph)
-                db.add(new_dag)
-                await db.commit()
-                await db.refresh(new_dag)
-                logger.info(f"Merged DAGs into new DAG {new_dag.dag_id}")
-                return {"dag_id": new_dag.dag_id}
+                # Components merge: the largest DAG absorbs the others
+                dag_id_map, dag_ids = await self._write_components(
+                    db, team_id, involved_dags, merged_graph, order, [set(merged_graph)]
+                )
+                dag_id = dag_ids[0]
+                logger.info(f"Merged DAGs {list(dag_id_map)} into DAG {dag_id}")
+            await self._add_edge_rows(db, team_id, added)
+            await db.commit()
+            dag_cache.invalidate(team_id)
+            return {"dag_id": dag_id}
+        except DagCycleError as e:
+            logger.warning(f"Rejected edges for team {team_id}: {e}")
+            raise HTTPException(status_code=409, detail=str(e))
         except Exception as e:
             logger.error(
                 f"Error adding edges from {first_task_id} to {dependencies} for team {team_id}: {e}",
@@ -150,13 +778,22 @@ class DagRepository:
             logger.info(
                 f"Deleting edges from {first_task_id} to {dependencies} in DAG {dag_id}"
             )
+            result = await db.execute(
+                select(DagSchema.team_id).where(DagSchema.dag_id == dag_id)
+            )
+            team_id = result.scalar_one_or_none()
+            if not team_id:
+                raise HTTPException(status_code=404, detail="DAG not found")
+            # The in-place patches below rewrite dag_graph and topo_order from
+            # this read, so no other edit of the team may land in between
+            await self.changes.lock_team(db, team_id)
             result = await db.execute(
                 select(DagSchema).where(DagSchema.dag_id == dag_id)
             )
             dag_obj = result.scalar_one_or_none()
             if not dag_obj:
                 raise HTTPException(status_code=404, detail="DAG not found")
-            dag_graph = dag_obj.dag_graph
+            dag_graph = {k: list(v) for k, v in dag_obj.dag_graph.items()}
             first = str(first_task_id)
             # Remove edges
             for dep in dependencies:
@@ -171,36 +808,268 @@ class DagRepository:
                         status_code=404,
                         detail=f"Edge from {first} to {dep_str} not found in DAG {dag_id}",
                     )
-            # Check for disconnected components (split)
-            components = connected_components(dag_graph)
+            await self._delete_edge_rows(
+                db, dag_obj.team_id, [(first, str(dep)) for dep in dependencies]
+            )
 
-            # Remove empty nodes (no outgoing or incoming edges)
-            def has_edges(node, graph):
-                return bool(graph.get(node, [])) or any(
-                    node in v for v in graph.values()
-                )
+            # Only the endpoints of removed edges can end up in a new component
+            reverse = reverse_graph(dag_graph)
+            endpoints = [first] + [str(dep) for dep in dependencies]
+            pieces = find_split_components(dag_graph, reverse, endpoints)
+            if sum(len(piece) for piece in pieces) == len(reverse):
+                # Every search finished, so the largest piece keeps the DAG row
+                pieces.remove(max(pieces, key=len))
+            moved_out = [n for piece in pieces for n in piece]
 
-            # Remove the old DAG
-            await db.delete(dag_obj)
+            # Removing edges never invalidates a topological order
+            order = None
+            if dag_obj.topo_order is None or any(len(p) > 1 for p in pieces):
+                order = self._topo_order_of(dag_obj)
             new_dag_ids = []
-            for comp in components:
-                # Only keep nodes with edges
-                new_graph = {
-                    n: [d for d in dag_graph[n] if d in comp]
-                    for n in comp
-                    if has_edges(n, dag_graph)
-                }
-                if new_graph:
-                    new_dag = DagSchema(team_id=dag_obj.team_id, dag_graph=new_graph)
-                    db.add(new_dag)
-                    await db.commit()
-                    await db.refresh(new_dag)
-                    new_dag_ids.append(new_dag.dag_id)
-            logger.info(f"Deleted edges and created new DAGs: {new_dag_ids}")
-            return {"new_dag_ids": new_dag_ids}
+            for piece in pieces:
+                if len(piece) == 1:
+                    # A lone endpoint with no edges left drops out of the DAG
+                    await self._unindex_nodes(db, dag_obj.team_id, piece)
+                    continue
+                new_dag = DagSchema(
+                    team_id=dag_obj.team_id,
+                    dag_graph={n: dag_graph[n] for n in piece},
+                    topo_order=[n for n in order if n in piece],
+                )
+                db.add(new_dag)
+                await db.flush()
+                await self._index_nodes(db, new_dag.dag_id, dag_obj.team_id, piece)
+                new_dag_ids.append(new_dag.dag_id)
+
+            kept_dag_id = dag_obj.dag_id
+            if len(reverse) - len(moved_out) == 1:
+                await self._unindex_nodes(
+                    db, dag_obj.team_id, set(reverse).difference(moved_out)
+                )
+                await db.delete(dag_obj)
+                kept_dag_id = None
+            else:
+                # Patch the kept row in place rather than rewriting it
+                if dag_obj.topo_order is None:
+                    moved_set = set(moved_out)
+                    topo_order = _jsonb([n for n in order if n not in moved_set])
+                else:
+                    topo_order = _jsonb_remove(DagSchema.topo_order, moved_out)
+                await db.execute(
+                    update(DagSchema)
+                    .where(DagSchema.dag_id == dag_obj.dag_id)
+                    .values(
+                        dag_graph=_jsonb_remove(
+                            func.jsonb_set(
+                                DagSchema.dag_graph,
+                                _text_array([first]),
+                                _jsonb_remove(
+                                    DagSchema.dag_graph[first],
+                                    [str(dep) for dep in dependencies],
+                                ),
+                                type_=JSONB,
+                            ),
+                            moved_out,
+                        ),
+                        topo_order=topo_order,
+                        version=DagSchema.version + 1,
+                    )
+                )
+            await db.commit()
+            dag_cache.invalidate(team_id)
+            logger.info(
+                f"Deleted edges in DAG {dag_id}, kept {kept_dag_id}, split off {new_dag_ids}"
+            )
+            return {"dag_id": kept_dag_id, "new_dag_ids": new_dag_ids}
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(
                 f"Error deleting edges from {first_task_id} to {dependencies} in DAG {dag_id}: {e}",
                 exc_info=True,
             )
             raise HTTPException(status_code=500, detail=f"Error deleting edges: {e}")
+
+    async def remove_tasks(
+        self, db: AsyncSession, team_id: uuid.UUID, task_ids: List[uuid.UUID]
+    ):
+        """
+        Take tasks that are about to be deleted out of the team's DAGs, in the
+        caller's transaction. Their edges and dag_nodes entries are removed and
+        recorded as changes, and DAGs that fall apart are split, rather than the
+        rows cascading away unrecorded and leaving the ids in dag_graph and
+        topo_order. Dependents lose the open dependency on each removed task.
+        The caller commits, then invalidates dag_cache.
+        """
+        await self.changes.lock_team(db, team_id)
+        removed = {str(task_id) for task_id in task_ids}
+        old_dags = await self._get_dags_containing(db, team_id, removed)
+        if not old_dags:
+            return
+        graph: Dict[str, List[str]] = {}
+        order = []
+        for dag_obj in old_dags:
+            graph.update({k: list(v) for k, v in dag_obj.dag_graph.items()})
+            order.extend(self._topo_order_of(dag_obj))
+        edges = [
+            (first, second)
+            for first, deps in graph.items()
+            for second in deps
+            if first in removed or second in removed
+        ]
+        # Dropping nodes keeps any topological order valid
+        graph = {
+            node: [dep for dep in deps if dep not in removed]
+            for node, deps in graph.items()
+            if node not in removed
+        }
+        order = [node for node in order if node not in removed]
+        await self._delete_edge_rows(db, team_id, edges)
+        await self._unindex_nodes(db, team_id, removed)
+        await self._write_components(
+            db, team_id, old_dags, graph, order, connected_components(graph)
+        )
+
+    async def _write_components(
+        self,
+        db: AsyncSession,
+        team_id: uuid.UUID,
+        old_dags: List[DagSchema],
+        graph: Dict[str, List[str]],
+        order: List[str],
+        components: List[Set[str]],
+    ) -> Tuple[Dict[uuid.UUID, List[uuid.UUID]], List[uuid.UUID]]:
+        """
+        Store components of graph as DAG rows, reusing old rows where possible.
+
+        Larger components go first and keep the old dag_id that holds most of their
+        nodes; anything left over gets a new row. Lone nodes without edges drop out
+        of the DAG, and old rows nobody reused are deleted. Returns a map from each
+        old dag_id to the dag_ids its nodes ended up in, and every resulting dag_id.
+        """
+        old_by_id = {dag_obj.dag_id: dag_obj for dag_obj in old_dags}
+        old_owner = {
+            node: dag_obj.dag_id for dag_obj in old_dags for node in dag_obj.dag_graph
+        }
+        dag_id_map: Dict[uuid.UUID, List[uuid.UUID]] = {d: [] for d in old_by_id}
+        unclaimed = set(old_by_id)
+        dag_ids = []
+        for component in sorted(components, key=len, reverse=True):
+            if len(component) == 1:
+                await self._unindex_nodes(db, team_id, component)
+                continue
+            component_graph = {n: graph[n] for n in component}
+            component_order = [n for n in order if n in component]
+            votes: Dict[uuid.UUID, int] = {}
+            for node in component:
+                owner = old_owner.get(node)
+                if owner in unclaimed:
+                    votes[owner] = votes.get(owner, 0) + 1
+            if votes:
+                dag_obj = old_by_id[max(votes, key=votes.get)]
+                unclaimed.discard(dag_obj.dag_id)
+                dag_obj.dag_graph = component_graph
+                dag_obj.topo_order = component_order
+                dag_obj.version = DagSchema.version + 1
+                flag_modified(dag_obj, "dag_graph")
+            else:
+                dag_obj = DagSchema(
+                    team_id=team_id,
+                    dag_graph=component_graph,
+                    topo_order=component_order,
+                )
+                db.add(dag_obj)
+            await db.flush()
+            dag_ids.append(dag_obj.dag_id)
+            moved = [n for n in component if old_owner.get(n) != dag_obj.dag_id]
+            await self._index_nodes(db, dag_obj.dag_id, team_id, moved)
+            for old_id in {old_owner[n] for n in component if n in old_owner}:
+                dag_id_map[old_id].append(dag_obj.dag_id)
+        for old_id in unclaimed:
+            await db.delete(old_by_id[old_id])
+        return dag_id_map, dag_ids
+
+    async def apply_edge_operations(
+        self,
+        db: AsyncSession,
+        team_id: uuid.UUID,
+        operations: List[EdgeOperation],
+    ):
+        """
+        Apply many add/delete edge operations to a team's DAGs in one transaction.
+
+        Operations run in order against the loaded graphs in memory, followed by a
+        single component pass and a single cycle check over the result. The team
+        lock is held from before the read until commit.
+        """
+        try:
+            logger.info(
+                f"Applying {len(operations)} edge operations for team {team_id}"
+            )
+            await self.changes.lock_team(db, team_id)
+            involved_task_ids = set()
+            for op in operations:
+                involved_task_ids.add(str(op.first_task_id))
+                involved_task_ids.update(str(dep) for dep in op.dependencies)
+            old_dags = await self._get_dags_containing(db, team_id, involved_task_ids)
+            graph: Dict[str, List[str]] = {}
+            for dag_obj in old_dags:
+                graph.update({k: list(v) for k, v in dag_obj.dag_graph.items()})
+
+            added: Set[Tuple[str, str]] = set()
+            removed: Set[Tuple[str, str]] = set()
+            for index, op in enumerate(operations):
+                first = str(op.first_task_id)
+                for dep in (str(d) for d in op.dependencies):
+                    edge = (first, dep)
+                    if op.action == "add_edges":
+                        graph.setdefault(first, [])
+                        graph.setdefault(dep, [])
+                        if dep not in graph[first]:
+                            graph[first].append(dep)
+                            if edge in removed:
+                                removed.discard(edge)
+                            else:
+                                added.add(edge)
+                    elif op.action == "delete_edges":
+                        if dep not in graph.get(first, []):
+                            raise HTTPException(
+                                status_code=404,
+                                detail=f"Operation {index}: edge from {first} to {dep} not found",
+                            )
+                        graph[first].remove(dep)
+                        if edge in added:
+                            added.discard(edge)
+                        else:
+                            removed.add(edge)
+                    else:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Operation {index}: invalid action {op.action}",
+                        )
+
+            order = topological_order(graph)
+            components = connected_components(graph)
+            dag_id_map, new_dag_ids = await self._write_components(
+                db, team_id, old_dags, graph, order, components
+            )
+            await self._delete_edge_rows(db, team_id, list(removed))
+            await self._add_edge_rows(db, team_id, list(added))
+            await db.commit()
+            dag_cache.invalidate(team_id)
+            logger.info(f"Applied edge operations for team {team_id}: {dag_id_map}")
+            return {"dag_id_map": dag_id_map, "new_dag_ids": new_dag_ids}
+        except HTTPException:
+            raise
+        except DagCycleError as e:
+            logger.warning(f"Rejected edge operations for team {team_id}: {e}")
+            raise HTTPException(
+                status_code=409, detail=f"Edge operations would create a cycle: {e}"
+            )
+        except Exception as e:
+            logger.error(
+                f"Error applying edge operations for team {team_id}: {e}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=500, detail=f"Error applying edge operations: {e}"
+            )
@@ -1,16 +1,90 @@
-from sqlalchemy import select, update, delete
+from sqlalchemy import (
+    select,
+    text,
+    and_,
+    or_,
+    distinct,
+    update,
+    delete,
+    func,
+    values,
+    column,
+    cast,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schema.repository.tasks import TaskSchema, task, TaskPriority, TaskFocus
+from sqlalchemy.orm import aliased
+from app.schema.repository.tasks import (
+    TaskSchema,
+    task,
+    task_search_hit,
+    task_similarity_hit,
+    TaskPriority,
+    TaskFocus,
+)
+from app.schema.repository.dag import DagEdgeSchema
+from app.schema.repository.user_tasks import UserTasksSchema
+from app.schema.repository.week import week_metrics
 from app.core.repository.base_repository import BaseRepository
+from app.core.repository.dag_repository import DagRepository, dag_cache
 from fastapi import HTTPException
+import base64
+import binascii
+import json
 import uuid
+from collections import defaultdict
 from datetime import datetime
+from typing import Optional
+from app.services.notification_service import notify
+from app.services.task_embedding_service import (
+    task_embedding_service,
+    task_embedding_text,
+    encode,
+)
 from app.core.logger import logger
+from app.config.config import app_settings
+
+# NOTIFY payloads are capped at 8000 bytes
+_NOTIFY_MAX_TASK_IDS = 100
+# Must match the text search configuration of tasks.search_vector
+_SEARCH_CONFIG = "english"
+# ts_rank_cd normalization 32 maps ranks into [0, 1)
+_SEARCH_RANK_NORMALIZATION = 32
+_SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+# Rows per multi-row INSERT / VALUES list, well under the 32767 bind limit
+_BULK_BATCH_SIZE = 1000
+_BULK_CREATE_FIELDS = (
+    "task_name",
+    "team_id",
+    "deadline",
+    "points",
+    "priority",
+    "focus",
+    "description",
+    "notes",
+)
+
+
+def encode_task_cursor(db_task) -> str:
+    """Opaque keyset cursor for the (date_of_creation, id) position of a task."""
+    key = json.dumps([db_task.date_of_creation.isoformat(), str(db_task.id)])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_task_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created), uuid.UUID(task_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 class TasksRepository(BaseRepository[TaskSchema]):
     def __init__(self):
         super().__init__(TaskSchema)
+        self.dag_repository = DagRepository()
 
     async def create_task(self, db: AsyncSession, task_data: dict) -> task:
         try:
@@ -27,8 +101,11 @@ class TasksRepository(BaseRepository[TaskSchema]):
 
             db_task = TaskSchema(**task_data)
             db.add(db_task)
+            await db.flush()
+            await self._notify(db, db_task.team_id, "create", [db_task.id])
             await db.commit()
             await db.refresh(db_task)
+            task_embedding_service.schedule([db_task.id])
             logger.info(f"Task created: {db_task}")
             return task.from_orm(db_task)
         except Exception as e:
@@ -47,12 +124,7 @@ class TasksRepository(BaseRepository[TaskSchema]):
                 # If no valid updates, return current task
                 return await self.get_by_id(db, task_id)
 
-            # First check if task exists
-            existing_task = await self.get_by_id(db, task_id)
-            if not existing_task:
-                raise HTTPException(status_code=404, detail="Task not found")
-
-            # Update the task
+            # Update the task; RETURNING doubles as the existence check
             result = await db.execute(
                 update(TaskSchema)
                 .where(TaskSchema.id == task_id)
@@ -63,29 +135,583 @@ class TasksRepository(BaseRepository[TaskSchema]):
             if not updated_task:
                 raise HTTPException(status_code=404, detail="Task not found")
 
+            await self._notify(db, updated_task.team_id, "edit", [task_id])
             await db.commit()
+            task_embedding_service.schedule_if_changed(task_id, updates)
             logger.info(f"Task updated: {updated_task}")
             return task.from_orm(updated_task)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error editing task {task_id}: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error editing task: {e}")
 
+    async def complete_task(
+        self, db: AsyncSession, task_id: uuid.UUID, updates: dict
+    ) -> task:
+        """
+        Mark a task complete and, on its first completion, release one open
+        dependency on every task that depends on it.
+        """
+        try:
+            logger.info(f"Completing task {task_id} with updates: {updates}")
+            updates = {k: v for k, v in updates.items() if v is not None}
+            updates.setdefault("date_of_completion", datetime.now())
+
+            # Only the unfinished -> finished transition touches dependents
+            result = await db.execute(
+                update(TaskSchema)
+                .where(
+                    TaskSchema.id == task_id,
+                    TaskSchema.date_of_completion.is_(None),
+                )
+                .values(**updates)
+                .returning(TaskSchema)
+            )
+            completed_task = result.scalar_one_or_none()
+            if not completed_task:
+                # Missing (404 from edit_task) or already complete; a task that
+                # is already complete keeps its completion date
+                updates.pop("date_of_completion", None)
+                return await self.edit_task(db, task_id, updates)
+
+            await self._release_dependents(db, [task_id])
+            await self._notify(db, completed_task.team_id, "complete", [task_id])
+            await db.commit()
+            task_embedding_service.schedule_if_changed(task_id, updates)
+            logger.info(f"Task completed: {completed_task}")
+            return task.from_orm(completed_task)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error completing task {task_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error completing task: {e}")
+
     async def delete_task(self, db: AsyncSession, task_id: uuid.UUID):
         try:
             logger.info(f"Deleting task {task_id}")
             result = await db.execute(
-                delete(TaskSchema).where(TaskSchema.id == task_id).returning(TaskSchema)
+                select(TaskSchema.team_id).where(TaskSchema.id == task_id)
             )
-            db_task = result.fetchone()
-            if not db_task:
+            team_id = result.scalar_one_or_none()
+            if not team_id:
                 raise HTTPException(status_code=404, detail="Task not found")
+            # Take it out of its DAG first, which unblocks its dependents and
+            # records the edges and node that would otherwise cascade away
+            await self.dag_repository.remove_tasks(db, team_id, [task_id])
+            result = await db.execute(
+                delete(TaskSchema).where(TaskSchema.id == task_id).returning(TaskSchema)
+            )
+            db_task = result.scalar_one()
+            await self._notify(db, db_task.team_id, "delete", [task_id])
             await db.commit()
+            dag_cache.invalidate(team_id)
             logger.info(f"Task deleted: {db_task}")
             return task.from_orm(db_task)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error deleting task {task_id}: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error deleting task: {e}")
 
+    async def bulk_apply(self, db: AsyncSession, operations: list[dict]) -> list[dict]:
+        """
+        Apply mixed create/edit/complete/delete operations in one transaction.
+
+        Each operation is a dict with an "action" and the TaskRequest fields it
+        sets. Operations are grouped by action and applied as creates, edits,
+        completes, then deletes, each as a few set-based statements. Invalid
+        items and unknown task ids are reported per item and do not abort the
+        batch; database errors roll back everything.
+        """
+        results = [
+            {"index": index, "action": op["action"], "success": False}
+            for index, op in enumerate(operations)
+        ]
+        creates, edits, completes, deletes = [], defaultdict(dict), {}, {}
+        edit_indexes = defaultdict(list)
+        for index, op in enumerate(operations):
+            action = op["action"]
+            fields = {
+                k: v
+                for k, v in op.items()
+                if v is not None and k not in ("action", "task_id")
+            }
+            if action == "create":
+                if not op.get("task_name") or not op.get("team_id"):
+                    results[index][
+                        "error"
+                    ] = "task_name and team_id are required for create"
+                    continue
+                creates.append((index, fields))
+                continue
+            task_id = op.get("task_id")
+            if not task_id:
+                results[index]["error"] = f"task_id is required for {action}"
+                continue
+            if action == "delete":
+                deletes.setdefault(task_id, []).append(index)
+                continue
+            # Fields sent with a complete are applied like an edit first, and
+            # later operations on the same task win
+            edits[task_id].update(fields)
+            if action == "complete":
+                completes.setdefault(task_id, []).append(index)
+            else:
+                edit_indexes[task_id].append(index)
+
+        try:
+            logger.info(
+                f"Bulk applying {len(creates)} creates, {len(edits)} edits, "
+                f"{len(completes)} completes, {len(deletes)} deletes"
+            )
+            touched = {}
+            created = await self._bulk_create(db, [fields for _, fields in creates])
+            for (index, _), db_task in zip(creates, created):
+                touched.setdefault(db_task.team_id, []).append(db_task.id)
+                results[index].update(success=True, result=task.from_orm(db_task))
+
+            found = await self._bulk_edit(db, edits)
+            await self._bulk_complete(db, [t for t in completes if t in found])
+
+            # Deleted tasks are reported as they were just before deletion
+            deleted = await self._bulk_delete(db, list(deletes))
+            for task_id, db_task in deleted.items():
+                touched.setdefault(db_task.team_id, []).append(task_id)
+                for index in deletes[task_id]:
+                    results[index].update(success=True, result=task.from_orm(db_task))
+
+            current = {
+                db_task.id: db_task
+                for db_task in await self.get_tasks_by_ids(
+                    db, list((edits.keys() & found) - deleted.keys())
+                )
+            }
+            current.update(deleted)
+            for task_id in edits:
+                indexes = edit_indexes.get(task_id, []) + completes.get(task_id, [])
+                db_task = current.get(task_id)
+                if db_task is None:
+                    for index in indexes:
+                        results[index]["error"] = "Task not found"
+                    continue
+                touched.setdefault(db_task.team_id, []).append(task_id)
+                for index in indexes:
+                    results[index].update(success=True, result=task.from_orm(db_task))
+            for task_id, indexes in deletes.items():
+                if task_id not in deleted:
+                    for index in indexes:
+                        results[index]["error"] = "Task not found"
+
+            for team_id, task_ids in touched.items():
+                task_ids = list(dict.fromkeys(task_ids))
+                await self._notify(db, team_id, "bulk", task_ids)
+            await db.commit()
+            for team_id in {db_task.team_id for db_task in deleted.values()}:
+                dag_cache.invalidate(team_id)
+
+            task_embedding_service.schedule(db_task.id for db_task in created)
+            for task_id, updates in edits.items():
+                if task_id in found and task_id not in deleted:
+                    task_embedding_service.schedule_if_changed(task_id, updates)
+            return results
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error applying bulk task operations: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error applying bulk task operations: {e}"
+            )
+
+    async def _bulk_create(self, db: AsyncSession, rows: list[dict]) -> list:
+        """Multi-row INSERT ... RETURNING, in input order."""
+        # Ids are generated here so every row has the same keys and results
+        # can be matched back to their input rows.
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                **{field: row.get(field) for field in _BULK_CREATE_FIELDS},
+                "priority": row.get("priority") or TaskPriority.LOW,
+                "focus": row.get("focus") or TaskFocus.LOW,
+            }
+            for row in rows
+        ]
+        created = {}
+        for start in range(0, len(rows), _BULK_BATCH_SIZE):
+            result = await db.execute(
+                pg_insert(TaskSchema)
+                .values(rows[start : start + _BULK_BATCH_SIZE])
+                .returning(TaskSchema)
+            )
+            created.update((db_task.id, db_task) for db_task in result.scalars())
+        return [created[row["id"]] for row in rows]
+
+    async def _bulk_edit(self, db: AsyncSession, edits: dict) -> set:
+        """
+        UPDATE tasks ... FROM (VALUES ...), one statement per distinct set of
+        updated columns. Returns the ids that exist.
+        """
+        found = set()
+        by_columns = defaultdict(list)
+        for task_id, updates in edits.items():
+            by_columns[tuple(sorted(updates))].append((task_id, updates))
+        for columns, group in by_columns.items():
+            for start in range(0, len(group), _BULK_BATCH_SIZE):
+                batch = group[start : start + _BULK_BATCH_SIZE]
+                if not columns:
+                    result = await db.execute(
+                        select(TaskSchema.id).where(
+                            TaskSchema.id.in_([task_id for task_id, _ in batch])
+                        )
+                    )
+                    found.update(result.scalars())
+                    continue
+                table_columns = [TaskSchema.__table__.c[name] for name in columns]
+                rows = values(
+                    column("id", UUID(as_uuid=True)),
+                    *[column(c.name, c.type) for c in table_columns],
+                    name="bulk_updates",
+                ).data(
+                    [
+                        (task_id, *[updates[name] for name in columns])
+                        for task_id, updates in batch
+                    ]
+                )
+                # Cast explicitly so VALUES columns never fall back to text
+                result = await db.execute(
+                    update(TaskSchema)
+                    .where(TaskSchema.id == cast(rows.c.id, UUID(as_uuid=True)))
+                    .values(
+                        {c.name: cast(rows.c[c.name], c.type) for c in table_columns}
+                    )
+                    .returning(TaskSchema.id)
+                    .execution_options(synchronize_session=False)
+                )
+                found.update(result.scalars())
+        return found
+
+    async def _bulk_complete(self, db: AsyncSession, task_ids: list):
+        """
+        Complete unfinished tasks and release their dependents. Tasks already
+        complete keep their completion date.
+        """
+        completed = []
+        for start in range(0, len(task_ids), _BULK_BATCH_SIZE):
+            result = await db.execute(
+                update(TaskSchema)
+                .where(
+                    TaskSchema.id.in_(task_ids[start : start + _BULK_BATCH_SIZE]),
+                    TaskSchema.date_of_completion.is_(None),
+                )
+                .values(date_of_completion=datetime.now())
+                .returning(TaskSchema.id)
+                .execution_options(synchronize_session=False)
+            )
+            completed.extend(result.scalars())
+        if completed:
+            await self._release_dependents(db, completed)
+
+    async def _bulk_delete(self, db: AsyncSession, task_ids: list) -> dict:
+        """
+        Delete tasks after taking them out of their DAGs (see delete_task),
+        keyed by id. The caller invalidates dag_cache for their teams.
+        """
+        if not task_ids:
+            return {}
+        deleted = {}
+        for start in range(0, len(task_ids), _BULK_BATCH_SIZE):
+            batch = task_ids[start : start + _BULK_BATCH_SIZE]
+            result = await db.execute(
+                select(TaskSchema.id, TaskSchema.team_id).where(
+                    TaskSchema.id.in_(batch)
+                )
+            )
+            by_team = defaultdict(list)
+            for task_id, team_id in result.all():
+                by_team[team_id].append(task_id)
+            # Lock teams in a fixed order so concurrent batches can't deadlock
+            for team_id in sorted(by_team):
+                await self.dag_repository.remove_tasks(db, team_id, by_team[team_id])
+            result = await db.execute(
+                delete(TaskSchema)
+                .where(TaskSchema.id.in_(batch))
+                .returning(TaskSchema)
+                .execution_options(synchronize_session=False)
+            )
+            deleted.update((db_task.id, db_task) for db_task in result.scalars())
+        return deleted
+
+    async def _notify(self, db: AsyncSession, team_id, action: str, task_ids: list):
+        """
+        Tell the team's subscribers which tasks changed, once db commits. Large
+        batches send no ids, which tells clients to refetch.
+        """
+        if len(task_ids) > _NOTIFY_MAX_TASK_IDS:
+            task_ids = None
+        await notify(
+            db,
+            {
+                "kind": "task",
+                "team_id": team_id,
+                "action": action,
+                "task_ids": task_ids,
+            },
+        )
+
+    async def _release_dependents(self, db: AsyncSession, task_ids: list):
+        """
+        Decrement open_dependencies of every task depending on task_ids, once per
+        edge.
+        """
+        counts = (
+            select(DagEdgeSchema.from_task, func.count().label("released"))
+            .where(DagEdgeSchema.to_task.in_(task_ids))
+            .group_by(DagEdgeSchema.from_task)
+            .subquery()
+        )
+        await db.execute(
+            update(TaskSchema)
+            .where(TaskSchema.id == counts.c.from_task)
+            .values(open_dependencies=TaskSchema.open_dependencies - counts.c.released)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_ready_tasks(
+        self, db: AsyncSession, team_id: uuid.UUID, limit: int = 100
+    ) -> list[task]:
+        """
+        Unfinished tasks of a team with no unfinished dependencies, highest
+        priority first, then earliest deadline. Served by tasks_ready_idx.
+        """
+        try:
+            logger.info(f"Getting ready tasks for team {team_id}")
+            result = await db.execute(
+                select(TaskSchema)
+                .where(
+                    TaskSchema.team_id == team_id,
+                    TaskSchema.date_of_completion.is_(None),
+                    TaskSchema.open_dependencies == 0,
+                )
+                .order_by(
+                    TaskSchema.priority.desc(),
+                    TaskSchema.deadline.asc().nulls_last(),
+                    TaskSchema.date_of_creation,
+                )
+                .limit(limit)
+            )
+            return [task.from_orm(obj) for obj in result.scalars().all()]
+        except Exception as e:
+            logger.error(
+                f"Error getting ready tasks for team {team_id}: {e}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=500, detail=f"Error getting ready tasks: {e}"
+            )
+
+    async def get_tasks_page(
+        self,
+        db: AsyncSession,
+        team_id: Optional[uuid.UUID] = None,
+        priority: Optional[list[TaskPriority]] = None,
+        focus: Optional[list[TaskFocus]] = None,
+        completed: Optional[bool] = None,
+        deadline_from: Optional[datetime] = None,
+        deadline_to: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> tuple[list[task], Optional[str]]:
+        """
+        One page of tasks in (date_of_creation, id) order, starting after
+        cursor. Returns the page and the cursor for the next one, or None
+        when there are no more tasks.
+        """
+        try:
+            logger.info(f"Getting tasks page for team {team_id} after {cursor}")
+            query = select(TaskSchema)
+            if team_id is not None:
+                query = query.where(TaskSchema.team_id == team_id)
+            if priority:
+                query = query.where(TaskSchema.priority.in_(priority))
+            if focus:
+                query = query.where(TaskSchema.focus.in_(focus))
+            if completed is not None:
+                query = query.where(
+                    TaskSchema.date_of_completion.is_not(None)
+                    if completed
+                    else TaskSchema.date_of_completion.is_(None)
+                )
+            if deadline_from is not None:
+                query = query.where(TaskSchema.deadline >= deadline_from)
+            if deadline_to is not None:
+                query = query.where(TaskSchema.deadline <= deadline_to)
+            if cursor:
+                query = query.where(
+                    tuple_(TaskSchema.date_of_creation, TaskSchema.id)
+                    > tuple_(*decode_task_cursor(cursor))
+                )
+            # One extra row tells whether another page exists
+            result = await db.execute(
+                query.order_by(TaskSchema.date_of_creation, TaskSchema.id).limit(
+                    limit + 1
+                )
+            )
+            rows = result.scalars().all()
+            next_cursor = None
+            if len(rows) > limit:
+                next_cursor = encode_task_cursor(rows[limit - 1])
+            return [task.from_orm(obj) for obj in rows[:limit]], next_cursor
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting tasks page: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error getting tasks page: {e}"
+            )
+
+    async def search_tasks(
+        self,
+        db: AsyncSession,
+        query: str,
+        team_id: Optional[uuid.UUID] = None,
+        completed: Optional[bool] = None,
+        limit: int = 20,
+    ) -> list[task_search_hit]:
+        """
+        Ranked full-text search over task names, descriptions and notes.
+
+        Accepts web search syntax ("quoted phrases", or, -excluded). Matches
+        come from tasks_search_idx and are ranked with ts_rank_cd; only the
+        top limit rows get highlighted, since ts_headline reparses the text.
+        """
+        try:
+            logger.info(f"Searching tasks for {query!r} in team {team_id}")
+            tsquery = func.websearch_to_tsquery(_SEARCH_CONFIG, query)
+            rank = func.ts_rank_cd(
+                TaskSchema.search_vector, tsquery, _SEARCH_RANK_NORMALIZATION
+            )
+            ranked = select(TaskSchema.id, rank.label("rank")).where(
+                TaskSchema.search_vector.bool_op("@@")(tsquery)
+            )
+            if team_id is not None:
+                ranked = ranked.where(TaskSchema.team_id == team_id)
+            if completed is not None:
+                ranked = ranked.where(
+                    TaskSchema.date_of_completion.is_not(None)
+                    if completed
+                    else TaskSchema.date_of_completion.is_(None)
+                )
+            ranked = ranked.order_by(rank.desc(), TaskSchema.id).limit(limit).subquery()
+            body = func.concat_ws(" ... ", TaskSchema.description, TaskSchema.notes)
+            result = await db.execute(
+                select(
+                    TaskSchema,
+                    ranked.c.rank,
+                    func.ts_headline(
+                        _SEARCH_CONFIG,
+                        TaskSchema.task_name,
+                        tsquery,
+                        "HighlightAll=true",
+                    ),
+                    func.ts_headline(
+                        _SEARCH_CONFIG, body, tsquery, _SEARCH_HEADLINE_OPTIONS
+                    ),
+                    func.to_tsvector(_SEARCH_CONFIG, body).bool_op("@@")(tsquery),
+                )
+                .join(ranked, ranked.c.id == TaskSchema.id)
+                .order_by(ranked.c.rank.desc(), TaskSchema.id)
+            )
+            return [
+                task_search_hit(
+                    result=task.from_orm(obj),
+                    rank=rank,
+                    name_highlight=name_highlight,
+                    snippet=snippet if body_matches else None,
+                )
+                for obj, rank, name_highlight, snippet, body_matches in result.all()
+            ]
+        except Exception as e:
+            logger.error(f"Error searching tasks for {query!r}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error searching tasks: {e}")
+
+    async def search_similar_tasks(
+        self,
+        db: AsyncSession,
+        query: Optional[str] = None,
+        task_id: Optional[uuid.UUID] = None,
+        team_id: Optional[uuid.UUID] = None,
+        completed: Optional[bool] = None,
+        deadline_from: Optional[datetime] = None,
+        deadline_to: Optional[datetime] = None,
+        limit: int = 10,
+    ) -> list[task_similarity_hit]:
+        """
+        Nearest tasks by embedding to a search text, or to an existing task
+        (which is left out of its own results). Served by the HNSW index with
+        the filters applied during the scan, so ef_search is raised to leave
+        enough candidates after filtering. Tasks not yet embedded never match.
+        """
+        try:
+            logger.info(f"Searching tasks similar to {query or task_id}")
+            if task_id is not None:
+                result = await db.execute(
+                    select(
+                        TaskSchema.task_name,
+                        TaskSchema.description,
+                        TaskSchema.notes,
+                        TaskSchema.embedding,
+                    ).where(TaskSchema.id == task_id)
+                )
+                row = result.one_or_none()
+                if row is None:
+                    raise HTTPException(status_code=404, detail="Task not found")
+                embedding = row.embedding
+                if embedding is None:
+                    # Not embedded yet; encode it now rather than fail
+                    embedding = await encode(
+                        task_embedding_text(row.task_name, row.description, row.notes)
+                    )
+            elif query:
+                embedding = await encode(query)
+            else:
+                raise HTTPException(
+                    status_code=400, detail="query or task_id is required"
+                )
+
+            distance = TaskSchema.embedding.cosine_distance(embedding)
+            similar = select(TaskSchema, distance.label("distance")).where(
+                TaskSchema.embedding.is_not(None)
+            )
+            if task_id is not None:
+                similar = similar.where(TaskSchema.id != task_id)
+            if team_id is not None:
+                similar = similar.where(TaskSchema.team_id == team_id)
+            if completed is not None:
+                similar = similar.where(
+                    TaskSchema.date_of_completion.is_not(None)
+                    if completed
+                    else TaskSchema.date_of_completion.is_(None)
+                )
+            if deadline_from is not None:
+                similar = similar.where(TaskSchema.deadline >= deadline_from)
+            if deadline_to is not None:
+                similar = similar.where(TaskSchema.deadline <= deadline_to)
+
+            await db.execute(
+                text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+                {"ef_search": str(max(app_settings.TASK_KNN_EF_SEARCH, limit))},
+            )
+            result = await db.execute(similar.order_by(distance).limit(limit))
+            return [
+                task_similarity_hit(result=task.from_orm(obj), distance=d)
+                for obj, d in result.all()
+            ]
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error searching similar tasks: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error searching similar tasks: {e}"
+            )
+
     async def get_by_id(self, db: AsyncSession, task_id: uuid.UUID) -> task:
         try:
             logger.info(f"Getting task by id: {task_id}")
@@ -119,18 +745,26 @@ class TasksRepository(BaseRepository[TaskSchema]):
                 status_code=500, detail=f"Error getting tasks by ids: {e}"
             )
 
-    async def get_tasks_by_user(self, db: AsyncSession, user_id):
+    def _user_tasks_query(self, user_id):
+        """
+        Tasks assigned to user_id, as a join through user_tasks so the planner
+        sees one query instead of a client-built IN list. Callers add filters.
+        """
+        return (
+            select(TaskSchema)
+            .join(UserTasksSchema, UserTasksSchema.task_id == TaskSchema.id)
+            .where(UserTasksSchema.user_id == user_id)
+        )
+
+    async def get_tasks_by_user(
+        self, db: AsyncSession, user_id, unfinished_only: bool = False
+    ):
         try:
             logger.info(f"Getting tasks for user: {user_id}")
-            from app.core.repository.user_tasks_repository import UserTasksRepository
-
-            user_tasks_repo = UserTasksRepository()
-            task_ids = await user_tasks_repo.get_task_ids_for_user(db, user_id)
-            if not task_ids:
-                return []
-            result = await db.execute(
-                select(TaskSchema).where(TaskSchema.id.in_(task_ids))
-            )
+            query = self._user_tasks_query(user_id)
+            if unfinished_only:
+                query = query.where(TaskSchema.date_of_completion.is_(None))
+            result = await db.execute(query)
             return [task.from_orm(obj) for obj in result.scalars().all()]
         except Exception as e:
             logger.error(f"Error getting tasks for user {user_id}: {e}", exc_info=True)
@@ -145,15 +779,8 @@ class TasksRepository(BaseRepository[TaskSchema]):
             logger.info(
                 f"Getting completed tasks for user {user_id} in range {start_date} to {end_date}"
             )
-            from app.core.repository.user_tasks_repository import UserTasksRepository
-
-            user_tasks_repo = UserTasksRepository()
-            task_ids = await user_tasks_repo.get_task_ids_for_user(db, user_id)
-            if not task_ids:
-                return []
             result = await db.execute(
-                select(TaskSchema).where(
-                    TaskSchema.id.in_(task_ids),
+                self._user_tasks_query(user_id).where(
                     TaskSchema.date_of_completion != None,
                     TaskSchema.date_of_completion >= start_date,
                     TaskSchema.date_of_completion <= end_date,
@@ -177,15 +804,8 @@ class TasksRepository(BaseRepository[TaskSchema]):
             logger.info(
                 f"Getting unfinished tasks for user {user_id} before {end_date}"
             )
-            from app.core.repository.user_tasks_repository import UserTasksRepository
-
-            user_tasks_repo = UserTasksRepository()
-            task_ids = await user_tasks_repo.get_task_ids_for_user(db, user_id)
-            if not task_ids:
-                return []
             result = await db.execute(
-                select(TaskSchema).where(
-                    TaskSchema.id.in_(task_ids),
+                self._user_tasks_query(user_id).where(
                     TaskSchema.date_of_completion == None,
                     TaskSchema.deadline <= end_date,
                 )
@@ -206,15 +826,8 @@ class TasksRepository(BaseRepository[TaskSchema]):
         Return all tasks for a user that are either unfinished OR were finished between start_date and end_date.
         """
         try:
-            from app.core.repository.user_tasks_repository import UserTasksRepository
-
-            user_tasks_repo = UserTasksRepository()
-            task_ids = await user_tasks_repo.get_task_ids_for_user(db, user_id)
-            if not task_ids:
-                return []
             result = await db.execute(
-                select(TaskSchema).where(
-                    TaskSchema.id.in_(task_ids),
+                self._user_tasks_query(user_id).where(
                     (
                         (TaskSchema.date_of_completion == None)
                         | (
@@ -234,3 +847,97 @@ class TasksRepository(BaseRepository[TaskSchema]):
                 status_code=500,
                 detail=f"Error getting relevant tasks for user in week: {e}",
             )
+
+    async def get_week_metrics(
+        self, db: AsyncSession, start_date, end_date, user_ids: Optional[list] = None
+    ) -> dict:
+        """
+        week_metrics for every user with relevant tasks in [start_date,
+        end_date], or only for user_ids, keyed by user id. Users without any
+        relevant task are absent.
+
+        Three grouped queries replace the per-user, per-task lookups:
+        aggregates over tasks joined to assignees, collaborators from a
+        user_tasks self-join, and the relevant tasks themselves.
+        """
+        try:
+            logger.info(
+                f"Computing week metrics for {len(user_ids) if user_ids else 'all'} "
+                f"users from {start_date} to {end_date}"
+            )
+            completion = TaskSchema.date_of_completion
+            completed_in_window = completion.between(start_date, end_date)
+            relevant = or_(completion.is_(None), completed_in_window)
+            # Still open with the deadline before the week ended, or finished
+            # this week after the deadline
+            missed = or_(
+                and_(completion.is_(None), TaskSchema.deadline < end_date),
+                and_(completion > start_date, completion > TaskSchema.deadline),
+            )
+
+            def for_users(query, column):
+                return query.where(column.in_(user_ids)) if user_ids else query
+
+            assignment = UserTasksSchema
+            aggregates = await db.execute(
+                for_users(
+                    select(
+                        assignment.user_id,
+                        func.array_agg(TaskSchema.id).filter(missed),
+                        func.array_agg(TaskSchema.id).filter(completed_in_window),
+                        func.coalesce(
+                            func.sum(TaskSchema.points).filter(completed_in_window), 0
+                        ),
+                    )
+                    .join(TaskSchema, TaskSchema.id == assignment.task_id)
+                    .where(relevant),
+                    assignment.user_id,
+                ).group_by(assignment.user_id)
+            )
+            metrics = {
+                user_id: week_metrics(
+                    user_id=user_id,
+                    missed_deadlines=missed_ids or [],
+                    completed_tasks=completed_ids or [],
+                    points_completed=points,
+                )
+                for user_id, missed_ids, completed_ids, points in aggregates.all()
+            }
+
+            me, other = aliased(UserTasksSchema), aliased(UserTasksSchema)
+            collaborators = await db.execute(
+                for_users(
+                    select(me.user_id, func.array_agg(distinct(other.user_id)))
+                    .join(TaskSchema, TaskSchema.id == me.task_id)
+                    .join(
+                        other,
+                        and_(other.task_id == me.task_id, other.user_id != me.user_id),
+                    )
+                    .where(
+                        or_(
+                            completion.is_(None),
+                            and_(completion > start_date, completion < end_date),
+                        )
+                    ),
+                    me.user_id,
+                ).group_by(me.user_id)
+            )
+            for user_id, collaborator_ids in collaborators.all():
+                metrics[user_id].collaborators = collaborator_ids
+
+            tasks = await db.execute(
+                for_users(
+                    select(assignment.user_id, TaskSchema)
+                    .join(TaskSchema, TaskSchema.id == assignment.task_id)
+                    .where(relevant),
+                    assignment.user_id,
+                )
+            )
+            for user_id, obj in tasks.all():
+                metrics[user_id].tasks.append(task.from_orm(obj))
+            return metrics
+        except Exception as e:
+            logger.error(f"Error computing week metrics: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error computing week metrics: {e}"
+            )
@@ -0,0 +1,346 @@
+from sqlalchemy import select, update, func, exists, literal, or_, and_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.schema.repository.week_jobs import (
+    WeekJobRunSchema,
+    WeekJobSchema,
+    WeekJobRunStatus,
+    WeekJobStatus,
+    WeekJobPriority,
+    week_job_run,
+    week_job,
+    claimed_week_job,
+)
+from app.schema.repository.user import UserSchema
+from app.core.logger import logger
+from datetime import datetime, timedelta
+from typing import List, Optional
+import uuid
+
+
+class WeekJobsRepository:
+    """
+    Weekly analysis runs and the job queue behind them. A run fixes its window
+    and holds one job per user. Workers in any process claim jobs with
+    FOR UPDATE SKIP LOCKED under a lease they keep renewing, so each job is
+    worked by one worker at a time, and a job whose worker died is claimed
+    again once its lease lapses.
+    """
+
+    async def start_run(
+        self, db: AsyncSession, start_date: datetime, end_date: datetime
+    ) -> week_job_run:
+        """
+        The run for this window, with a pending job for every user who has none
+        in it yet. A run that already finished, e.g. one holding only on-demand
+        jobs, is reopened if users were added. Safe to call repeatedly for the
+        same window.
+        """
+        try:
+            await db.execute(
+                pg_insert(WeekJobRunSchema)
+                .values(start_date=start_date, end_date=end_date)
+                .on_conflict_do_nothing(index_elements=["start_date", "end_date"])
+            )
+            result = await db.execute(
+                select(WeekJobRunSchema).where(
+                    WeekJobRunSchema.start_date == start_date,
+                    WeekJobRunSchema.end_date == end_date,
+                )
+            )
+            run = result.scalar_one()
+            added = await db.execute(
+                pg_insert(WeekJobSchema)
+                .from_select(
+                    ["run_id", "user_id"],
+                    select(literal(run.id), UserSchema.id),
+                )
+                .on_conflict_do_nothing(index_elements=["run_id", "user_id"])
+                .returning(WeekJobSchema.id)
+            )
+            if added.first() is not None:
+                await self._reopen_run(db, run.id)
+                await db.refresh(run)
+            await db.commit()
+            return week_job_run.from_orm(run)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error starting week job run: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error starting week job run: {e}"
+            )
+
+    async def enqueue_user_week(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        start_date: datetime,
+        end_date: datetime,
+        priority: int = WeekJobPriority.on_demand,
+    ) -> week_job:
+        """
+        The user's job in the run for this window, queued ahead of the rest of
+        the run. A job that is already pending or running is returned as it is,
+        with its priority raised. One that finished, done or failed, is queued
+        again with a fresh attempt budget, so the week can be retried or
+        regenerated on demand.
+        """
+        try:
+            user_exists = await db.execute(
+                select(UserSchema.id).where(UserSchema.id == user_id)
+            )
+            if user_exists.scalar_one_or_none() is None:
+                raise HTTPException(status_code=404, detail="User not found")
+            await db.execute(
+                pg_insert(WeekJobRunSchema)
+                .values(start_date=start_date, end_date=end_date)
+                .on_conflict_do_nothing(index_elements=["start_date", "end_date"])
+            )
+            result = await db.execute(
+                select(WeekJobRunSchema.id).where(
+                    WeekJobRunSchema.start_date == start_date,
+                    WeekJobRunSchema.end_date == end_date,
+                )
+            )
+            run_id = result.scalar_one()
+            finished = WeekJobSchema.status.in_(
+                [WeekJobStatus.done.value, WeekJobStatus.failed.value]
+            )
+
+            def requeued(value, current):
+                return case((finished, value), else_=current)
+
+            stmt = pg_insert(WeekJobSchema).values(
+                run_id=run_id, user_id=user_id, priority=int(priority)
+            )
+            result = await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["run_id", "user_id"],
+                    set_={
+                        "status": requeued(
+                            WeekJobStatus.pending.value, WeekJobSchema.status
+                        ),
+                        "attempts": requeued(0, WeekJobSchema.attempts),
+                        "error": requeued(None, WeekJobSchema.error),
+                        "claimed_by": requeued(None, WeekJobSchema.claimed_by),
+                        "lease_until": requeued(None, WeekJobSchema.lease_until),
+                        "priority": func.greatest(
+                            WeekJobSchema.priority, stmt.excluded.priority
+                        ),
+                        "updated_at": func.now(),
+                    },
+                ).returning(WeekJobSchema)
+            )
+            job = week_job.from_orm(result.scalar_one())
+            await self._reopen_run(db, run_id)
+            await db.commit()
+            return job
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error enqueuing week job: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Error enqueuing week job: {e}"
+            )
+
+    async def _reopen_run(self, db: AsyncSession, run_id: uuid.UUID):
+        """Mark a run running again after jobs were added to it or requeued."""
+        await db.execute(
+            update(WeekJobRunSchema)
+            .where(
+                WeekJobRunSchema.id == run_id,
+                WeekJobRunSchema.status != WeekJobRunStatus.running.value,
+            )
+            .values(status=WeekJobRunStatus.running.value, completed_at=None)
+        )
+
+    async def get_job(self, db: AsyncSession, job_id: uuid.UUID) -> week_job:
+        result = await db.execute(
+            select(WeekJobSchema).where(WeekJobSchema.id == job_id)
+        )
+        obj = result.scalar_one_or_none()
+        if not obj:
+            raise HTTPException(status_code=404, detail="Week job not found")
+        return week_job.from_orm(obj)
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        worker_id: str,
+        limit: int,
+        lease: timedelta,
+        max_attempts: int,
+        min_priority: Optional[int] = None,
+    ) -> List[claimed_week_job]:
+        """
+        Claim up to limit jobs for worker_id, highest priority then oldest first:
+        pending jobs and running jobs whose lease has lapsed, optionally only
+        those of at least min_priority. Rows locked by a concurrent claim are
+        skipped rather than waited on. Lapsed jobs that have already been
+        claimed max_attempts times are failed instead.
+        """
+        lapsed = and_(
+            WeekJobSchema.status == WeekJobStatus.running.value,
+            WeekJobSchema.lease_until < func.now(),
+        )
+        await db.execute(
+            update(WeekJobSchema)
+            .where(lapsed, WeekJobSchema.attempts >= max_attempts)
+            .values(
+                status=WeekJobStatus.failed.value,
+                error=f"Lease expired after {max_attempts} attempts",
+                updated_at=func.now(),
+            )
+        )
+        claimable = (
+            select(WeekJobSchema.id)
+            .where(
+                or_(WeekJobSchema.status == WeekJobStatus.pending.value, lapsed),
+                WeekJobSchema.attempts < max_attempts,
+            )
+            .order_by(WeekJobSchema.priority.desc(), WeekJobSchema.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if min_priority is not None:
+            claimable = claimable.where(WeekJobSchema.priority >= min_priority)
+        claimed = (
+            update(WeekJobSchema)
+            .where(WeekJobSchema.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=WeekJobStatus.running.value,
+                claimed_by=worker_id,
+                lease_until=func.now() + lease,
+                attempts=WeekJobSchema.attempts + 1,
+                updated_at=func.now(),
+            )
+            .returning(WeekJobSchema.id, WeekJobSchema.run_id, WeekJobSchema.user_id)
+            .cte("claimed")
+        )
+        result = await db.execute(
+            select(
+                claimed.c.id,
+                claimed.c.run_id,
+                claimed.c.user_id,
+                WeekJobRunSchema.start_date,
+                WeekJobRunSchema.end_date,
+            ).join(WeekJobRunSchema, WeekJobRunSchema.id == claimed.c.run_id)
+        )
+        jobs = [claimed_week_job(**row._mapping) for row in result.all()]
+        await db.commit()
+        return jobs
+
+    async def renew_leases(self, db: AsyncSession, worker_id: str, lease: timedelta):
+        await db.execute(
+            update(WeekJobSchema)
+            .where(
+                WeekJobSchema.claimed_by == worker_id,
+                WeekJobSchema.status == WeekJobStatus.running.value,
+            )
+            .values(lease_until=func.now() + lease)
+        )
+        await db.commit()
+
+    async def release(self, db: AsyncSession, worker_id: str):
+        """Hand worker_id's running jobs back to the queue, uncounted."""
+        await db.execute(
+            update(WeekJobSchema)
+            .where(
+                WeekJobSchema.claimed_by == worker_id,
+                WeekJobSchema.status == WeekJobStatus.running.value,
+            )
+            .values(
+                status=WeekJobStatus.pending.value,
+                claimed_by=None,
+                lease_until=None,
+                attempts=WeekJobSchema.attempts - 1,
+                updated_at=func.now(),
+            )
+        )
+        await db.commit()
+
+    async def mark_done(
+        self,
+        db: AsyncSession,
+        job_id: uuid.UUID,
+        week_id: uuid.UUID,
+        worker_id: str,
+    ):
+        # Only the worker holding the job may finish it; one whose lease lapsed
+        # may have been claimed again, and the new claim owns it now
+        await db.execute(
+            update(WeekJobSchema)
+            .where(
+                WeekJobSchema.id == job_id,
+                WeekJobSchema.claimed_by == worker_id,
+                WeekJobSchema.status == WeekJobStatus.running.value,
+            )
+            .values(
+                status=WeekJobStatus.done.value,
+                week_id=week_id,
+                error=None,
+                lease_until=None,
+                updated_at=func.now(),
+            )
+        )
+        await db.commit()
+
+    async def mark_failed(
+        self,
+        db: AsyncSession,
+        job_ids: List[uuid.UUID],
+        error: str,
+        worker_id: str,
+        max_attempts: int,
+    ):
+        """
+        Record a failed attempt at worker_id's jobs. Jobs with attempts left go
+        back to the queue for another claim; the rest are failed for good.
+        """
+        # As in mark_done, only jobs still held by worker_id
+        exhausted = WeekJobSchema.attempts >= max_attempts
+        await db.execute(
+            update(WeekJobSchema)
+            .where(
+                WeekJobSchema.id.in_(job_ids),
+                WeekJobSchema.claimed_by == worker_id,
+                WeekJobSchema.status == WeekJobStatus.running.value,
+            )
+            .values(
+                status=case(
+                    (exhausted, WeekJobStatus.failed.value),
+                    else_=WeekJobStatus.pending.value,
+                ),
+                claimed_by=case((exhausted, WeekJobSchema.claimed_by), else_=None),
+                error=error,
+                lease_until=None,
+                updated_at=func.now(),
+            )
+        )
+        await db.commit()
+
+    async def complete_run_if_finished(
+        self, db: AsyncSession, run_id: uuid.UUID
+    ) -> bool:
+        """Mark the run completed once none of its jobs is pending or running."""
+        unfinished = exists().where(
+            WeekJobSchema.run_id == run_id,
+            WeekJobSchema.status.in_(
+                [WeekJobStatus.pending.value, WeekJobStatus.running.value]
+            ),
+        )
+        result = await db.execute(
+            update(WeekJobRunSchema)
+            .where(
+                WeekJobRunSchema.id == run_id,
+                WeekJobRunSchema.status == WeekJobRunStatus.running.value,
+                ~unfinished,
+            )
+            .values(status=WeekJobRunStatus.completed.value, completed_at=func.now())
+            .returning(WeekJobRunSchema.id)
+        )
+        completed = result.scalar_one_or_none() is not None
+        await db.commit()
+        return completed
@@ -1,4 +1,5 @@
 from sqlalchemy import select, and_, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional, Tuple
 from app.core.repository.base_repository import BaseRepository
 from app.schema.repository.week import WeekSchema, week
@@ -122,14 +123,29 @@ class WeekRepository(BaseRepository[WeekSchema]):
             raise
 
     async def store_week(self, db, week_and_vector: tuple[week, list[float]]):
+        """
+        Insert the week, or overwrite the user's existing week with the same
+        start_date, so re-running an analysis never duplicates weeks.
+        """
         try:
             week_obj, embedding = week_and_vector
             week_data = week_obj.model_dump()
             week_data["embedding"] = embedding
-            db_week = WeekSchema(**week_data)
-            db.add(db_week)
+            if week_data.get("id") is None:
+                week_data.pop("id", None)
+            stmt = pg_insert(WeekSchema).values(**week_data)
+            stmt = stmt.on_conflict_do_update(
+                constraint="week_user_start_key",
+                # The existing row keeps its id, so references to it stay valid
+                set_={
+                    key: stmt.excluded[key]
+                    for key in week_data
+                    if key not in ("id", "user_id", "start_date")
+                },
+            ).returning(WeekSchema)
+            result = await db.execute(stmt)
+            db_week = result.scalar_one()
             await db.commit()
-            await db.refresh(db_week)
             return week.from_orm(db_week)
         except Exception as e:
             logger.exception(f"Exception in store_week: {e}")
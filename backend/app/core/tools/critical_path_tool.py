@@ -0,0 +1,74 @@
+from app.schema.llm.tool import (
+    AbstractTool,
+    ToolSchema,
+    ToolFunction,
+    ToolFunctionParameters,
+    ToolParameterProperty,
+)
+from typing import Callable, ClassVar, List
+import uuid
+from app.services.critical_path_service import critical_path_service, CriticalPath
+from app.core.logger import logger
+
+
+class CriticalPathTool(AbstractTool):
+    """Tool for finding the longest dependency chains in a team's task DAGs."""
+
+    tool_schema: ClassVar[ToolSchema] = ToolSchema(
+        type="function",
+        function=ToolFunction(
+            name="CriticalPathTool",
+            description="Compute the critical path of each of a team's task dependency graphs. Returns, per graph, the total remaining hours along the longest dependency chain and the tasks on that chain, plus the tasks that cannot make their own deadline or a dependent's at the estimated hours (late_tasks, negative slack). Use this to answer what is holding a project up or how long it will take at minimum.",
+            parameters=ToolFunctionParameters(
+                type="object",
+                properties={
+                    "team_id": ToolParameterProperty(
+                        type="string",
+                        description="The team ID (UUID) whose dependency graphs to analyze.",
+                    ),
+                    "number_of_dags": ToolParameterProperty(
+                        type="integer",
+                        description="Number of graphs to return, longest first.",
+                        minimum=1,
+                        maximum=50,
+                        default=5,
+                    ),
+                },
+                required=["team_id"],
+            ),
+        ),
+    )
+
+    @classmethod
+    def tool_function(cls) -> Callable:
+        return cls.critical_paths
+
+    @classmethod
+    async def critical_paths(
+        cls,
+        team_id: str,
+        number_of_dags: int = 5,
+        db=None,  # db session should be injected by the caller
+    ) -> List[CriticalPath]:
+        """
+        Critical paths of the team's longest DAGs. Only the tasks on each critical
+        path or running late are included, to keep the tool result small.
+        """
+        try:
+            results = await critical_path_service.get_team_critical_paths(
+                db, uuid.UUID(team_id)
+            )
+            trimmed = []
+            for result in results[:number_of_dags]:
+                on_path = set(result.critical_path) | set(result.late_tasks)
+                trimmed.append(
+                    result.model_copy(
+                        update={
+                            "tasks": [t for t in result.tasks if t.task_id in on_path]
+                        }
+                    )
+                )
+            return trimmed
+        except Exception as e:
+            logger.error(f"Exception in CriticalPathTool.critical_paths: {e}")
+            raise
@@ -0,0 +1,74 @@
+from app.schema.llm.tool import (
+    AbstractTool,
+    ToolSchema,
+    ToolFunction,
+    ToolFunctionParameters,
+    ToolParameterProperty,
+)
+from typing import Callable, ClassVar, List
+import uuid
+from app.services.forecast_service import forecast_service, DagForecast
+from app.core.logger import logger
+
+
+class ForecastTool(AbstractTool):
+    """Tool for probabilistic delivery dates of a team's task DAGs."""
+
+    tool_schema: ClassVar[ToolSchema] = ToolSchema(
+        type="function",
+        function=ToolFunction(
+            name="ForecastTool",
+            description="Forecast when each of a team's task dependency graphs will finish by simulating task durations around their point estimates. Returns P50 and P90 finish dates per graph and the tasks most likely to miss their deadlines. Use this for questions about delivery dates or deadline risk.",
+            parameters=ToolFunctionParameters(
+                type="object",
+                properties={
+                    "team_id": ToolParameterProperty(
+                        type="string",
+                        description="The team ID (UUID) whose dependency graphs to forecast.",
+                    ),
+                    "number_of_tasks": ToolParameterProperty(
+                        type="integer",
+                        description="Number of at-risk tasks to return per graph, most likely to miss first.",
+                        minimum=1,
+                        maximum=50,
+                        default=10,
+                    ),
+                },
+                required=["team_id"],
+            ),
+        ),
+    )
+
+    @classmethod
+    def tool_function(cls) -> Callable:
+        return cls.forecast
+
+    @classmethod
+    async def forecast(
+        cls,
+        team_id: str,
+        number_of_tasks: int = 10,
+        db=None,  # db session should be injected by the caller
+    ) -> List[DagForecast]:
+        """
+        Forecasts for all of the team's DAGs, keeping only the tasks with a
+        deadline and a non-zero miss probability.
+        """
+        try:
+            forecasts = await forecast_service.get_team_forecasts(
+                db, uuid.UUID(team_id)
+            )
+            trimmed = []
+            for forecast in forecasts:
+                at_risk = sorted(
+                    (t for t in forecast.tasks if t.miss_probability),
+                    key=lambda t: t.miss_probability,
+                    reverse=True,
+                )
+                trimmed.append(
+                    forecast.model_copy(update={"tasks": at_risk[:number_of_tasks]})
+                )
+            return trimmed
+        except Exception as e:
+            logger.error(f"Exception in ForecastTool.forecast: {e}")
+            raise
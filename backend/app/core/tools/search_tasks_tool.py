@@ -0,0 +1,79 @@
+from app.schema.llm.tool import (
+    AbstractTool,
+    ToolSchema,
+    ToolFunction,
+    ToolFunctionParameters,
+    ToolParameterProperty,
+)
+from typing import Callable, ClassVar, List, Optional
+import uuid
+from app.core.repository.task_repository import TasksRepository
+from app.schema.repository.tasks import task_search_hit
+from app.core.logger import logger
+
+
+class SearchTasksTool(AbstractTool):
+    """Tool for full-text search over a team's tasks."""
+
+    tool_schema: ClassVar[ToolSchema] = ToolSchema(
+        type="function",
+        function=ToolFunction(
+            name="SearchTasksTool",
+            description='Search a team\'s tasks by keywords in their names, descriptions and notes. Returns the best matching tasks with highlighted snippets. Supports "quoted phrases", or, and -excluded words. Use this to find specific tasks the user mentions.',
+            parameters=ToolFunctionParameters(
+                type="object",
+                properties={
+                    "query": ToolParameterProperty(
+                        type="string",
+                        description="Keywords to search for. Prefer a few distinctive words from the user's question over the whole question.",
+                    ),
+                    "team_id": ToolParameterProperty(
+                        type="string",
+                        description="The team ID (UUID) whose tasks to search.",
+                    ),
+                    "completed": ToolParameterProperty(
+                        type="boolean",
+                        description="True for only completed tasks, false for only unfinished tasks. Omit to search both.",
+                        default=None,
+                    ),
+                    "number_of_tasks": ToolParameterProperty(
+                        type="integer",
+                        description="Number of tasks to return.",
+                        minimum=1,
+                        maximum=50,
+                        default=10,
+                    ),
+                },
+                required=["query", "team_id"],
+            ),
+        ),
+    )
+
+    @classmethod
+    def tool_function(cls) -> Callable:
+        return cls.search_tasks
+
+    @classmethod
+    async def search_tasks(
+        cls,
+        query: str,
+        team_id: str,
+        completed: Optional[bool] = None,
+        number_of_tasks: int = 10,
+        db=None,  # db session should be injected by the caller
+    ) -> List[task_search_hit]:
+        """
+        Ranked full-text search over the team's tasks.
+        """
+        try:
+            repo = TasksRepository()
+            return await repo.search_tasks(
+                db,
+                query,
+                team_id=uuid.UUID(team_id),
+                completed=completed,
+                limit=number_of_tasks,
+            )
+        except Exception as e:
+            logger.error(f"Exception in SearchTasksTool.search_tasks: {e}")
+            raise
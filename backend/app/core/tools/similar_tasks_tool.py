@@ -0,0 +1,106 @@
+from app.schema.llm.tool import (
+    AbstractTool,
+    ToolSchema,
+    ToolFunction,
+    ToolFunctionParameters,
+    ToolParameterProperty,
+)
+from typing import Callable, ClassVar, List, Optional
+from datetime import datetime
+import uuid
+from app.core.repository.task_repository import TasksRepository
+from app.schema.repository.tasks import task_similarity_hit
+from app.core.logger import logger
+
+
+class SimilarTasksTool(AbstractTool):
+    """Tool for semantic search over tasks by meaning rather than keywords."""
+
+    tool_schema: ClassVar[ToolSchema] = ToolSchema(
+        type="function",
+        function=ToolFunction(
+            name="SimilarTasksTool",
+            description="Find tasks similar in meaning to a description, or to an existing task. Returns the closest tasks first. Use this for questions like 'have we done something like this before' or 'what other tasks are like this one', where exact keywords may differ.",
+            parameters=ToolFunctionParameters(
+                type="object",
+                properties={
+                    "query": ToolParameterProperty(
+                        type="string",
+                        description="A description of the kind of task to look for. Either query or task_id is required.",
+                        default=None,
+                    ),
+                    "task_id": ToolParameterProperty(
+                        type="string",
+                        description="The ID (UUID) of a task to find similar tasks to. Either query or task_id is required.",
+                        default=None,
+                    ),
+                    "team_id": ToolParameterProperty(
+                        type="string",
+                        description="Only return tasks of this team (UUID).",
+                        default=None,
+                    ),
+                    "completed": ToolParameterProperty(
+                        type="boolean",
+                        description="True for only completed tasks, false for only unfinished tasks. Omit to search both.",
+                        default=None,
+                    ),
+                    "deadline_from": ToolParameterProperty(
+                        type="string",
+                        description="Only return tasks with a deadline on or after this date (ISO 8601 format).",
+                        default=None,
+                    ),
+                    "deadline_to": ToolParameterProperty(
+                        type="string",
+                        description="Only return tasks with a deadline on or before this date (ISO 8601 format).",
+                        default=None,
+                    ),
+                    "number_of_tasks": ToolParameterProperty(
+                        type="integer",
+                        description="Number of tasks to return.",
+                        minimum=1,
+                        maximum=50,
+                        default=10,
+                    ),
+                },
+            ),
+        ),
+    )
+
+    @classmethod
+    def tool_function(cls) -> Callable:
+        return cls.similar_tasks
+
+    @classmethod
+    async def similar_tasks(
+        cls,
+        query: Optional[str] = None,
+        task_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        completed: Optional[bool] = None,
+        deadline_from: Optional[str] = None,
+        deadline_to: Optional[str] = None,
+        number_of_tasks: int = 10,
+        db=None,  # db session should be injected by the caller
+    ) -> List[task_similarity_hit]:
+        """
+        Nearest tasks by embedding, after the metadata filters.
+        """
+        try:
+            repo = TasksRepository()
+            return await repo.search_similar_tasks(
+                db,
+                query=query,
+                task_id=uuid.UUID(task_id) if task_id else None,
+                team_id=uuid.UUID(team_id) if team_id else None,
+                completed=completed,
+                deadline_from=(
+                    datetime.fromisoformat(deadline_from) if deadline_from else None
+                ),
+                deadline_to=(
+                    datetime.fromisoformat(deadline_to) if deadline_to else None
+                ),
+                limit=number_of_tasks,
+            )
+        except Exception as e:
+            logger.error(f"Exception in SimilarTasksTool.similar_tasks: {e}")
+            raise
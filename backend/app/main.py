@@ -17,7 +17,11 @@ from app.api.dag import router as dags_router
 from app.api.user_tasks import router as user_tasks_router
 from app.api.week import router as weeks_router
 from app.api.agentic import router as agentic_router
+from app.api.events import router as events_router
 from app.services.scheduler_service import scheduler_service
+from app.services.notification_service import notification_service
+from app.services.task_embedding_service import task_embedding_service
+from app.services.week_queue_service import week_queue_worker
 
 app = FastAPI(
     title="Dagger API",
@@ -45,19 +49,26 @@ app.include_router(dags_router)
 app.include_router(user_tasks_router)
 app.include_router(weeks_router)
 app.include_router(agentic_router)
+app.include_router(events_router)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Start the scheduler when the application starts."""
-    scheduler_service.start()
+    """Start the scheduler, the notification listener, the task embedder and the week job worker when the application starts."""
+    await scheduler_service.start()
+    await notification_service.start()
+    await task_embedding_service.start()
+    await week_queue_worker.start()
     logger.info("Application started")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop the scheduler when the application shuts down."""
-    scheduler_service.stop()
+    """Stop the scheduler, the notification listener, the task embedder and the week job worker when the application shuts down."""
+    await scheduler_service.stop()
+    await notification_service.stop()
+    await task_embedding_service.stop()
+    await week_queue_worker.stop()
     logger.info("Application shutdown")
 
 
@@ -4,8 +4,9 @@ from app.services.database_service import Base
 from sqlalchemy import Column, ForeignKey, text
 import uuid
 from typing import Dict, List, Any, Optional
-from app.schema.repository.tasks import task
-from sqlalchemy import String
+from app.schema.repository.tasks import task, TaskPriority, TaskFocus
+from datetime import datetime
+from sqlalchemy import String, BigInteger
 
 
 class DagAdjacencyList(BaseModel):
@@ -13,6 +14,25 @@ class DagAdjacencyList(BaseModel):
     adjacency_list: Dict[uuid.UUID, list[uuid.UUID]]
 
 
+class dag_task(BaseModel):
+    """A task projected to the fields the graph view renders and edits, with its assignees."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: uuid.UUID
+    task_name: str
+    team_id: uuid.UUID
+    priority: TaskPriority
+    focus: TaskFocus
+    deadline: Optional[datetime] = None
+    points: Optional[int] = None
+    date_of_completion: Optional[datetime] = None
+    date_of_creation: Optional[datetime] = None
+    description: Optional[str] = None
+    notes: Optional[str] = None
+    assigned_users: List[uuid.UUID] = []
+
+
 class dag(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -37,3 +57,39 @@ class DagSchema(Base):
         UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False
     )
     dag_graph = Column(JSONB, nullable=False)  # Store as JSON string
+    # Task ids with every dependency before its dependents; null on legacy rows
+    topo_order = Column(JSONB, nullable=True)
+    # Bumped on every in-place edit so cached copies can be validated cheaply
+    version = Column(BigInteger, nullable=False, server_default=text("1"))
+
+
+class DagNodeSchema(Base):
+    """Index of which DAG each task currently lives in."""
+
+    __tablename__ = "dag_nodes"
+
+    task_id = Column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    dag_id = Column(
+        UUID(as_uuid=True), ForeignKey("dag.dag_id", ondelete="CASCADE"), nullable=False
+    )
+    team_id = Column(
+        UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False
+    )
+
+
+class DagEdgeSchema(Base):
+    """Normalized DAG edges: from_task depends on to_task."""
+
+    __tablename__ = "dag_edges"
+
+    team_id = Column(
+        UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False
+    )
+    from_task = Column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    to_task = Column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
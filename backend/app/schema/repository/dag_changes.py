@@ -0,0 +1,87 @@
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.services.database_service import Base
+from sqlalchemy import Column, ForeignKey, BigInteger, Text, TIMESTAMP, text
+import uuid
+from typing import Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class DagChangeAction(str, Enum):
+    add_edge = "add_edge"
+    delete_edge = "delete_edge"
+    set_node = "set_node"
+    remove_node = "remove_node"
+
+
+class dag_change(BaseModel):
+    """
+    One entry of a team's DAG change log. Replaying entries in seq order over a
+    snapshot reproduces the team's edges and which DAG each task belongs to.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    seq: int
+    action: DagChangeAction
+    from_task: uuid.UUID
+    to_task: Optional[uuid.UUID] = None
+    dag_id: Optional[uuid.UUID] = None
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm(cls, obj):
+        return cls(
+            seq=obj.seq,
+            action=obj.action,
+            from_task=obj.from_task,
+            to_task=obj.to_task,
+            dag_id=obj.dag_id,
+            created_at=obj.created_at,
+        )
+
+
+class dag_snapshot(BaseModel):
+    """A team's edges and task -> dag_id membership as of seq."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    seq: int
+    edges: List[List[uuid.UUID]]
+    nodes: Dict[uuid.UUID, uuid.UUID]
+
+
+class DagChangeSchema(Base):
+    __tablename__ = "dag_changes"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    team_id = Column(
+        UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False
+    )
+    action = Column(Text, nullable=False)
+    from_task = Column(UUID(as_uuid=True), nullable=False)
+    to_task = Column(UUID(as_uuid=True), nullable=True)
+    dag_id = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+
+
+class DagSnapshotSchema(Base):
+    __tablename__ = "dag_snapshots"
+
+    team_id = Column(
+        UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq = Column(BigInteger, nullable=False)
+    compacted_through = Column(BigInteger, nullable=False)
+    edges = Column(JSONB, nullable=False)
+    nodes = Column(JSONB, nullable=False)
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM, TSVECTOR
 from app.services.database_service import Base
-from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, ForeignKey, Computed
+from sqlalchemy.orm import deferred
+from pgvector.sqlalchemy import Vector
 import uuid
 from typing import Optional, Any
 from datetime import datetime
@@ -91,6 +93,33 @@ class task(BaseModel):
         )
 
 
+class task_search_hit(BaseModel):
+    """A task matching a full-text search, with its relevance and highlighted text."""
+
+    result: task
+    """The matching task."""
+
+    rank: float
+    """Cover density rank in [0, 1); higher is more relevant."""
+
+    name_highlight: str
+    """The task name with matched terms wrapped in <b></b>."""
+
+    snippet: Optional[str] = None
+    """Fragments of the description and notes around the matched terms, or None
+    if only the name matched."""
+
+
+class task_similarity_hit(BaseModel):
+    """A task close to a search text or another task in embedding space."""
+
+    result: task
+    """The similar task."""
+
+    distance: float
+    """Cosine distance in [0, 2]; lower is more similar."""
+
+
 class TaskSchema(Base):
     __tablename__ = "tasks"
 
@@ -117,3 +146,23 @@ class TaskSchema(Base):
     date_of_completion = Column(TIMESTAMP(timezone=True), nullable=True)
     description = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
+    # Unfinished dependencies, kept in step with dag_edges and task completion
+    open_dependencies = Column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    # Generated by Postgres (see db/schema/tasks.sql); deferred so ordinary
+    # task loads and RETURNING don't carry it
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(task_name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(notes, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
+    # Written in the background by task_embedding_service; deferred like
+    # search_vector
+    embedding = deferred(Column(Vector(1024), nullable=True))
@@ -1,11 +1,20 @@
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from app.services.database_service import Base
-from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Text,
+    TIMESTAMP,
+    ForeignKey,
+    UniqueConstraint,
+)
 import uuid
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from pgvector.sqlalchemy import Vector
+from app.schema.repository.tasks import task
 
 
 class week(BaseModel):
@@ -75,8 +84,24 @@ class week(BaseModel):
         )
 
 
+class week_metrics(BaseModel):
+    """Task metrics for one user over a week window, computed in bulk before
+    the LLM writes the week's summary and feedback."""
+
+    user_id: uuid.UUID
+    missed_deadlines: List[uuid.UUID] = []
+    completed_tasks: List[uuid.UUID] = []
+    points_completed: int = 0
+    collaborators: List[uuid.UUID] = []
+    tasks: List[task] = []
+    """Unfinished tasks plus tasks completed in the window; the LLM's context."""
+
+
 class WeekSchema(Base):
     __tablename__ = "week"
+    __table_args__ = (
+        UniqueConstraint("user_id", "start_date", name="week_user_start_key"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     start_date = Column(TIMESTAMP(timezone=True), nullable=False)
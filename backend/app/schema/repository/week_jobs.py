@@ -0,0 +1,149 @@
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.dialects.postgresql import UUID
+from app.services.database_service import Base
+from sqlalchemy import Column, ForeignKey, Integer, SmallInteger, Text, TIMESTAMP, text
+import uuid
+from typing import Optional
+from datetime import datetime
+from enum import Enum, IntEnum
+
+
+class WeekJobRunStatus(str, Enum):
+    running = "running"
+    completed = "completed"
+
+
+class WeekJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class WeekJobPriority(IntEnum):
+    """Claim order; on-demand jobs go ahead of the scheduled run."""
+
+    scheduled = 0
+    on_demand = 10
+
+
+class week_job_run(BaseModel):
+    """One weekly analysis run over a fixed window, covering every user."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: uuid.UUID
+    start_date: datetime
+    end_date: datetime
+    status: WeekJobRunStatus
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm(cls, obj):
+        return cls(
+            id=obj.id,
+            start_date=obj.start_date,
+            end_date=obj.end_date,
+            status=obj.status,
+            created_at=obj.created_at,
+            completed_at=obj.completed_at,
+        )
+
+
+class week_job(BaseModel):
+    """One user's week within a run, and how far it got."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: uuid.UUID
+    run_id: uuid.UUID
+    user_id: uuid.UUID
+    status: WeekJobStatus
+    priority: int = 0
+    attempts: int = 0
+    claimed_by: Optional[str] = None
+    lease_until: Optional[datetime] = None
+    error: Optional[str] = None
+    week_id: Optional[uuid.UUID] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm(cls, obj):
+        return cls(
+            id=obj.id,
+            run_id=obj.run_id,
+            user_id=obj.user_id,
+            status=obj.status,
+            priority=obj.priority,
+            attempts=obj.attempts,
+            claimed_by=obj.claimed_by,
+            lease_until=obj.lease_until,
+            error=obj.error,
+            week_id=obj.week_id,
+            created_at=obj.created_at,
+            updated_at=obj.updated_at,
+        )
+
+
+class claimed_week_job(BaseModel):
+    """A job a worker has claimed, with the window of its run."""
+
+    id: uuid.UUID
+    run_id: uuid.UUID
+    user_id: uuid.UUID
+    start_date: datetime
+    end_date: datetime
+
+
+class WeekJobRunSchema(Base):
+    __tablename__ = "week_job_runs"
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+    start_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    end_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    status = Column(Text, nullable=False, server_default=text("'running'"))
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+    completed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+
+class WeekJobSchema(Base):
+    __tablename__ = "week_jobs"
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+    run_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("week_job_runs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    status = Column(Text, nullable=False, server_default=text("'pending'"))
+    priority = Column(SmallInteger, nullable=False, server_default=text("0"))
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    claimed_by = Column(Text, nullable=True)
+    lease_until = Column(TIMESTAMP(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    week_id = Column(
+        UUID(as_uuid=True), ForeignKey("week.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+    updated_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
@@ -0,0 +1,195 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import math
+import uuid
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.repository.dag_repository import DagRepository, DagScheduleInput
+from app.services.dag_result_cache import DagResultCache
+from app.config.config import app_settings
+from app.core.logger import logger
+
+
+class TaskSchedule(BaseModel):
+    """Earliest/latest start and finish of a task, in working hours from now."""
+
+    task_id: uuid.UUID
+    task_name: Optional[str] = None
+    duration: float
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+    # Negative when the task can't make its own deadline or a dependent's
+    slack: float
+    deadline: Optional[datetime] = None
+
+
+class CriticalPath(BaseModel):
+    dag_id: uuid.UUID
+    version: int
+    # Length of the longest dependency chain, in hours
+    project_duration: float
+    # Longest chain, dependencies first
+    critical_path: List[uuid.UUID]
+    # Tasks with negative slack, furthest behind first
+    late_tasks: List[uuid.UUID]
+    tasks: List[TaskSchedule]
+
+
+def compute_earliest(
+    graph: Dict[str, List[str]], order: List[str], durations: Dict[str, float]
+) -> Dict[str, Tuple[float, float, float]]:
+    """
+    Forward pass of the critical path method over a topological order
+    (dependencies first), linear in nodes plus edges. Returns
+    task_id -> (duration, ES, EF).
+    """
+    earliest: Dict[str, Tuple[float, float, float]] = {}
+    for task_id in order:
+        start = 0.0
+        for dependency in graph.get(task_id, ()):
+            finish = earliest[dependency][2]
+            if finish > start:
+                start = finish
+        duration = durations.get(task_id, 0.0)
+        earliest[task_id] = (duration, start, start + duration)
+    return earliest
+
+
+def compute_latest(
+    graph: Dict[str, List[str]],
+    order: List[str],
+    earliest: Dict[str, Tuple[float, float, float]],
+    deadlines: Dict[str, float],
+) -> Dict[str, float]:
+    """
+    Backward pass: task_id -> LF, the latest finish that keeps the project at
+    its length and every task within its deadline (in hours from now), also
+    linear in nodes plus edges.
+    """
+    project_duration = max((e[2] for e in earliest.values()), default=0.0)
+    # Every dependent precedes its dependencies in reverse order, so a task's
+    # latest finish is settled by the time it is visited
+    latest_finish: Dict[str, float] = {}
+    for task_id in reversed(order):
+        finish = min(
+            latest_finish.get(task_id, project_duration),
+            deadlines.get(task_id, math.inf),
+        )
+        latest_finish[task_id] = finish
+        start = finish - earliest[task_id][0]
+        for dependency in graph.get(task_id, ()):
+            if start < latest_finish.get(dependency, math.inf):
+                latest_finish[dependency] = start
+    return latest_finish
+
+
+def trace_critical_path(
+    graph: Dict[str, List[str]], earliest: Dict[str, Tuple[float, float, float]]
+) -> List[str]:
+    """Follow driving dependencies back from the task that finishes last."""
+    if not earliest:
+        return []
+    current = max(earliest, key=lambda task_id: earliest[task_id][2])
+    path = [current]
+    while True:
+        start = earliest[current][1]
+        current = next(
+            (
+                dependency
+                for dependency in graph.get(current, ())
+                if math.isclose(earliest[dependency][2], start)
+            ),
+            None,
+        )
+        if current is None:
+            return path[::-1]
+        path.append(current)
+
+
+class CriticalPathService:
+    """
+    Critical path per DAG. The forward pass and the longest chain depend only on
+    the graph and task hours, so they are cached by DAG version and those hours;
+    deadlines (relative to now) and names are applied on every call.
+    """
+
+    def __init__(self, max_entries: int = app_settings.SCHEDULE_CACHE_MAX_DAGS):
+        self.dag_repository = DagRepository()
+        self.cache = DagResultCache(max_entries)
+
+    def analyze(
+        self,
+        inputs: DagScheduleInput,
+        hours_per_day: float = app_settings.FORECAST_HOURS_PER_DAY,
+        now: Optional[datetime] = None,
+    ) -> CriticalPath:
+        now = now or datetime.now(timezone.utc)
+        stamp = hash(tuple(inputs.durations.get(t, 0.0) for t in inputs.order))
+        cached = self.cache.get(inputs.dag_id, inputs.version, stamp)
+        if cached is None:
+            earliest = compute_earliest(inputs.graph, inputs.order, inputs.durations)
+            cached = (earliest, trace_critical_path(inputs.graph, earliest))
+            self.cache.put(inputs.dag_id, inputs.version, cached, stamp)
+        earliest, path = cached
+
+        # Deadlines as working hours from now, as the forecast counts them
+        deadlines, deadline_hours = {}, {}
+        for task_id, deadline in inputs.deadlines.items():
+            if deadline is None:
+                continue
+            if deadline.tzinfo is None:
+                deadline = deadline.replace(tzinfo=timezone.utc)
+            deadlines[task_id] = deadline
+            deadline_hours[task_id] = (
+                (deadline - now).total_seconds() / 86400 * hours_per_day
+            )
+        latest_finish = compute_latest(
+            inputs.graph, inputs.order, earliest, deadline_hours
+        )
+
+        tasks = []
+        for task_id in inputs.order:
+            duration, es, ef = earliest[task_id]
+            lf = latest_finish[task_id]
+            tasks.append(
+                TaskSchedule(
+                    task_id=task_id,
+                    task_name=inputs.names.get(task_id),
+                    duration=duration,
+                    earliest_start=es,
+                    earliest_finish=ef,
+                    latest_start=lf - duration,
+                    latest_finish=lf,
+                    slack=lf - ef,
+                    deadline=deadlines.get(task_id),
+                )
+            )
+        late = sorted((t for t in tasks if t.slack < 0), key=lambda t: t.slack)
+        return CriticalPath(
+            dag_id=inputs.dag_id,
+            version=inputs.version,
+            project_duration=max((e[2] for e in earliest.values()), default=0.0),
+            critical_path=path,
+            late_tasks=[t.task_id for t in late],
+            tasks=tasks,
+        )
+
+    async def get_critical_path(
+        self, db: AsyncSession, dag_id: uuid.UUID
+    ) -> CriticalPath:
+        inputs = await self.dag_repository.get_schedule_inputs(db, dag_id=dag_id)
+        return self.analyze(inputs[0])
+
+    async def get_team_critical_paths(
+        self, db: AsyncSession, team_id: uuid.UUID
+    ) -> List[CriticalPath]:
+        """Critical paths of all of a team's DAGs, longest first."""
+        logger.info(f"Computing critical paths for team {team_id}")
+        inputs = await self.dag_repository.get_schedule_inputs(db, team_id=team_id)
+        results = [self.analyze(dag_inputs) for dag_inputs in inputs]
+        return sorted(results, key=lambda r: r.project_duration, reverse=True)
+
+
+critical_path_service = CriticalPathService()
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+from app.core.exceptions import DagCycleError
+
+
+class CSRGraph:
+    """
+    Compact, array-backed view of a task graph.
+
+    Task UUID strings are interned to int32 node ids once, and edges are stored as
+    CSR (indptr/indices) arrays in both directions, so traversals work on whole
+    frontiers of ints instead of hashing UUID strings per edge. Edges keep the
+    dag_graph orientation: first -> second means first depends on second.
+    """
+
+    def __init__(self, ids: List[str], indptr: np.ndarray, indices: np.ndarray):
+        self.ids = ids
+        self.index = {task_id: node for node, task_id in enumerate(ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self.rindptr, self.rindices = self._transpose()
+
+    @classmethod
+    def from_adjacency(cls, graph: Dict[str, List[str]]) -> "CSRGraph":
+        ids = list(graph)
+        index = {task_id: node for node, task_id in enumerate(ids)}
+        for neighbours in graph.values():
+            for neighbour in neighbours:
+                if neighbour not in index:
+                    index[neighbour] = len(ids)
+                    ids.append(neighbour)
+        degrees = np.fromiter(
+            (len(graph.get(task_id, ())) for task_id in ids),
+            dtype=np.int64,
+            count=len(ids),
+        )
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        indices = np.fromiter(
+            (index[n] for task_id in ids for n in graph.get(task_id, ())),
+            dtype=np.int32,
+            count=int(indptr[-1]),
+        )
+        return cls(ids, indptr, indices)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.ids)
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.indices.size)
+
+    def _transpose(self):
+        sources = np.repeat(
+            np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr)
+        )
+        by_target = np.argsort(self.indices, kind="stable")
+        rindptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.num_nodes), out=rindptr[1:])
+        return rindptr, sources[by_target]
+
+    def node_ids(self, task_ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter(
+            (self.index[task_id] for task_id in task_ids if task_id in self.index),
+            dtype=np.int32,
+        )
+
+    def task_ids(self, nodes: np.ndarray) -> Set[str]:
+        return {self.ids[node] for node in nodes.tolist()}
+
+    def edge_sources(self) -> np.ndarray:
+        """Source node of every edge, aligned with indices."""
+        return np.repeat(
+            np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr)
+        )
+
+    def neighbours(self, nodes: np.ndarray, reverse: bool = False) -> np.ndarray:
+        """Out-neighbours (in-neighbours if reverse) of all nodes, gathered at once."""
+        indptr, indices = (
+            (self.rindptr, self.rindices) if reverse else (self.indptr, self.indices)
+        )
+        starts = indptr[nodes]
+        lengths = indptr[nodes + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int32)
+        # Offset of each gathered slot within its node's slice
+        run_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        offsets = np.repeat(starts, lengths) + (np.arange(total) - run_starts)
+        return indices[offsets]
+
+    def bfs(self, sources: np.ndarray, directed: bool = True) -> np.ndarray:
+        """Boolean mask of nodes reachable from sources, one frontier per step."""
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        frontier = np.unique(sources)
+        visited[frontier] = True
+        while frontier.size:
+            reached = self.neighbours(frontier)
+            if not directed:
+                reached = np.concatenate(
+                    [reached, self.neighbours(frontier, reverse=True)]
+                )
+            frontier = np.unique(reached[~visited[reached]])
+            visited[frontier] = True
+        return visited
+
+    def components(self) -> np.ndarray:
+        """
+        Weakly connected component label per node (the smallest node id in it),
+        by min-label propagation over all edges with pointer jumping.
+        """
+        labels = np.arange(self.num_nodes, dtype=np.int32)
+        sources, targets = self.edge_sources(), self.indices
+        while True:
+            lowest = np.minimum(labels[sources], labels[targets])
+            updated = labels.copy()
+            np.minimum.at(updated, sources, lowest)
+            np.minimum.at(updated, targets, lowest)
+            while True:
+                jumped = updated[updated]
+                if np.array_equal(jumped, updated):
+                    break
+                updated = jumped
+            if np.array_equal(updated, labels):
+                return labels
+            labels = updated
+
+    def component_sets(self) -> List[Set[str]]:
+        if not self.num_nodes:
+            return []
+        labels = self.components()
+        by_label = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[by_label])) + 1
+        return [self.task_ids(group) for group in np.split(by_label, boundaries)]
+
+    def topological_levels(self) -> List[np.ndarray]:
+        """
+        Group nodes into levels where every dependency sits in an earlier level
+        than its dependents. Raises DagCycleError if the graph has a cycle.
+        """
+        waiting = np.diff(self.indptr)
+        frontier = np.flatnonzero(waiting == 0).astype(np.int32)
+        levels = []
+        placed = 0
+        while frontier.size:
+            levels.append(frontier)
+            placed += frontier.size
+            dependents = self.neighbours(frontier, reverse=True)
+            if not dependents.size:
+                break
+            waiting = waiting - np.bincount(dependents, minlength=self.num_nodes)
+            candidates = np.unique(dependents)
+            frontier = candidates[waiting[candidates] == 0]
+        if placed != self.num_nodes:
+            raise DagCycleError("Graph contains a cycle")
+        return levels
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+import uuid
+
+
+class DagResultCache:
+    """
+    Small LRU cache of values derived from one DAG, keyed by (dag_id, version).
+
+    Every in-place DAG edit bumps its version, so stale graph-derived results are
+    never hit. Results that also depend on task fields (hours, deadlines) pass a
+    stamp of those inputs, and an entry whose stamp differs counts as a miss.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[uuid.UUID, int], Tuple[Hashable, Any]]" = (
+            OrderedDict()
+        )
+
+    def get(
+        self, dag_id: uuid.UUID, version: int, stamp: Hashable = None
+    ) -> Optional[Any]:
+        key = (dag_id, version)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != stamp:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def latest(self, dag_id: uuid.UUID) -> Optional[Any]:
+        """The value stored for dag_id at whatever version, for warm starts."""
+        for (cached_dag_id, _), (_, value) in self._entries.items():
+            if cached_dag_id == dag_id:
+                return value
+        return None
+
+    def put(self, dag_id: uuid.UUID, version: int, value: Any, stamp: Hashable = None):
+        # Older versions of the same DAG can never be hit again
+        for key in [key for key in self._entries if key[0] == dag_id]:
+            del self._entries[key]
+        self._entries[(dag_id, version)] = (stamp, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
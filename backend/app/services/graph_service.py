@@ -1,15 +1,18 @@
-from typing import Dict, List, Set
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+
+from app.core.exceptions import DagCycleError
+from app.services.csr_graph import CSRGraph
 
 
 def find_connected_nodes(graph: Dict[str, List[str]], start_node: str) -> Set[str]:
-    visited = set()
-    to_visit = {start_node}
-    while to_visit:
-        current = to_visit.pop()
-        if current not in visited:
-            visited.add(current)
-            to_visit.update(graph.get(current, []))
-    return visited
+    csr = CSRGraph.from_adjacency(graph)
+    if start_node not in csr.index:
+        return {start_node}
+    reached = csr.bfs(csr.node_ids([start_node]))
+    return csr.task_ids(np.flatnonzero(reached))
 
 
 def split_graph(graph: Dict[str, List[str]], first: str, second: str):
@@ -48,17 +51,140 @@ def merge_graphs(
 
 
 def connected_components(graph: Dict[str, List[str]]):
-    seen = set()
-    components = []
-    for node in graph:
-        if node not in seen:
-            queue = [node]
-            comp = set()
-            while queue:
-                n = queue.pop()
-                if n not in comp:
-                    comp.add(n)
-                    queue.extend(graph.get(n, []))
-            seen |= comp
-            components.append(comp)
-    return components
+    return CSRGraph.from_adjacency(graph).component_sets()
+
+
+def reverse_graph(graph: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    reverse = {node: [] for node in graph}
+    for node, neighbours in graph.items():
+        for neighbour in neighbours:
+            reverse.setdefault(neighbour, []).append(node)
+    return reverse
+
+
+def find_split_components(
+    graph: Dict[str, List[str]],
+    reverse: Dict[str, List[str]],
+    sources: Iterable[str],
+) -> List[Set[str]]:
+    """
+    Find the components that broke away after edges between sources were removed.
+
+    Runs one undirected search per source in lockstep. Searches that meet are merged,
+    and a search that runs out of nodes has found a complete component. We stop as
+    soon as a single search is left running, so the work is bounded by the size of
+    the pieces that split off rather than by the whole graph. The component of the
+    last running search is not returned; if every search finishes, all are returned.
+    """
+    owner: Dict[str, int] = {}
+    parent: Dict[int, int] = {}
+    visited: Dict[int, Set[str]] = {}
+    queues: Dict[int, deque] = {}
+
+    def find(search_id: int) -> int:
+        while parent[search_id] != search_id:
+            parent[search_id] = parent[parent[search_id]]
+            search_id = parent[search_id]
+        return search_id
+
+    for source in sources:
+        if source in owner:
+            continue
+        search_id = len(parent)
+        parent[search_id] = search_id
+        owner[source] = search_id
+        visited[search_id] = {source}
+        queues[search_id] = deque([source])
+
+    pieces = []
+    live = set(parent)
+    while len(live) > 1:
+        for search_id in list(live):
+            if search_id not in live:
+                continue
+            queue = queues[search_id]
+            if queue:
+                node = queue.popleft()
+                for neighbour in graph.get(node, []) + reverse.get(node, []):
+                    other = owner.get(neighbour)
+                    if other is None:
+                        owner[neighbour] = search_id
+                        visited[search_id].add(neighbour)
+                        queue.append(neighbour)
+                        continue
+                    other = find(other)
+                    if other == search_id:
+                        continue
+                    # The two searches met: keep the larger one and fold the other in
+                    keep, gone = (
+                        (search_id, other)
+                        if len(visited[search_id]) >= len(visited[other])
+                        else (other, search_id)
+                    )
+                    parent[gone] = keep
+                    visited[keep] |= visited.pop(gone)
+                    queues[keep].extend(queues.pop(gone))
+                    live.discard(gone)
+                    search_id = keep
+                    queue = queues[keep]
+            if not queue:
+                pieces.append(visited.pop(search_id))
+                live.discard(search_id)
+    return pieces
+
+
+def topological_order(graph: Dict[str, List[str]]) -> List[str]:
+    """
+    Order the nodes so every dependency comes before the tasks that depend on it.
+    An edge first -> second means first depends on second. Raises DagCycleError.
+    """
+    csr = CSRGraph.from_adjacency(graph)
+    return [
+        csr.ids[node] for level in csr.topological_levels() for node in level.tolist()
+    ]
+
+
+def insert_edge_ordered(
+    graph: Dict[str, List[str]],
+    order: List[str],
+    position: Dict[str, int],
+    first: str,
+    second: str,
+) -> bool:
+    """
+    Add the edge first -> second while keeping order topological.
+
+    Uses a bounded-window reorder: if second already precedes first nothing moves.
+    Otherwise only second's dependencies positioned between first and second are
+    searched, and only that window of order is rearranged. Both nodes must already
+    be in order/position, which are updated in place. Returns whether any node
+    moved. Raises DagCycleError, leaving everything untouched, if second already
+    depends on first.
+    """
+    if first == second:
+        raise DagCycleError(f"Task {first} cannot depend on itself")
+    if second in graph.get(first, []):
+        return False
+    lo, hi = position[first], position[second]
+    if hi > lo:
+        # Every path from second back to first stays inside the window
+        reached = {second}
+        stack = [second]
+        while stack:
+            node = stack.pop()
+            for dep in graph.get(node, []):
+                if dep == first:
+                    raise DagCycleError(
+                        f"Edge from {first} to {second} would create a cycle"
+                    )
+                if dep not in reached and position[dep] >= lo:
+                    reached.add(dep)
+                    stack.append(dep)
+        window = order[lo : hi + 1]
+        order[lo : hi + 1] = [n for n in window if n in reached] + [
+            n for n in window if n not in reached
+        ]
+        for index in range(lo, hi + 1):
+            position[order[index]] = index
+    graph.setdefault(first, []).append(second)
+    return hi > lo
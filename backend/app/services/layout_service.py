@@ -0,0 +1,355 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import uuid
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.repository.dag_repository import DagRepository
+from app.services.csr_graph import CSRGraph
+from app.services.dag_result_cache import DagResultCache
+from app.config.config import app_settings
+from app.core.logger import logger
+
+NODE_SPACING = 220.0
+LAYER_SPACING = 160.0
+# Barycenter sweeps (down and up) for a fresh layout and for a warm start
+COLD_SWEEPS = 8
+WARM_SWEEPS = 2
+# Share of edges that may change for the previous layout to seed the next one
+INCREMENTAL_MAX_CHANGE = 0.1
+
+
+class NodePosition(BaseModel):
+    task_id: uuid.UUID
+    layer: int
+    x: float
+    y: float
+
+
+class EdgeRoute(BaseModel):
+    # Same orientation as dag_graph: from_task depends on to_task
+    from_task: uuid.UUID
+    to_task: uuid.UUID
+    # Bend points from the dependency down to the dependent, for edges that
+    # span more than one layer
+    points: List[Tuple[float, float]] = []
+
+
+class DagLayout(BaseModel):
+    dag_id: uuid.UUID
+    version: int
+    width: float
+    height: float
+    nodes: List[NodePosition]
+    edges: List[EdgeRoute]
+
+
+def _split_long_edges(csr: CSRGraph, layer: np.ndarray):
+    """
+    Replace every edge spanning k > 1 layers with a chain through k - 1 dummy
+    nodes, so all segments join adjacent layers. Returns the layer of every
+    real and dummy node, the (upper, lower) segment arrays, and the first dummy
+    of each edge.
+    """
+    dependents, dependencies = csr.edge_sources(), csr.indices
+    spans = (layer[dependents] - layer[dependencies]).astype(np.int64)
+    dummies = spans - 1
+    first_dummy = csr.num_nodes + np.cumsum(dummies) - dummies
+    total_dummies = int(dummies.sum())
+
+    # Segment j of an edge joins chain node j to chain node j + 1, where the
+    # chain is dependency, its dummies, then the dependent
+    edge_of_segment = np.repeat(np.arange(spans.size), spans)
+    step = np.arange(edge_of_segment.size) - np.repeat(np.cumsum(spans) - spans, spans)
+    segment_dummy = first_dummy[edge_of_segment] + step
+    upper = np.where(step == 0, dependencies[edge_of_segment], segment_dummy - 1)
+    lower = np.where(
+        step == spans[edge_of_segment] - 1, dependents[edge_of_segment], segment_dummy
+    )
+
+    all_layers = np.empty(csr.num_nodes + total_dummies, dtype=np.int64)
+    all_layers[: csr.num_nodes] = layer
+    has_dummy = step > 0
+    all_layers[upper[has_dummy]] = layer[dependencies[edge_of_segment[has_dummy]]] + (
+        step[has_dummy]
+    )
+    return all_layers, upper.astype(np.int64), lower.astype(np.int64), first_dummy
+
+
+def _group_by_layer(layer_of: np.ndarray, num_layers: int) -> List[np.ndarray]:
+    """Indices into layer_of, grouped by their layer."""
+    order = np.argsort(layer_of, kind="stable")
+    bounds = np.searchsorted(layer_of[order], np.arange(num_layers + 1))
+    return [order[bounds[i] : bounds[i + 1]] for i in range(num_layers)]
+
+
+def _barycenters(
+    members: np.ndarray,
+    nodes: np.ndarray,
+    neighbours: np.ndarray,
+    value: np.ndarray,
+) -> np.ndarray:
+    """Mean value of each member's neighbours, NaN for members without any."""
+    size = value.size
+    weight = np.bincount(nodes, minlength=size)[members]
+    total = np.bincount(nodes, weights=value[neighbours], minlength=size)[members]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(weight > 0, total / weight, np.nan)
+
+
+def _inversions(values: np.ndarray) -> int:
+    """
+    Number of pairs i < j with values[i] > values[j], by bottom-up merge sort
+    where each level counts, for every element of a right block, the larger
+    elements of its left block with one global searchsorted.
+    """
+    values = values.astype(np.int64)
+    n = values.size
+    if n < 2:
+        return 0
+    shift = int(values.max() - values.min()) + 1
+    values = values - values.min()
+    position = np.arange(n)
+    count = 0
+    width = 1
+    while width < n:
+        pair = position // (2 * width)
+        keys = pair * shift + values
+        is_left = (position // width) % 2 == 0
+        left_keys, right_keys = keys[is_left], keys[~is_left]
+        right_pairs = pair[~is_left]
+        left_end = np.searchsorted(left_keys, (right_pairs + 1) * shift)
+        count += int((left_end - np.searchsorted(left_keys, right_keys, "right")).sum())
+        # Merge each pair of sorted blocks for the next level
+        values = np.sort(keys) - pair * shift
+        width *= 2
+    return count
+
+
+def _crossings(
+    rank: np.ndarray, all_layers: np.ndarray, upper: np.ndarray, lower: np.ndarray
+) -> int:
+    """
+    Edge crossings between all adjacent layers at once: segments sorted by
+    layer and upper rank cross wherever their lower ranks are inverted. Lower
+    ranks are offset per layer so pairs from different layers never count.
+    """
+    layer = all_layers[lower]
+    order = np.lexsort((rank[lower], rank[upper], layer))
+    offset = layer[order] * (int(rank.max(initial=0)) + 1)
+    return _inversions(offset + rank[lower][order].astype(np.int64))
+
+
+def _sweep(
+    rank: np.ndarray,
+    by_layer: List[np.ndarray],
+    upper: np.ndarray,
+    lower: np.ndarray,
+    all_layers: np.ndarray,
+    segments_below: List[np.ndarray],
+    segments_above: List[np.ndarray],
+    sweeps: int,
+):
+    """
+    Barycenter crossing reduction: reorder each layer by the mean rank of its
+    neighbours in the layer above (down sweeps) or below (up sweeps). Nodes
+    without neighbours on that side keep their rank, and ties keep the order.
+    Barycenter sweeps can oscillate, so the order with the fewest crossings
+    seen after any sweep is the one kept.
+    """
+    best = _crossings(rank, all_layers, upper, lower)
+    if not best:
+        return
+    best_rank, best_layers = rank.copy(), list(by_layer)
+    for sweep in range(sweeps):
+        if sweep % 2 == 0:
+            layers = range(1, len(by_layer))
+        else:
+            layers = range(len(by_layer) - 2, -1, -1)
+        for current in layers:
+            if sweep % 2 == 0:
+                segments = segments_below[current]
+                nodes, neighbours = lower[segments], upper[segments]
+            else:
+                segments = segments_above[current]
+                nodes, neighbours = upper[segments], lower[segments]
+            members = by_layer[current]
+            barycenter = _barycenters(members, nodes, neighbours, rank)
+            barycenter = np.where(np.isnan(barycenter), rank[members], barycenter)
+            members = members[np.lexsort((rank[members], barycenter))]
+            by_layer[current] = members
+            rank[members] = np.arange(members.size)
+        crossings = _crossings(rank, all_layers, upper, lower)
+        if crossings < best:
+            best, best_rank, best_layers = crossings, rank.copy(), list(by_layer)
+        if not best:
+            break
+    rank[:] = best_rank
+    by_layer[:] = best_layers
+
+
+def _coordinates(
+    by_layer: List[np.ndarray],
+    upper: np.ndarray,
+    lower: np.ndarray,
+    segments_below: List[np.ndarray],
+) -> np.ndarray:
+    """
+    Place each node over the mean x of the nodes it hangs from, then push nodes
+    apart left to right so neighbours in a layer stay NODE_SPACING apart,
+    keeping the layer centred on where its nodes wanted to be.
+    """
+    x = np.zeros(sum(members.size for members in by_layer))
+    for current, members in enumerate(by_layer):
+        index = np.arange(members.size) * NODE_SPACING
+        segments = segments_below[current]
+        wanted = _barycenters(members, lower[segments], upper[segments], x)
+        offset = wanted - index
+        valid = np.flatnonzero(~np.isnan(offset))
+        if valid.size:
+            # Nodes with nothing above follow their nearest placed left neighbour
+            offset[: valid[0]] = offset[valid[0]]
+            filled = np.zeros(members.size, dtype=np.int64)
+            filled[valid] = valid
+            offset = offset[np.maximum.accumulate(filled)]
+        else:
+            offset = np.zeros(members.size)
+        desired = offset + index
+        placed = np.maximum.accumulate(offset) + index
+        x[members] = placed + (desired.mean() - placed.mean())
+    return x
+
+
+def compute_layout(
+    graph: Dict[str, List[str]], previous: Optional[DagLayout] = None
+) -> Tuple[List[str], np.ndarray, np.ndarray, List[List[int]]]:
+    """
+    Sugiyama-style layout: longest-path layers from CSRGraph.topological_levels
+    (dependencies above dependents), dummy nodes on long edges, barycenter
+    crossing reduction and a compaction pass for x. When a previous layout is
+    given its x positions seed the initial order and fewer sweeps run.
+
+    Returns node ids, the layer and x of every real and dummy node, and each
+    edge's dummy chain in CSR edge order.
+    """
+    csr = CSRGraph.from_adjacency(graph)
+    layer = np.zeros(csr.num_nodes, dtype=np.int64)
+    for depth, level in enumerate(csr.topological_levels()):
+        layer[level] = depth
+    all_layers, upper, lower, first_dummy = _split_long_edges(csr, layer)
+    num_layers = int(all_layers.max(initial=-1)) + 1
+
+    # Initial order: previous x for known nodes, then everything else in
+    # creation order
+    seed = np.arange(all_layers.size, dtype=float) + 1e12
+    if previous is not None:
+        known = {str(n.task_id): n.x for n in previous.nodes}
+        for node, task_id in enumerate(csr.ids):
+            if task_id in known:
+                seed[node] = known[task_id]
+    by_layer = [
+        members[np.argsort(seed[members], kind="stable")]
+        for members in _group_by_layer(all_layers, num_layers)
+    ]
+    rank = np.empty(all_layers.size)
+    for members in by_layer:
+        rank[members] = np.arange(members.size)
+
+    segments_below = _group_by_layer(all_layers[lower], num_layers)
+    segments_above = _group_by_layer(all_layers[upper], num_layers)
+    _sweep(
+        rank,
+        by_layer,
+        upper,
+        lower,
+        all_layers,
+        segments_below,
+        segments_above,
+        WARM_SWEEPS if previous is not None else COLD_SWEEPS,
+    )
+    x = _coordinates(by_layer, upper, lower, segments_below)
+    x -= x.min(initial=0.0)
+
+    spans = layer[csr.edge_sources()] - layer[csr.indices]
+    chains = [
+        list(range(start, start + span - 1))
+        for start, span in zip(first_dummy.tolist(), spans.tolist())
+    ]
+    return csr.ids, all_layers, x, chains
+
+
+def edge_set(graph: Dict[str, List[str]]) -> set:
+    return {(first, second) for first, seconds in graph.items() for second in seconds}
+
+
+class LayoutService:
+    """Layered DAG layouts, cached per DAG version and warm-started on small edits."""
+
+    def __init__(self, max_entries: int = app_settings.SCHEDULE_CACHE_MAX_DAGS):
+        self.dag_repository = DagRepository()
+        self.cache = DagResultCache(max_entries)
+
+    def layout(
+        self,
+        dag_id: uuid.UUID,
+        version: int,
+        graph: Dict[str, List[str]],
+        previous: Optional[DagLayout] = None,
+    ) -> DagLayout:
+        if previous is not None:
+            edges = edge_set(graph)
+            previous_edges = {
+                (str(e.from_task), str(e.to_task)) for e in previous.edges
+            }
+            changed = len(edges ^ previous_edges)
+            if changed > INCREMENTAL_MAX_CHANGE * max(len(edges), 1):
+                previous = None
+        ids, layers, x, chains = compute_layout(graph, previous)
+        y = layers * LAYER_SPACING
+
+        nodes = [
+            NodePosition(
+                task_id=task_id, layer=int(layers[n]), x=float(x[n]), y=float(y[n])
+            )
+            for n, task_id in enumerate(ids)
+        ]
+        edges = []
+        chain_iter = iter(chains)
+        for first in ids:
+            for second in graph.get(first, ()):
+                chain = next(chain_iter)
+                edges.append(
+                    EdgeRoute(
+                        from_task=first,
+                        to_task=second,
+                        points=[(float(x[d]), float(y[d])) for d in chain],
+                    )
+                )
+        return DagLayout(
+            dag_id=dag_id,
+            version=version,
+            width=float(x.max(initial=0.0)),
+            height=float(y.max(initial=0.0)),
+            nodes=nodes,
+            edges=edges,
+        )
+
+    async def get_layout(self, db: AsyncSession, dag_id: uuid.UUID) -> DagLayout:
+        version = await self.dag_repository.get_dag_version(db, dag_id)
+        cached = self.cache.get(dag_id, version)
+        if cached is not None:
+            return cached
+        graph, version = await self.dag_repository.get_dag_graph(db, dag_id)
+        previous = self.cache.latest(dag_id)
+        logger.info(
+            f"Laying out DAG {dag_id} at version {version}"
+            + (f" from version {previous.version}" if previous else "")
+        )
+        # The layout is NumPy work; keep it off the event loop. The cache is
+        # only touched from the loop.
+        result = await asyncio.to_thread(self.layout, dag_id, version, graph, previous)
+        self.cache.put(dag_id, version, result)
+        return result
+
+
+layout_service = LayoutService()
@@ -6,15 +6,19 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 import torch
 from transformers import AutoTokenizer, AutoModel
 import asyncio
+import threading
 
 from app.config.config import app_settings
 from app.schema.llm.message import Message, ToolMessage
 from app.core.exceptions import LLMException
 from app.core.logger import logger
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.schema.llm.tool import AbstractTool, ToolCall
 from app.services.database_service import get_db
 
+# Encoding runs in worker threads, so first use may race to load the model
+_bge_lock = threading.Lock()
+
 
 def collect_tools() -> Dict[str, Dict[str, Any]]:
     """
@@ -74,6 +78,21 @@ class LLMService:
         self.tools: Dict[str, Dict[str, Any]] = collect_tools()
         logger.debug(f"Initialized LLMService with {len(self.tools)} tools")
 
+    @staticmethod
+    def _bge():
+        """The BAAI/bge-large-en tokenizer and model, loaded once on first use."""
+        if not hasattr(LLMService, "_bge_model"):
+            with _bge_lock:
+                if not hasattr(LLMService, "_bge_model"):
+                    LLMService._bge_tokenizer = AutoTokenizer.from_pretrained(
+                        "BAAI/bge-large-en"
+                    )
+                    # Set last: its presence means both are loaded
+                    LLMService._bge_model = AutoModel.from_pretrained(
+                        "BAAI/bge-large-en"
+                    )
+        return LLMService._bge_tokenizer, LLMService._bge_model
+
     @staticmethod
     def encode_1024(text: str):
         """
@@ -82,14 +101,7 @@ class LLMService:
         Returns a numpy array of 1024 floats.
         """
         try:
-            if not hasattr(LLMService, "_bge_tokenizer"):
-                LLMService._bge_tokenizer = AutoTokenizer.from_pretrained(
-                    "BAAI/bge-large-en"
-                )
-            if not hasattr(LLMService, "_bge_model"):
-                LLMService._bge_model = AutoModel.from_pretrained("BAAI/bge-large-en")
-            tokenizer = LLMService._bge_tokenizer
-            model = LLMService._bge_model
+            tokenizer, model = LLMService._bge()
             inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
             with torch.no_grad():
                 embeddings = model(**inputs).last_hidden_state[:, 0]  # [CLS] token
@@ -98,6 +110,24 @@ class LLMService:
             logger.error(f"Error encoding text: {e}")
             raise
 
+    @staticmethod
+    def encode_1024_batch(texts: List[str]):
+        """
+        encode_1024 for many strings in one padded forward pass. Returns a numpy
+        array of shape (len(texts), 1024).
+        """
+        try:
+            tokenizer, model = LLMService._bge()
+            inputs = tokenizer(
+                texts, return_tensors="pt", truncation=True, padding=True
+            )
+            with torch.no_grad():
+                embeddings = model(**inputs).last_hidden_state[:, 0]  # [CLS] token
+            return embeddings.cpu().numpy()
+        except Exception as e:
+            logger.error(f"Error encoding {len(texts)} texts: {e}")
+            raise
+
     def _client(self) -> AsyncOpenAI:
         return AsyncOpenAI(
             base_url=self.base_url,
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from typing import Dict, Optional, Set
+import asyncio
+import json
+import uuid
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import app_settings
+from app.utils.database_utils import create_database_config
+from app.core.logger import logger
+
+EVENTS_CHANNEL = "dagger_events"
+
+# Queued to a subscriber in place of events it could not keep up with, or that
+# were lost while the listener was reconnecting
+RESYNC = {"kind": "resync"}
+
+
+async def notify(db: AsyncSession, payload: dict):
+    """
+    Queue a NOTIFY on the events channel. Postgres delivers it only when db's
+    transaction commits, and drops it on rollback. Payloads must stay small.
+    """
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": EVENTS_CHANNEL, "payload": json.dumps(payload, default=str)},
+    )
+
+
+class Subscription:
+    """A bounded queue of events for one client, filtered to one team."""
+
+    def __init__(self, team_id: uuid.UUID, max_queue: int):
+        self.team_id = team_id
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client gets one resync instead of an unbounded backlog; it
+            # catches up from the change log with its last seen seq
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class NotificationService:
+    """
+    One LISTEN connection per process, fanning notifications out to in-process
+    subscribers by team_id. The connection is re-established with backoff if it
+    drops, and subscribers are told to resync since events may have been missed.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, team_id: uuid.UUID) -> Subscription:
+        subscription = Subscription(team_id, app_settings.EVENTS_QUEUE_SIZE)
+        self._subscribers[str(team_id)].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(str(subscription.team_id))
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[str(subscription.team_id)]
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed notification: {payload}")
+            return
+        for subscription in list(self._subscribers.get(str(event.get("team_id")), ())):
+            subscription.push(event)
+
+    async def _listen(self):
+        # Same database and connect args as the engine's pool
+        db_config = create_database_config()
+        dsn = db_config.connection_string.replace(
+            "postgresql+asyncpg://", "postgresql://"
+        )
+        connect_args = db_config.options.get("connect_args", {})
+        delay = 1.0
+        connected_before = False
+        while True:
+            try:
+                self._connection = await asyncpg.connect(dsn, **connect_args)
+                closed = asyncio.Event()
+                self._connection.add_termination_listener(lambda _: closed.set())
+                await self._connection.add_listener(
+                    EVENTS_CHANNEL, self._on_notification
+                )
+                logger.info(f"Listening for notifications on {EVENTS_CHANNEL}")
+                if connected_before:
+                    for subscribers in list(self._subscribers.values()):
+                        for subscription in list(subscribers):
+                            subscription.push(RESYNC)
+                connected_before = True
+                delay = 1.0
+                await closed.wait()
+                logger.warning("Notification listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener error: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+            logger.info("Notification service started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+        logger.info("Notification service stopped")
+
+
+notification_service = NotificationService()
@@ -1,59 +1,107 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime, timedelta
+from datetime import timedelta
+from typing import Optional
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from app.core.repository.user_repository import UserRepository
-from app.services.week_service import analyze_and_create_week
+from app.services.week_service import central_tz, weekly_window
 from app.core.repository.week_repository import WeekRepository
+from app.core.repository.week_jobs_repository import WeekJobsRepository
+from app.services.week_queue_service import week_queue_worker
+from app.core.repository.dag_changes_repository import DagChangesRepository
+from app.config.config import app_settings
 from app.core.logger import logger
 from app.services.database_service import DatabaseService
-import pytz
+
+# Session-level, held by the one process running the scheduled jobs
+_LEADER_LOCK_KEY = "hashtextextended('scheduler_leader', 0)"
+_LEADER_LOCK_SQL = text(f"SELECT pg_try_advisory_lock({_LEADER_LOCK_KEY})")
+_LEADER_UNLOCK_SQL = text(f"SELECT pg_advisory_unlock({_LEADER_LOCK_KEY})")
 
 
 class SchedulerService:
+    """
+    Runs the scheduled jobs in exactly one process. Every process starts a
+    paused scheduler and competes for a session-level advisory lock held on a
+    connection of its own; the winner resumes its scheduler for as long as it
+    keeps that connection. The others retry, so one of them takes over when
+    the leader exits or loses its connection.
+    """
+
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self.user_repository = UserRepository()
         self.week_repository = WeekRepository()
+        self.week_jobs_repository = WeekJobsRepository()
+        self.dag_changes_repository = DagChangesRepository()
         self.db_service = DatabaseService.get_instance()
+        self._leader_conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
 
-    async def process_user_week(self, user_id):
-        """Process a single user's week analysis and storage."""
+    async def process_all_users(self):
+        """
+        Enqueue this week's analysis for all users; the week job workers in
+        every process share the work. Only the leader fires this, and start_run
+        is idempotent should a leader change ever let it fire twice.
+        """
         try:
-            # Get database session
             async with self.db_service.AsyncSessionLocal() as db:
-                # Set week boundaries: now is end_of_week, one week ago is start_of_week
-                end_of_week = datetime.now()
-                start_of_week = end_of_week - timedelta(days=7)
-
-                # Create and analyze the week
-                week_obj = await analyze_and_create_week(
-                    db, start_of_week, end_of_week, user_id
-                )
-
-                logger.info(f"Successfully processed week for user {user_id}")
+                run = await self.week_jobs_repository.start_run(db, *weekly_window())
+            week_queue_worker.wake()
+            logger.info(f"Enqueued weekly analysis run {run.id}")
         except Exception as e:
-            logger.error(f"Error processing week for user {user_id}: {str(e)}")
+            logger.error(f"Error in weekly analysis job: {str(e)}")
 
-    async def process_all_users(self):
-        """Process week analysis for all users."""
+    async def compact_dag_changes(self):
+        """Fold DAG changes older than the retention window into snapshots."""
         try:
-            # Get database session
             async with self.db_service.AsyncSessionLocal() as db:
-                # Get all users
-                users = await self.user_repository.get_all_users(db)
+                teams = await self.dag_changes_repository.compact(
+                    db, timedelta(hours=app_settings.DAG_CHANGES_RETENTION_HOURS)
+                )
+                logger.info(f"Compacted DAG changes for {teams} teams")
+        except Exception as e:
+            logger.error(f"Error in DAG change compaction job: {str(e)}")
 
-                # Process each user
-                for user in users:
-                    await self.process_user_week(user.id)
+    async def _release_leadership(self):
+        self.scheduler.pause()
+        if self._leader_conn is not None:
+            conn, self._leader_conn = self._leader_conn, None
+            try:
+                # The connection goes back to the pool, which keeps the lock
+                await conn.execute(_LEADER_UNLOCK_SQL)
+            except Exception as e:
+                logger.error(f"Error releasing scheduler leadership: {e}")
+            finally:
+                await conn.close()
 
-                logger.info("Completed weekly analysis for all users")
-        except Exception as e:
-            logger.error(f"Error in weekly analysis job: {str(e)}")
+    async def _lead(self):
+        while True:
+            try:
+                if self._leader_conn is None:
+                    conn = await self.db_service.engine.connect()
+                    await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    if (await conn.execute(_LEADER_LOCK_SQL)).scalar_one():
+                        self._leader_conn = conn
+                        self.scheduler.resume()
+                        logger.info("Scheduler leadership acquired")
+                    else:
+                        await conn.close()
+                else:
+                    # Fails once the connection, and with it the lock, is gone
+                    await self._leader_conn.execute(text("SELECT 1"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduler leadership lost or unavailable: {e}")
+                await self._release_leadership()
+            await asyncio.sleep(app_settings.SCHEDULER_LEADER_POLL_SECONDS)
 
-    def start(self):
-        """Start the scheduler."""
-        # Schedule the job to run every Saturday at midnight Central Time
-        central_tz = pytz.timezone("America/Chicago")
+    async def start(self):
+        """Start the scheduler, paused until this process becomes the leader."""
+        # Enqueue the weekly analysis every Saturday at midnight Central Time
         self.scheduler.add_job(
             self.process_all_users,
             trigger=CronTrigger(
@@ -64,11 +112,28 @@ class SchedulerService:
             replace_existing=True,
         )
 
-        self.scheduler.start()
+        self.scheduler.add_job(
+            self.compact_dag_changes,
+            trigger=CronTrigger(hour=3, minute=0, timezone=central_tz),
+            id="dag_change_compaction",
+            name="DAG Change Log Compaction",
+            replace_existing=True,
+        )
+
+        self.scheduler.start(paused=True)
+        self._task = asyncio.create_task(self._lead())
         logger.info("Weekly analysis scheduler started")
 
-    def stop(self):
-        """Stop the scheduler."""
+    async def stop(self):
+        """Stop the scheduler and hand leadership to another process."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_leadership()
         self.scheduler.shutdown()
         logger.info("Weekly analysis scheduler stopped")
 
@@ -0,0 +1,232 @@
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import time
+import uuid
+from sqlalchemy import bindparam, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.config.config import app_settings
+from app.schema.repository.tasks import TaskSchema
+from app.services.database_service import DatabaseService
+from app.services.llm_service import LLMService
+from app.core.logger import logger
+
+# Task fields that make up the embedded text; edits to anything else keep
+# the current embedding
+EMBEDDED_FIELDS = frozenset({"task_name", "description", "notes"})
+
+
+def task_embedding_text(
+    task_name: str, description: Optional[str], notes: Optional[str]
+) -> str:
+    return "\n".join(filter(None, [task_name, description, notes]))
+
+
+# Session-level, held by the one process backfilling
+_BACKFILL_LOCK_KEY = "hashtextextended('task_embedding_backfill', 0)"
+_BACKFILL_LOCK_SQL = text(f"SELECT pg_try_advisory_lock({_BACKFILL_LOCK_KEY})")
+_BACKFILL_UNLOCK_SQL = text(f"SELECT pg_advisory_unlock({_BACKFILL_LOCK_KEY})")
+
+_tasks = TaskSchema.__table__
+# Only writes an embedding if the task still has the text it was encoded from.
+# A task edited meanwhile was scheduled again by whichever process took the edit.
+_STORE_EMBEDDING = (
+    update(_tasks)
+    .where(
+        _tasks.c.id == bindparam("b_id"),
+        _tasks.c.task_name == bindparam("b_task_name"),
+        _tasks.c.description.is_not_distinct_from(bindparam("b_description")),
+        _tasks.c.notes.is_not_distinct_from(bindparam("b_notes")),
+    )
+    .values(embedding=bindparam("b_embedding"))
+)
+
+
+async def encode(text: str):
+    """LLMService.encode_1024 off the event loop; the model call blocks."""
+    return await asyncio.to_thread(LLMService.encode_1024, text)
+
+
+async def encode_batch(texts: List[str]):
+    """LLMService.encode_1024_batch off the event loop, one forward pass."""
+    return await asyncio.to_thread(LLMService.encode_1024_batch, texts)
+
+
+class TaskEmbeddingService:
+    """
+    Keeps tasks.embedding up to date in the background.
+
+    schedule() marks tasks dirty and pushes their due time out by the debounce
+    interval, so a burst of edits to one task is encoded once, after it goes
+    quiet. Due tasks are read, encoded in one batch with no session open, and
+    written only if their text is unchanged; a task edited meanwhile is simply
+    due again, in whichever process took the edit. On start, tasks that have
+    never been embedded are backfilled a page at a time whenever there is no
+    other work, by the one process holding the backfill advisory lock.
+    """
+
+    def __init__(self):
+        self._due: Dict[uuid.UUID, float] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._backfill_after: Optional[uuid.UUID] = None
+        self._backfilling = False
+        self._backfill_conn: Optional[AsyncConnection] = None
+
+    def schedule(self, task_ids: Iterable[uuid.UUID], delay: Optional[float] = None):
+        if delay is None:
+            delay = app_settings.TASK_EMBEDDING_DEBOUNCE_SECONDS
+        due = time.monotonic() + delay
+        for task_id in task_ids:
+            self._due[task_id] = due
+        self._wake.set()
+
+    def schedule_if_changed(self, task_id: uuid.UUID, updates: dict):
+        if EMBEDDED_FIELDS.intersection(updates):
+            self.schedule([task_id])
+
+    async def _embed(self, task_ids: List[uuid.UUID]):
+        async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    TaskSchema.id,
+                    TaskSchema.task_name,
+                    TaskSchema.description,
+                    TaskSchema.notes,
+                ).where(TaskSchema.id.in_(task_ids))
+            )
+            rows = result.all()
+        if not rows:
+            return
+        embeddings = await encode_batch(
+            [
+                task_embedding_text(name, description, notes)
+                for _, name, description, notes in rows
+            ]
+        )
+        async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+            await db.execute(
+                _STORE_EMBEDDING,
+                [
+                    {
+                        "b_id": task_id,
+                        "b_task_name": name,
+                        "b_description": description,
+                        "b_notes": notes,
+                        "b_embedding": embedding,
+                    }
+                    for (task_id, name, description, notes), embedding in zip(
+                        rows, embeddings
+                    )
+                ],
+            )
+            await db.commit()
+        logger.info(f"Embedded {len(rows)} tasks")
+
+    async def _hold_backfill_lock(self) -> bool:
+        """Take the backfill lock on a connection kept for the backfill."""
+        if self._backfill_conn is not None:
+            return True
+        conn = await DatabaseService.get_instance().engine.connect()
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if (await conn.execute(_BACKFILL_LOCK_SQL)).scalar_one():
+            self._backfill_conn = conn
+            return True
+        await conn.close()
+        return False
+
+    async def _release_backfill_lock(self):
+        if self._backfill_conn is not None:
+            conn, self._backfill_conn = self._backfill_conn, None
+            try:
+                # The connection goes back to the pool, which keeps the lock
+                await conn.execute(_BACKFILL_UNLOCK_SQL)
+            finally:
+                await conn.close()
+
+    async def _next_backfill_page(self) -> List[uuid.UUID]:
+        async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+            query = select(TaskSchema.id).where(TaskSchema.embedding.is_(None))
+            if self._backfill_after is not None:
+                query = query.where(TaskSchema.id > self._backfill_after)
+            result = await db.execute(
+                query.order_by(TaskSchema.id).limit(
+                    app_settings.TASK_EMBEDDING_BATCH_SIZE
+                )
+            )
+            task_ids = result.scalars().all()
+        if task_ids:
+            self._backfill_after = task_ids[-1]
+        return task_ids
+
+    async def _run(self):
+        while True:
+            try:
+                # Backfill around a few debounced or failing tasks rather than
+                # waiting for the queue to drain completely
+                batch_size = app_settings.TASK_EMBEDDING_BATCH_SIZE
+                if self._backfilling and len(self._due) < batch_size:
+                    if not await self._hold_backfill_lock():
+                        self._backfilling = False
+                        logger.info("Task embedding backfill runs in another process")
+                    elif task_ids := await self._next_backfill_page():
+                        self.schedule(task_ids, delay=0)
+                    else:
+                        self._backfilling = False
+                        await self._release_backfill_lock()
+                        logger.info("Task embedding backfill complete")
+                if not self._due:
+                    await self._wake.wait()
+                    self._wake.clear()
+                    continue
+                now = time.monotonic()
+                ready = [t for t, due in self._due.items() if due <= now]
+                if not ready:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._wake.wait(), min(self._due.values()) - now
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                batch = ready[:batch_size]
+                for task_id in batch:
+                    del self._due[task_id]
+                try:
+                    await self._embed(batch)
+                except Exception as e:
+                    logger.error(f"Error embedding {len(batch)} tasks: {e}")
+                    # Don't let a newer edit's due time be pulled forward
+                    retry = [t for t in batch if t not in self._due]
+                    self.schedule(
+                        retry, delay=app_settings.TASK_EMBEDDING_RETRY_SECONDS
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task embedding loop error: {e}")
+                await asyncio.sleep(app_settings.TASK_EMBEDDING_RETRY_SECONDS)
+
+    async def start(self):
+        if self._task is None:
+            self._backfilling = True
+            self._backfill_after = None
+            self._task = asyncio.create_task(self._run())
+            logger.info("Task embedding service started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self._release_backfill_lock()
+        except Exception as e:
+            logger.error(f"Error releasing task embedding backfill lock: {e}")
+        logger.info("Task embedding service stopped")
+
+
+task_embedding_service = TaskEmbeddingService()
@@ -0,0 +1,271 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import random
+import time
+import uuid
+from app.config.config import app_settings
+from app.core.repository.week_repository import WeekRepository
+from app.core.repository.week_jobs_repository import WeekJobsRepository
+from app.services.database_service import DatabaseService
+from app.services.llm_service import LLMService
+from app.services.week_service import (
+    compute_week_metrics,
+    summarize_week,
+    week_embedding_text,
+)
+from app.core.logger import logger
+
+STAGES = ("metrics", "llm", "embed", "store")
+
+# Tells a stage worker its inbox is finished
+_DONE = object()
+
+
+@dataclass
+class WeekPipelineProgress:
+    total: int
+    done: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(STAGES, 0))
+    failed: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(STAGES, 0))
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def finished(self) -> int:
+        return self.done["store"] + sum(self.failed.values())
+
+    def summary(self) -> str:
+        stages = ", ".join(
+            f"{stage} {self.done[stage]}"
+            + (f" ({self.failed[stage]} failed)" if self.failed[stage] else "")
+            for stage in STAGES
+        )
+        elapsed = time.monotonic() - self.started_at
+        return (
+            f"{self.finished}/{self.total} users finished in {elapsed:.0f}s: {stages}"
+        )
+
+
+class WeekPipeline:
+    """
+    Weekly analysis as four stages joined by bounded queues:
+
+        metrics -> llm (summary and feedback) -> embed -> store
+
+    Each stage runs its own number of workers (WEEK_*_CONCURRENCY), so a slow
+    LLM call holds up one LLM worker rather than the whole run, and the bounded
+    queues keep fast stages from running far ahead of slow ones. Metrics are
+    computed for batches of users at a time. Every attempt at a stage has a
+    timeout and is retried with jittered exponential backoff; a user that
+    still fails is logged, counted and dropped without stopping the rest.
+
+    Given jobs (user id -> week_jobs id) claimed by worker_id, each user's job
+    is checkpointed as the week is stored (done) or dropped: back to pending
+    while the job has claims left (WEEK_JOB_MAX_ATTEMPTS), failed after that.
+    """
+
+    def __init__(
+        self,
+        start_of_week,
+        end_of_week,
+        week_repository: Optional[WeekRepository] = None,
+        jobs: Optional[Dict[uuid.UUID, uuid.UUID]] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.start_of_week = start_of_week
+        self.end_of_week = end_of_week
+        self.week_repository = week_repository or WeekRepository()
+        self.jobs = jobs or {}
+        self.worker_id = worker_id
+        self.week_jobs_repository = WeekJobsRepository()
+        self.db_service = DatabaseService.get_instance()
+        self.progress: Optional[WeekPipelineProgress] = None
+
+    async def _attempt(
+        self, stage: str, label, timeout: float, fn: Callable[[], Awaitable]
+    ):
+        """Run fn with a timeout and retries, raising the last error if all fail."""
+        for attempt in range(app_settings.WEEK_RETRIES + 1):
+            try:
+                return await asyncio.wait_for(fn(), timeout)
+            except Exception as e:
+                if attempt == app_settings.WEEK_RETRIES:
+                    logger.error(
+                        f"Week {stage} failed for {label} "
+                        f"after {attempt + 1} attempts: {e!r}"
+                    )
+                    raise
+                delay = app_settings.WEEK_RETRY_BACKOFF_SECONDS * 2**attempt
+                delay *= random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Week {stage} attempt {attempt + 1} failed for {label}: {e!r}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _metrics(self, user_ids: List[uuid.UUID]):
+        async with self.db_service.AsyncSessionLocal() as db:
+            return await compute_week_metrics(
+                db, self.start_of_week, self.end_of_week, user_ids
+            )
+
+    async def _summarize(self, metrics):
+        async with self.db_service.AsyncSessionLocal() as db:
+            return await summarize_week(
+                db, self.start_of_week, self.end_of_week, metrics
+            )
+
+    async def _embed(self, week_obj):
+        embedding = await asyncio.to_thread(
+            LLMService.encode_1024, week_embedding_text(week_obj)
+        )
+        return week_obj, embedding
+
+    async def _store(self, week_and_vector):
+        async with self.db_service.AsyncSessionLocal() as db:
+            stored = await self.week_repository.store_week(db, week_and_vector)
+            # store_week upserts, so a crash before this checkpoint only costs
+            # redoing this user once the job's lease lapses
+            job_id = self.jobs.get(stored.user_id)
+            if job_id is not None:
+                await self.week_jobs_repository.mark_done(
+                    db, job_id, stored.id, self.worker_id
+                )
+            return stored
+
+    async def _fail(self, stage: str, user_ids: List[uuid.UUID], error: Exception):
+        self.progress.failed[stage] += len(user_ids)
+        job_ids = [self.jobs[u] for u in user_ids if u in self.jobs]
+        if not job_ids:
+            return
+        try:
+            async with self.db_service.AsyncSessionLocal() as db:
+                await self.week_jobs_repository.mark_failed(
+                    db,
+                    job_ids,
+                    f"{stage}: {error!r}",
+                    self.worker_id,
+                    app_settings.WEEK_JOB_MAX_ATTEMPTS,
+                )
+        except Exception as e:
+            logger.error(f"Could not checkpoint failed week jobs: {e}")
+
+    async def _run_stage(
+        self,
+        stage: str,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        workers: int,
+        downstream_workers: int,
+        handle: Callable,
+    ):
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                await handle(item)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if outbox is not None:
+            for _ in range(downstream_workers):
+                await outbox.put(_DONE)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(app_settings.WEEK_PROGRESS_SECONDS)
+            logger.info(f"Weekly analysis progress: {self.progress.summary()}")
+
+    async def run(self, user_ids: List[uuid.UUID]) -> WeekPipelineProgress:
+        self.progress = progress = WeekPipelineProgress(total=len(user_ids))
+        concurrency = {
+            "metrics": app_settings.WEEK_METRICS_CONCURRENCY,
+            "llm": app_settings.WEEK_LLM_CONCURRENCY,
+            "embed": app_settings.WEEK_EMBED_CONCURRENCY,
+            "store": app_settings.WEEK_STORE_CONCURRENCY,
+        }
+        queues = {
+            stage: asyncio.Queue(app_settings.WEEK_QUEUE_SIZE) for stage in STAGES
+        }
+        stage_timeout = app_settings.WEEK_STAGE_TIMEOUT_SECONDS
+
+        async def metrics(batch):
+            try:
+                result = await self._attempt(
+                    "metrics",
+                    f"{len(batch)} users",
+                    stage_timeout,
+                    lambda: self._metrics(batch),
+                )
+            except Exception as e:
+                return await self._fail("metrics", batch, e)
+            for user_id in batch:
+                progress.done["metrics"] += 1
+                await queues["llm"].put(result[user_id])
+
+        async def llm(user_metrics):
+            try:
+                week_obj = await self._attempt(
+                    "llm",
+                    user_metrics.user_id,
+                    app_settings.WEEK_LLM_TIMEOUT_SECONDS,
+                    lambda: self._summarize(user_metrics),
+                )
+            except Exception as e:
+                return await self._fail("llm", [user_metrics.user_id], e)
+            progress.done["llm"] += 1
+            await queues["embed"].put(week_obj)
+
+        async def embed(week_obj):
+            try:
+                week_and_vector = await self._attempt(
+                    "embed",
+                    week_obj.user_id,
+                    stage_timeout,
+                    lambda: self._embed(week_obj),
+                )
+            except Exception as e:
+                return await self._fail("embed", [week_obj.user_id], e)
+            progress.done["embed"] += 1
+            await queues["store"].put(week_and_vector)
+
+        async def store(week_and_vector):
+            try:
+                await self._attempt(
+                    "store",
+                    week_and_vector[0].user_id,
+                    stage_timeout,
+                    lambda: self._store(week_and_vector),
+                )
+            except Exception as e:
+                return await self._fail("store", [week_and_vector[0].user_id], e)
+            progress.done["store"] += 1
+
+        async def feed():
+            size = app_settings.WEEK_METRICS_BATCH_SIZE
+            for start in range(0, len(user_ids), size):
+                await queues["metrics"].put(user_ids[start : start + size])
+            for _ in range(concurrency["metrics"]):
+                await queues["metrics"].put(_DONE)
+
+        handlers = {"metrics": metrics, "llm": llm, "embed": embed, "store": store}
+        logger.info(f"Weekly analysis starting for {len(user_ids)} users")
+        reporter = asyncio.create_task(self._report())
+        try:
+            await asyncio.gather(
+                feed(),
+                *(
+                    self._run_stage(
+                        stage,
+                        queues[stage],
+                        queues[STAGES[i + 1]] if i + 1 < len(STAGES) else None,
+                        concurrency[stage],
+                        concurrency[STAGES[i + 1]] if i + 1 < len(STAGES) else 0,
+                        handlers[stage],
+                    )
+                    for i, stage in enumerate(STAGES)
+                ),
+            )
+        finally:
+            reporter.cancel()
+        logger.info(f"Weekly analysis finished: {progress.summary()}")
+        return progress
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import timedelta
+from typing import List, Optional
+import asyncio
+import os
+import socket
+import uuid
+from app.config.config import app_settings
+from app.core.repository.week_repository import WeekRepository
+from app.core.repository.week_jobs_repository import WeekJobsRepository
+from app.schema.repository.week_jobs import WeekJobPriority, claimed_week_job
+from app.services.database_service import DatabaseService
+from app.services.week_pipeline import WeekPipeline
+from app.core.logger import logger
+
+
+class WeekQueueWorker:
+    """
+    Works the week_jobs queue. Every process runs one: it claims a batch of
+    jobs (FOR UPDATE SKIP LOCKED, so concurrent workers on any host never
+    claim the same job), runs them through the week pipeline, and claims
+    again. Leases on claimed jobs are renewed while the worker is alive; when
+    the queue is empty it polls, or is woken by an enqueue in this process.
+
+    On-demand jobs come first in every claim, and a second, small claim loop
+    takes only those, so they don't wait behind a batch of the scheduled run.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.week_repository = WeekRepository()
+        self.week_jobs_repository = WeekJobsRepository()
+        self._wake = asyncio.Event()
+        self._wake_on_demand = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def _lease(self) -> timedelta:
+        return timedelta(seconds=app_settings.WEEK_JOB_LEASE_SECONDS)
+
+    def wake(self, on_demand: bool = False):
+        (self._wake_on_demand if on_demand else self._wake).set()
+
+    async def _claim(
+        self, limit: int, min_priority: Optional[int] = None
+    ) -> List[claimed_week_job]:
+        async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+            return await self.week_jobs_repository.claim(
+                db,
+                self.worker_id,
+                limit,
+                self._lease,
+                app_settings.WEEK_JOB_MAX_ATTEMPTS,
+                min_priority,
+            )
+
+    async def _process(self, jobs: List[claimed_week_job]):
+        # One pipeline per run, since a run fixes the window
+        by_run = defaultdict(list)
+        for job in jobs:
+            by_run[(job.run_id, job.start_date, job.end_date)].append(job)
+
+        async def run(start_date, end_date, run_jobs):
+            pipeline = WeekPipeline(
+                start_date,
+                end_date,
+                self.week_repository,
+                jobs={job.user_id: job.id for job in run_jobs},
+                worker_id=self.worker_id,
+            )
+            await pipeline.run([job.user_id for job in run_jobs])
+
+        await asyncio.gather(
+            *(run(start, end, run_jobs) for (_, start, end), run_jobs in by_run.items())
+        )
+        async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+            for run_id, _, _ in by_run:
+                if await self.week_jobs_repository.complete_run_if_finished(db, run_id):
+                    logger.info(f"Completed weekly analysis run {run_id}")
+
+    async def _renew_leases(self):
+        while True:
+            await asyncio.sleep(app_settings.WEEK_JOB_LEASE_SECONDS / 3)
+            try:
+                async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+                    await self.week_jobs_repository.renew_leases(
+                        db, self.worker_id, self._lease
+                    )
+            except Exception as e:
+                logger.error(f"Error renewing week job leases: {e}")
+
+    async def _run(
+        self, wake: asyncio.Event, limit: int, min_priority: Optional[int] = None
+    ):
+        while True:
+            try:
+                wake.clear()
+                jobs = await self._claim(limit, min_priority)
+                if not jobs:
+                    try:
+                        await asyncio.wait_for(
+                            wake.wait(), app_settings.WEEK_JOB_POLL_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                logger.info(f"Worker {self.worker_id} claimed {len(jobs)} week jobs")
+                await self._process(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Week job worker error: {e}")
+                await asyncio.sleep(app_settings.WEEK_JOB_POLL_SECONDS)
+
+    async def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(
+                    self._run(self._wake, app_settings.WEEK_JOB_CLAIM_SIZE)
+                ),
+                asyncio.create_task(
+                    self._run(
+                        self._wake_on_demand,
+                        app_settings.WEEK_JOB_ON_DEMAND_CLAIM_SIZE,
+                        WeekJobPriority.on_demand,
+                    )
+                ),
+                asyncio.create_task(self._renew_leases()),
+            ]
+            logger.info(f"Week job worker {self.worker_id} started")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        try:
+            async with DatabaseService.get_instance().AsyncSessionLocal() as db:
+                await self.week_jobs_repository.release(db, self.worker_id)
+        except Exception as e:
+            logger.error(f"Error releasing week jobs: {e}")
+        logger.info("Week job worker stopped")
+
+
+week_queue_worker = WeekQueueWorker()
@@ -1,16 +1,89 @@
 from app.core.repository.task_repository import TasksRepository
-from app.core.repository.user_tasks_repository import UserTasksRepository
 from app.core.repository.week_repository import WeekRepository
 from app.core.repository.team_repository import TeamRepository
 from app.core.repository.user_repository import UserRepository
-from app.schema.repository.week import week
+from app.schema.repository.week import week, week_metrics
 from app.services.llm_service import LLMService
 import uuid
+from typing import Dict, List, Optional
 from fastapi import HTTPException
-from datetime import timezone, datetime, timedelta
+from datetime import timezone, datetime, time, timedelta
 from app.services.agent_service import AgentService
 from app.schema.langgraph.week_state import WeekState
 from app.core.agentic.agent_workflows.create_week_workflow import CreateWeekWorkflow
+import pytz
+
+central_tz = pytz.timezone("America/Chicago")
+
+
+def weekly_window(now=None):
+    """
+    The window of the latest scheduled run: the week ending at the most recent
+    Saturday midnight Central Time. Fixed per schedule slot, so a run restarted
+    later in the week, or a job enqueued on demand, maps to the same
+    week_job_runs row.
+    """
+    now = (now or datetime.now(pytz.utc)).astimezone(central_tz)
+    days_back = (now.weekday() - 5) % 7
+    saturday = (now - timedelta(days=days_back)).date()
+    end_of_week = central_tz.localize(datetime.combine(saturday, time()))
+    start_of_week = central_tz.localize(
+        datetime.combine(saturday - timedelta(days=7), time())
+    )
+    return start_of_week, end_of_week
+
+
+async def compute_week_metrics(
+    db, start_of_week, end_of_week, user_ids: Optional[List[uuid.UUID]] = None
+) -> Dict[uuid.UUID, week_metrics]:
+    """
+    Metrics stage: missed deadlines, completed tasks, points and collaborators
+    for every user (or just user_ids) in one set of grouped queries. Requested
+    users without relevant tasks get empty metrics.
+    """
+    tasks_repo = TasksRepository()
+    metrics = await tasks_repo.get_week_metrics(
+        db, start_of_week, end_of_week, user_ids
+    )
+    for user_id in user_ids or []:
+        metrics.setdefault(user_id, week_metrics(user_id=user_id))
+    return metrics
+
+
+async def summarize_week(
+    db, start_of_week, end_of_week, metrics: week_metrics, user=None, team=None
+) -> week:
+    """LLM stage: turn one user's metrics into a week with summary and feedback."""
+    week_obj = week(
+        id=uuid.uuid4(),
+        start_date=start_of_week,
+        end_date=end_of_week,
+        user_id=metrics.user_id,
+        summary="",
+        feedback="",
+        collaborators=metrics.collaborators,
+        missed_deadlines=metrics.missed_deadlines,
+        completed_tasks=metrics.completed_tasks,
+        points_completed=metrics.points_completed,
+    )
+
+    if team is None:
+        team = await TeamRepository().get_team_by_user_id(db, metrics.user_id)
+    if user is None:
+        user = await UserRepository().get_user(db, metrics.user_id)
+    week_state = WeekState(
+        user=user,
+        team=team,
+        week=week_obj,
+        tasks=metrics.tasks,
+    )
+
+    state = WeekState.model_validate(
+        await AgentService.invoke(CreateWeekWorkflow(), week_state)
+    )
+    if not isinstance(state, WeekState):
+        raise HTTPException(status_code=500, detail="Week creation workflow error")
+    return state.week
 
 
 async def analyze_and_create_week(db, start_of_week, end_of_week, user_id):
@@ -21,94 +94,32 @@ async def analyze_and_create_week(db, start_of_week, end_of_week, user_id):
         if end_of_week.tzinfo is None:
             end_of_week = end_of_week.replace(tzinfo=timezone.utc)
 
-        tasks_repo = TasksRepository()
-        user_tasks_repo = UserTasksRepository()
-        team_repo = TeamRepository()
-        user_repo = UserRepository()
-
-        # Find missed deadlines
-        missed_deadlines = []
-        # Get all relevant tasks for user in this week
-        all_tasks = await tasks_repo.get_relevant_tasks_for_week(
-            db, user_id, start_of_week, end_of_week
+        metrics = await compute_week_metrics(db, start_of_week, end_of_week, [user_id])
+        complete_week = await summarize_week(
+            db, start_of_week, end_of_week, metrics[user_id]
         )
 
-        for t in all_tasks:
-            # Unfinished and deadline before end of week
-            if not t.date_of_completion and t.deadline and t.deadline < end_of_week:
-                missed_deadlines.append(t.id)
-            # Finished after start of week but after their due date
-            elif (
-                t.date_of_completion
-                and t.date_of_completion > start_of_week
-                and t.deadline
-                and t.date_of_completion > t.deadline
-            ):
-                missed_deadlines.append(t.id)
-
-        # Find collaborators
-        collaborators = set()
-        for t in all_tasks:
-            # If not completed or completed in this week
-            if (not t.date_of_completion) or (
-                t.date_of_completion
-                and start_of_week < t.date_of_completion < end_of_week
-            ):
-                user_ids = await user_tasks_repo.get_user_ids_for_task(db, t.id)
-                for uid in user_ids:
-                    if uid != user_id:
-                        collaborators.add(uid)
-
-        summary = ""
-        feedback = ""
-
-        # Completed tasks and points
-        completed_tasks = []
-        points_completed = 0
-        completed = await tasks_repo.get_completed_tasks_for_user_in_range(
-            db, user_id, start_of_week, end_of_week
-        )
-        for t in completed:
-            completed_tasks.append(t.id)
-            if t.points:
-                points_completed += t.points
-
-        week_obj = week(
-            id=uuid.uuid4(),
-            start_date=start_of_week,
-            end_date=end_of_week,
-            user_id=user_id,
-            summary=summary,
-            feedback=feedback,
-            collaborators=list(collaborators) if collaborators else [],
-            missed_deadlines=missed_deadlines,
-            completed_tasks=completed_tasks,
-            points_completed=points_completed,
-        )
-
-        user_team = await team_repo.get_team_by_user_id(db, user_id)
-        user = await user_repo.get_user(db, user_id)
-        # AI agentic function (placeholder)
-        week_state = WeekState(
-            user=user,
-            team=user_team,
-            week=week_obj,
-            tasks=all_tasks,
-        )
-
-        state = WeekState.model_validate(
-            await AgentService.invoke(CreateWeekWorkflow(), week_state)
-        )
-        if not isinstance(state, WeekState):
-            raise HTTPException(status_code=500, detail="Week creation workflow error")
-        complete_week = state.week
-
         # Create in DB
         return await encode_and_store([complete_week], db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def week_embedding_text(w: week) -> str:
+    return " ".join(
+        filter(
+            None,
+            [
+                w.summary or "",
+                w.feedback or "",
+                f"Completed {len(w.completed_tasks or [])} tasks",
+                f"Missed {len(w.missed_deadlines or [])} deadlines",
+                f"Earned {w.points_completed or 0} points",
+            ],
+        )
+    )
+
+
 async def encode_and_store(weeks: list[week], db):
     try:
         """
@@ -117,19 +128,7 @@ async def encode_and_store(weeks: list[week], db):
         week_repo = WeekRepository()
         result = []
         for w in weeks:
-            text_to_encode = " ".join(
-                filter(
-                    None,
-                    [
-                        w.summary or "",
-                        w.feedback or "",
-                        f"Completed {len(w.completed_tasks or [])} tasks",
-                        f"Missed {len(w.missed_deadlines or [])} deadlines",
-                        f"Earned {w.points_completed or 0} points",
-                    ],
-                )
-            )
-            embedding = LLMService.encode_1024(text_to_encode)
+            embedding = LLMService.encode_1024(week_embedding_text(w))
             result.append((w, embedding))
 
         for vector_week in result:
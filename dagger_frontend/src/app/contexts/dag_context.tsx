@@ -7,7 +7,6 @@ import type {
   UserTasksRequest,
   Dag,
   Task,
-  UserTasks,
   DagAction,
   TaskPriority,
   TaskFocus
@@ -45,6 +44,18 @@ interface DagContextType {
   computeAllLeafUrgencies: (dag: DagWithDetails) => Record<string, number>;
 }
 
+// Response of GET /dag/team/{team_id}/bundle
+type BundleTask = Task & { id: string; assigned_users: string[] };
+
+interface TeamDagBundle {
+  team_id: string;
+  dags: {
+    dag: { dag_id: string; adjacency_list: { [key: string]: string[] } };
+    tasks: BundleTask[];
+  }[];
+  unattached_tasks: BundleTask[];
+}
+
 const DagContext = createContext<DagContextType | undefined>(undefined);
 
 const HOURS_PER_DAY = 8;
@@ -164,6 +175,7 @@ export function useLeafUrgencies(dag: DagWithDetails) {
 export function DagProvider({ children }: { children: React.ReactNode }) {
   const [dags, setDags] = useState<DagWithDetails[]>([]);
   const [tasksDict, setTasksDict] = useState<{ [key: string]: Task }>({});
+  const [taskUsers, setTaskUsers] = useState<{ [key: string]: string[] }>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const { user } = useAuth();
@@ -174,6 +186,7 @@ export function DagProvider({ children }: { children: React.ReactNode }) {
     if (!user?.team_id) {
       setDags([]);
       setTasksDict({});
+      setTaskUsers({});
       return;
     }
 
@@ -181,64 +194,37 @@ export function DagProvider({ children }: { children: React.ReactNode }) {
       setLoading(true);
       setError(null);
 
-      // Fetch all DAGs
-      const dagsResponse = await fetch('/api/dag');
-      if (!dagsResponse.ok) {
+      // Fetch the team's DAGs with their tasks and assignees in one request
+      const bundleResponse = await fetch(`/api/dag/bundle?team_id=${user.team_id}`);
+      if (!bundleResponse.ok) {
         throw new Error('Failed to fetch DAGs');
       }
-      const dagsData: Dag[] = (await dagsResponse.json()).data;
+      const bundle: TeamDagBundle = (await bundleResponse.json()).data;
 
-      // Fetch all tasks
-      const tasksResponse = await fetch('/api/task');
-      if (!tasksResponse.ok) {
-        throw new Error('Failed to fetch tasks');
-      }
-      const tasksData: Task[] = (await tasksResponse.json()).data;
-
-      // Build tasksDict
+      // Build tasksDict and assignments from DAG tasks and unattached tasks
       const newTasksDict: { [key: string]: Task } = {};
-      tasksData.forEach(task => {
-        if (task.id) newTasksDict[task.id] = task;
-      });
+      const newTaskUsers: { [key: string]: string[] } = {};
+      [...bundle.dags.flatMap((entry) => entry.tasks), ...bundle.unattached_tasks].forEach(
+        ({ assigned_users, ...task }) => {
+          newTasksDict[task.id] = task;
+          newTaskUsers[task.id] = assigned_users;
+        }
+      );
       setTasksDict(newTasksDict);
+      setTaskUsers(newTaskUsers);
 
-      // Fetch all user task assignments
-      const userTasksResponse = await fetch('/api/userTask');
-      if (!userTasksResponse.ok) {
-        throw new Error('Failed to fetch user task assignments');
-      }
-      const userTasksData: UserTasks[] = (await userTasksResponse.json()).data;
-
-      // Process and combine the data
-      const processedDags = dagsData
-        .filter((dag) => dag.team_id === user.team_id)
-        .map((dag) => {
-          const nodes: { [key: string]: Task & { assigned_users: string[] } } = {};
-          
-          // Add task details to nodes
-          tasksData
-            .filter((task) => task.team_id === user.team_id)
-            .forEach((task) => {
-              nodes[task.id!] = {
-                ...task,
-                assigned_users: []
-              };
-            });
-
-          // Add user assignments to nodes
-          userTasksData
-            .filter((ut) => ut.task_id in nodes)
-            .forEach((ut) => {
-              if (nodes[ut.task_id]) {
-                nodes[ut.task_id].assigned_users.push(ut.user_id);
-              }
-            });
-
-          return {
-            ...dag,
-            nodes
-          };
+      const processedDags: DagWithDetails[] = bundle.dags.map((entry) => {
+        const nodes: { [key: string]: Task & { assigned_users: string[] } } = {};
+        entry.tasks.forEach((task) => {
+          nodes[task.id] = task;
         });
+        return {
+          dag_id: entry.dag.dag_id,
+          team_id: bundle.team_id,
+          dag_graph: entry.dag.adjacency_list,
+          nodes,
+        };
+      });
 
       setDags(processedDags);
     } catch (err) {
@@ -527,12 +513,7 @@ export function DagProvider({ children }: { children: React.ReactNode }) {
 
   // Helper: Get user IDs assigned to a task
   const get_task_users = (taskId: string): string[] => {
-    for (const dag of dags) {
-      if (dag.nodes[taskId]) {
-        return dag.nodes[taskId].assigned_users || [];
-      }
-    }
-    return [];
+    return taskUsers[taskId] || [];
   };
 
   // Helper: Get dag_id by task id
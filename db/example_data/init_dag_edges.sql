@@ -0,0 +1,21 @@
+-- Backfill the normalized edge table from the JSONB adjacency lists
+INSERT INTO dag_edges (team_id, from_task, to_task)
+SELECT dag.team_id, node.key::uuid, dep.value::uuid
+FROM dag
+CROSS JOIN LATERAL jsonb_each(dag.dag_graph) AS node(key, deps)
+CROSS JOIN LATERAL jsonb_array_elements_text(node.deps) AS dep(value)
+WHERE EXISTS (SELECT 1 FROM tasks WHERE tasks.id = node.key::uuid)
+  AND EXISTS (SELECT 1 FROM tasks WHERE tasks.id = dep.value::uuid)
+ON CONFLICT DO NOTHING;
+
+-- Count each task's unfinished dependencies for the ready frontier
+UPDATE tasks
+SET open_dependencies = counts.n
+FROM (
+  SELECT dag_edges.from_task, count(*) AS n
+  FROM dag_edges
+  JOIN tasks dependency ON dependency.id = dag_edges.to_task
+  WHERE dependency.date_of_completion IS NULL
+  GROUP BY dag_edges.from_task
+) AS counts
+WHERE tasks.id = counts.from_task;
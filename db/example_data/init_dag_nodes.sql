@@ -0,0 +1,7 @@
+-- Backfill the task -> DAG index from the JSONB adjacency lists
+INSERT INTO dag_nodes (task_id, dag_id, team_id)
+SELECT node.key::uuid, dag.dag_id, dag.team_id
+FROM dag
+CROSS JOIN LATERAL jsonb_object_keys(dag.dag_graph) AS node(key)
+JOIN tasks ON tasks.id = node.key::uuid
+ON CONFLICT (task_id) DO NOTHING;
@@ -1,5 +1,10 @@
 CREATE TABLE IF NOT EXISTS dag (
   dag_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   team_id UUID NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
-  dag_graph JSONB NOT NULL
-); 
\ No newline at end of file
+  dag_graph JSONB NOT NULL,
+  topo_order JSONB,
+  version BIGINT NOT NULL DEFAULT 1
+); 
+
+-- Covers the (dag_id, version) lookups used to validate cached DAGs
+CREATE INDEX IF NOT EXISTS dag_team_id_idx ON dag (team_id) INCLUDE (dag_id, version);
@@ -0,0 +1,25 @@
+CREATE TABLE IF NOT EXISTS dag_changes (
+  seq BIGSERIAL PRIMARY KEY,
+  team_id UUID NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+  -- add_edge / delete_edge: from_task depends on to_task
+  -- set_node: from_task now belongs to dag_id; remove_node: from_task left its DAG
+  action TEXT NOT NULL,
+  from_task UUID NOT NULL,
+  to_task UUID,
+  dag_id UUID,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS dag_changes_team_id_seq_idx ON dag_changes (team_id, seq);
+CREATE INDEX IF NOT EXISTS dag_changes_created_at_idx ON dag_changes (created_at);
+
+-- Team graph state as of seq, written when old changes are compacted away
+CREATE TABLE IF NOT EXISTS dag_snapshots (
+  team_id UUID PRIMARY KEY REFERENCES teams(id) ON DELETE CASCADE,
+  seq BIGINT NOT NULL,
+  -- Every change with seq <= compacted_through has been deleted
+  compacted_through BIGINT NOT NULL,
+  edges JSONB NOT NULL,
+  nodes JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
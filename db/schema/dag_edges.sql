@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS dag_edges (
+  team_id UUID NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+  from_task UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+  to_task UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+  PRIMARY KEY (from_task, to_task)
+);
+
+-- from_task depends on to_task; the primary key serves dependency lookups,
+-- this index serves dependent lookups
+CREATE INDEX IF NOT EXISTS dag_edges_to_task_from_task_idx ON dag_edges (to_task, from_task);
+CREATE INDEX IF NOT EXISTS dag_edges_team_id_idx ON dag_edges (team_id);
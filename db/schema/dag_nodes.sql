@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS dag_nodes (
+  task_id UUID PRIMARY KEY REFERENCES tasks(id) ON DELETE CASCADE,
+  dag_id UUID NOT NULL REFERENCES dag(dag_id) ON DELETE CASCADE,
+  team_id UUID NOT NULL REFERENCES teams(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS dag_nodes_team_id_task_id_idx ON dag_nodes (team_id, task_id);
+CREATE INDEX IF NOT EXISTS dag_nodes_dag_id_idx ON dag_nodes (dag_id);
@@ -1,3 +1,7 @@
+-- Lets team_id share a GIN index with search_vector
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+CREATE EXTENSION IF NOT EXISTS vector;
+
 CREATE TYPE task_priority AS ENUM ('LOW', 'MEDIUM', 'HIGH', 'EMERGENCY');
 CREATE TYPE task_focus AS ENUM ('LOW', 'MEDIUM', 'HIGH');
 
@@ -12,5 +16,46 @@ CREATE TABLE IF NOT EXISTS tasks (
   date_of_completion TIMESTAMPTZ,
   date_of_creation TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
   description TEXT,
-  notes TEXT
-); 
\ No newline at end of file
+  notes TEXT,
+  -- Number of unfinished tasks this task depends on, maintained with dag_edges
+  open_dependencies INT NOT NULL DEFAULT 0,
+  -- Full-text search document; names outrank descriptions, which outrank notes
+  search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(task_name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(notes, '')), 'C')
+  ) STORED,
+  -- bge-large-en embedding of name, description and notes, filled in
+  -- asynchronously after writes
+  embedding vector(1024)
+);
+
+-- Team-scoped full-text search, so a team's matches are found without
+-- visiting other teams' postings
+CREATE INDEX IF NOT EXISTS tasks_search_idx
+  ON tasks USING GIN (team_id, search_vector);
+
+-- Serves the ready frontier: unfinished, unblocked tasks in priority order
+CREATE INDEX IF NOT EXISTS tasks_ready_idx
+  ON tasks (team_id, priority DESC, deadline ASC NULLS LAST, date_of_creation)
+  WHERE date_of_completion IS NULL AND open_dependencies = 0; 
+-- Keyset pagination on (date_of_creation, id), alone and under each filter
+-- that /tasks/page can apply with an equality or range on the leading column
+CREATE INDEX IF NOT EXISTS tasks_created_idx
+  ON tasks (date_of_creation, id);
+CREATE INDEX IF NOT EXISTS tasks_team_created_idx
+  ON tasks (team_id, date_of_creation, id);
+CREATE INDEX IF NOT EXISTS tasks_team_priority_created_idx
+  ON tasks (team_id, priority, date_of_creation, id);
+CREATE INDEX IF NOT EXISTS tasks_team_focus_created_idx
+  ON tasks (team_id, focus, date_of_creation, id);
+CREATE INDEX IF NOT EXISTS tasks_team_open_created_idx
+  ON tasks (team_id, date_of_creation, id)
+  WHERE date_of_completion IS NULL;
+CREATE INDEX IF NOT EXISTS tasks_team_deadline_idx
+  ON tasks (team_id, deadline)
+  WHERE deadline IS NOT NULL;
+
+-- Approximate nearest neighbours for similar-task search
+CREATE INDEX IF NOT EXISTS tasks_embedding_idx
+  ON tasks USING hnsw (embedding vector_cosine_ops);
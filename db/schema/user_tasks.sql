@@ -3,4 +3,10 @@ CREATE TABLE IF NOT EXISTS user_tasks (
   task_id UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
   PRIMARY KEY (user_id, task_id),
   assigned_at TIMESTAMPTZ DEFAULT NOW()
-); 
\ No newline at end of file
+); 
+
+-- The primary key (user_id, task_id) already covers user -> tasks joins.
+-- This covers the reverse direction (task -> assigned users) used by the DAG
+-- bundle and week collaborator lookups, without touching the heap.
+CREATE INDEX IF NOT EXISTS user_tasks_task_user_idx
+  ON user_tasks (task_id, user_id);
@@ -13,3 +13,23 @@ CREATE TABLE IF NOT EXISTS week (
     points_completed INT,
     embedding vector(1024)
 );
+
+-- One week per user per window; store_week upserts on this. Added separately
+-- so databases created before it get it too; duplicates are dropped first,
+-- keeping the physically newest row of each (user_id, start_date).
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'week_user_start_key' AND conrelid = 'week'::regclass
+    ) THEN
+        DELETE FROM week w
+        USING week newer
+        WHERE newer.user_id = w.user_id
+          AND newer.start_date = w.start_date
+          AND newer.ctid > w.ctid;
+        ALTER TABLE week
+            ADD CONSTRAINT week_user_start_key UNIQUE (user_id, start_date);
+    END IF;
+END
+$$;
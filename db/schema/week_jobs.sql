@@ -0,0 +1,46 @@
+-- One row per weekly analysis run, keyed by its window so the same week is
+-- never run twice
+CREATE TABLE IF NOT EXISTS week_job_runs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  start_date TIMESTAMPTZ NOT NULL,
+  end_date TIMESTAMPTZ NOT NULL,
+  status TEXT NOT NULL DEFAULT 'running',
+  created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  completed_at TIMESTAMPTZ,
+  UNIQUE (start_date, end_date)
+);
+
+-- Per-user job within a run, and the queue workers claim from: pending until
+-- a worker claims it (running, held by claimed_by until lease_until), then done
+-- once the user's week is stored or failed once its retries are exhausted. A
+-- running job whose lease lapses went with its worker and is claimable again.
+CREATE TABLE IF NOT EXISTS week_jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  run_id UUID NOT NULL REFERENCES week_job_runs(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  status TEXT NOT NULL DEFAULT 'pending',
+  priority SMALLINT NOT NULL DEFAULT 0,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  claimed_by TEXT,
+  lease_until TIMESTAMPTZ,
+  error TEXT,
+  week_id UUID REFERENCES week(id) ON DELETE SET NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (run_id, user_id)
+);
+
+-- Claim order
+CREATE INDEX IF NOT EXISTS week_jobs_pending_idx
+  ON week_jobs (priority DESC, created_at)
+  WHERE status = 'pending';
+
+-- Lapsed leases
+CREATE INDEX IF NOT EXISTS week_jobs_running_idx
+  ON week_jobs (lease_until)
+  WHERE status = 'running';
+
+-- Whether a run still has work left
+CREATE INDEX IF NOT EXISTS week_jobs_unfinished_idx
+  ON week_jobs (run_id)
+  WHERE status IN ('pending', 'running');
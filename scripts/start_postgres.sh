@@ -25,7 +25,11 @@ SCHEMA_PATH_TEAM="/tmp/team.sql"
 SCHEMA_PATH_TASKS="/tmp/tasks.sql"
 SCHEMA_PATH_USER_TASKS="/tmp/user_tasks.sql"
 SCHEMA_PATH_DAG="/tmp/dag.sql"
+SCHEMA_PATH_DAG_NODES="/tmp/dag_nodes.sql"
+SCHEMA_PATH_DAG_EDGES="/tmp/dag_edges.sql"
+SCHEMA_PATH_DAG_CHANGES="/tmp/dag_changes.sql"
 SCHEMA_PATH_WEEK="/tmp/week.sql"
+SCHEMA_PATH_WEEK_JOBS="/tmp/week_jobs.sql"
 
 # Create vector extension first
 docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -c "CREATE EXTENSION IF NOT EXISTS vector;"
@@ -40,8 +44,16 @@ docker cp db/schema/user_tasks.sql $CONTAINER_NAME:$SCHEMA_PATH_USER_TASKS
 docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_USER_TASKS
 docker cp db/schema/dag.sql $CONTAINER_NAME:$SCHEMA_PATH_DAG
 docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_DAG
+docker cp db/schema/dag_nodes.sql $CONTAINER_NAME:$SCHEMA_PATH_DAG_NODES
+docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_DAG_NODES
+docker cp db/schema/dag_edges.sql $CONTAINER_NAME:$SCHEMA_PATH_DAG_EDGES
+docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_DAG_EDGES
+docker cp db/schema/dag_changes.sql $CONTAINER_NAME:$SCHEMA_PATH_DAG_CHANGES
+docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_DAG_CHANGES
 docker cp db/schema/week.sql $CONTAINER_NAME:$SCHEMA_PATH_WEEK
 docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_WEEK
+docker cp db/schema/week_jobs.sql $CONTAINER_NAME:$SCHEMA_PATH_WEEK_JOBS
+docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f $SCHEMA_PATH_WEEK_JOBS
 
 
 
@@ -73,6 +85,16 @@ if [ -f "db/example_data/init_dag.sql" ]; then
   docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f /tmp/init_dag.sql
 fi
 
+if [ -f "db/example_data/init_dag_nodes.sql" ]; then
+  docker cp db/example_data/init_dag_nodes.sql $CONTAINER_NAME:/tmp/
+  docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f /tmp/init_dag_nodes.sql
+fi
+
+if [ -f "db/example_data/init_dag_edges.sql" ]; then
+  docker cp db/example_data/init_dag_edges.sql $CONTAINER_NAME:/tmp/
+  docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f /tmp/init_dag_edges.sql
+fi
+
 if [ -f "db/example_data/init_week.sql" ]; then
   docker cp db/example_data/init_week.sql $CONTAINER_NAME:/tmp/
   docker exec -u $POSTGRES_USER $CONTAINER_NAME psql -d $POSTGRES_DB -f /tmp/init_week.sql